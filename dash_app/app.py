@@ -62,7 +62,7 @@ def health_check():
         _dash_dir = os.path.dirname(os.path.abspath(__file__))
         if _dash_dir not in _s.path:
             _s.path.insert(0, _dash_dir)
-        from data import query, T
+        from data import table_metadata
 
         bq_tables = {
             "d1_leads_sales": None,
@@ -75,16 +75,19 @@ def health_check():
             "d1_unified_revenue": None,
             "d2_app_lookup": None,
         }
+        meta = table_metadata()
         for table in bq_tables:
-            try:
-                df = query(f"SELECT 1 FROM {T(table)} LIMIT 1")
+            info = meta.get(table)
+            if info is None:
                 bq_tables[table] = {
-                    "ok": not df.empty,
-                    "rows": "1+" if not df.empty else "0",
+                    "ok": False,
+                    "error": "not found" if meta else "metadata query failed",
                 }
-            except Exception as e:
-                bq_tables[table] = {"ok": False, "error": str(e)[:200]}
                 any_fail = True
+            elif info["is_view"]:
+                bq_tables[table] = {"ok": True, "rows": "view"}
+            else:
+                bq_tables[table] = {"ok": info["rows"] > 0, "rows": info["rows"]}
         results["checks"]["bigquery"] = bq_tables
     except Exception as e:
         results["checks"]["bigquery"] = {"error": str(e)[:200]}
@@ -677,10 +680,17 @@ def _start_bq_refresh():
                 _root = os.path.dirname(_this)
                 if _root not in _s.path:
                     _s.path.insert(0, _root)
-                from refresh_dashboard import refresh_d1_activation_score
+                from refresh_dashboard import (
+                    refresh_d1_activation_score,
+                    run_step,
+                    flush_ledger,
+                )
 
                 print(f"[BQ REFRESH] Running refresh_d1_activation_score...")
-                refresh_d1_activation_score()
+                try:
+                    run_step(refresh_d1_activation_score)
+                finally:
+                    flush_ledger()
                 print(f"[BQ REFRESH] Done. Next refresh in {REFRESH_INTERVAL_H}h.")
             except Exception as e:
                 print(f"[BQ REFRESH] Error: {e}")
@@ -820,7 +830,7 @@ def _startup_validation():
         _dash_dir = os.path.dirname(os.path.abspath(__file__))
         if _dash_dir not in _s.path:
             _s.path.insert(0, _dash_dir)
-        from data import query, T
+        from data import table_metadata
 
         test_tables = [
             "d1_leads_sales",
@@ -830,13 +840,17 @@ def _startup_validation():
             "d1_unified_revenue",
             "d2_app_lookup",
         ]
+        meta = table_metadata()
+        if not meta:
+            print("  BQ metadata: ❌ query failed")
         for t in test_tables:
-            try:
-                df = query(f"SELECT COUNT(*) AS cnt FROM {T(t)}")
-                cnt = int(df.iloc[0]["cnt"]) if not df.empty else 0
-                print(f"  BQ {t}: ✅ {cnt:,} rows")
-            except Exception as e:
-                print(f"  BQ {t}: ❌ {e}")
+            info = meta.get(t)
+            if info is None:
+                print(f"  BQ {t}: ❌ not found")
+            elif info["is_view"]:
+                print(f"  BQ {t}: ✅ view")
+            else:
+                print(f"  BQ {t}: ✅ {info['rows']:,} rows")
     except Exception as e:
         print(f"  BQ connection: ❌ {e}")
 
@@ -0,0 +1,69 @@
+"""
+Compare the REST and Storage Read API download paths used by data.query().
+
+Each query runs once (later runs hit the BigQuery result cache, so only the
+download is timed), then its result is fetched through both paths.
+
+Usage:
+    python bench_bq_download.py                  # d2_engagement, d2_dau, feature adoption per app
+    python bench_bq_download.py d2_dau d2_mau    # SELECT * from the named tables
+"""
+
+import sys
+from time import perf_counter
+
+import data
+
+DEFAULT_QUERIES = {
+    "d2_engagement": f"SELECT * FROM {data.T('d2_engagement')}",
+    "d2_dau": f"SELECT * FROM {data.T('d2_dau')}",
+    "feature_adoption_per_app": f"""
+        WITH {data._ROLLUP_CTE}
+        SELECT application_name AS app, event_name, SUM(event_count) AS event_count,
+               COUNT(DISTINCT FORMAT_DATE('%Y-%m', day)) AS months_used
+        FROM rollup
+        GROUP BY app, event_name
+    """,
+}
+
+
+def _mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def bench(name, sql):
+    client = data._get_client()
+    job = client.query(sql)
+    job.result()
+
+    started = perf_counter()
+    rest = job.to_dataframe(create_bqstorage_client=False)
+    rest_s = perf_counter() - started
+
+    bqstorage = data._get_bqstorage()
+    if bqstorage is None:
+        print(f"{name:<28} {len(rest):>9,} rows  REST {rest_s:6.2f}s {_mb(rest):7.1f} MB"
+              "  (Storage Read API client unavailable)")
+        return
+    started = perf_counter()
+    fast = data._arrow_to_frame(job.to_arrow(bqstorage_client=bqstorage))
+    fast_s = perf_counter() - started
+    print(
+        f"{name:<28} {len(rest):>9,} rows  "
+        f"REST {rest_s:6.2f}s {_mb(rest):7.1f} MB  "
+        f"Storage {fast_s:6.2f}s {_mb(fast):7.1f} MB  "
+        f"({rest_s / max(fast_s, 1e-6):.1f}x)"
+    )
+
+
+def main():
+    names = sys.argv[1:]
+    queries = (
+        {n: f"SELECT * FROM {data.T(n)}" for n in names} if names else DEFAULT_QUERIES
+    )
+    for name, sql in queries.items():
+        bench(name, sql)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark batch receipt rendering in receipts/second.
+
+Renders N synthetic receipts (fiscal settlements with a product breakdown,
+the heaviest layout) in-process and through the shared process pool used by
+the IAP Payouts "All Receipts (ZIP)" button — once cold (including worker
+start-up) and once warm. No BigQuery access needed.
+
+Usage:
+    python bench_receipts.py            # 60 receipts
+    RECEIPT_WORKERS=4 python bench_receipts.py 200
+"""
+
+import sys
+
+from receipt_generator import render_receipts_zip, _worker_count
+
+
+def _synthetic(n):
+    receipts = []
+    for i in range(n):
+        products = [
+            {
+                "platform": "Apple" if j % 2 else "Google",
+                "product_name": f"Plan {j}",
+                "sub_type": "Auto-Renewable",
+                "period": "1 Month",
+                "units": 10 + j,
+                "revenue_usd": 99.5 * (j + 1),
+            }
+            for j in range(8)
+        ]
+        args = dict(
+            app_name=f"Coach App {i:03d}",
+            month="2026-08",
+            apple_sales=1200.0 + i,
+            apple_units=120,
+            google_sales=300.0,
+            google_units=30,
+            kliq_fee_pct=10.0,
+            total_payout=900.0,
+            apple_refunds=12.0,
+            google_refunds=0.0,
+            product_details=products,
+            is_fiscal=True,
+            fiscal_period="2026-11",
+            period_start="Aug 03, 2026",
+            period_end="Aug 30, 2026",
+            apple_platform_fee=180.0,
+            apple_platform_fee_pct=15.0,
+            payment_due_date="October 2026",
+        )
+        receipts.append((f"receipt_{i:03d}.pdf", args))
+    return receipts
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    workers = _worker_count()
+    receipts = _synthetic(n)
+    runs = [("in-process", 1)]
+    if workers > 1:
+        runs += [(f"pool x{workers} cold", None), (f"pool x{workers} warm", None)]
+    for label, w in runs:
+        data, stats = render_receipts_zip(receipts, workers=w)
+        print(
+            f"{label:<16} {stats['receipts']} receipts in {stats['seconds']:.2f}s "
+            f"= {stats['per_second']:.1f} receipts/s  (zip {len(data) / 1e6:.1f} MB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
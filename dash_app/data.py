@@ -6,11 +6,19 @@ Uses simple TTL caching instead of Streamlit's @st.cache_data.
 
 import os
 import logging
+import threading
+import numpy as np
 import pandas as pd
+from datetime import date, datetime, timedelta
 from time import time, sleep
 from google.cloud import bigquery
 from google.oauth2 import service_account
 
+try:
+    from google.cloud import bigquery_storage
+except ImportError:  # REST download only
+    bigquery_storage = None
+
 log = logging.getLogger("data")
 log.setLevel(logging.INFO)
 if not log.handlers:
@@ -31,11 +39,21 @@ DATA_PROJECT = "rcwl-data"
 DATASET = "powerbi_dashboard"
 BQ_LOCATION = "EU"
 
+# Results with at least this many rows are downloaded through the BigQuery
+# Storage Read API (Arrow, parallel streams) instead of REST pagination.
+BQ_STORAGE_MIN_ROWS = int(os.environ.get("BQ_STORAGE_MIN_ROWS", "20000"))
+BQ_STORAGE_ENABLED = os.environ.get("BQ_STORAGE_API", "1") != "0"
+
+# String columns that repeat a handful of values across many rows
+CATEGORICAL_COLUMNS = {"application_name", "event_name"}
+
 _client = None
+_bqstorage = None
+_bqstorage_failed = False
 
 
 def _get_client(force_new=False):
-    global _client
+    global _client, _bqstorage
     if _client is None or force_new:
         if SERVICE_ACCOUNT_KEY and os.path.exists(SERVICE_ACCOUNT_KEY):
             creds = service_account.Credentials.from_service_account_file(
@@ -46,9 +64,58 @@ def _get_client(force_new=False):
             )
         else:
             _client = bigquery.Client(location=BQ_LOCATION)
+        _bqstorage = None
     return _client
 
 
+def _get_bqstorage():
+    """Storage Read API client built from the BigQuery client's credentials, or None."""
+    global _bqstorage
+    if not BQ_STORAGE_ENABLED or _bqstorage_failed or bigquery_storage is None:
+        return None
+    if _bqstorage is None:
+        _bqstorage = _get_client()._ensure_bqstorage_client()
+    return _bqstorage
+
+
+def _arrow_to_frame(table):
+    """Arrow result -> DataFrame with compact dtypes.
+
+    CATEGORICAL_COLUMNS are dictionary-encoded before conversion so they
+    never exist as Python strings. DATE columns arrive as datetime.date, as
+    on the REST path, so both download paths give loaders the same dtypes;
+    the cache's normalisation stage compacts them (and the rest) afterwards.
+    """
+    import pyarrow as pa
+
+    for i, field in enumerate(table.schema):
+        if field.name in CATEGORICAL_COLUMNS and pa.types.is_string(field.type):
+            table = table.set_column(
+                i, field.name, table.column(i).dictionary_encode()
+            )
+    return table.to_pandas(date_as_object=True)
+
+
+def _download(job):
+    """Fetch a finished query's rows.
+
+    Large results go through the Storage Read API (one read session, streams
+    downloaded in parallel as Arrow); small ones, and any environment without
+    readsessions permission, use the REST tabledata path.
+    """
+    global _bqstorage_failed
+    rows = job.result()
+    if (rows.total_rows or 0) >= BQ_STORAGE_MIN_ROWS:
+        bqstorage = _get_bqstorage()
+        if bqstorage is not None:
+            try:
+                return _arrow_to_frame(job.to_arrow(bqstorage_client=bqstorage))
+            except Exception as e:
+                _bqstorage_failed = True
+                log.warning(f"Storage Read API unavailable, using REST download: {e}")
+    return rows.to_dataframe(create_bqstorage_client=False)
+
+
 def T(name):
     return f"`{DATA_PROJECT}.{DATASET}.{name}`"
 
@@ -57,13 +124,17 @@ _MAX_RETRIES = 3
 _RETRY_BACKOFF = [1, 3, 8]  # seconds
 
 
-def query(sql, _retries=_MAX_RETRIES):
-    """Run a BigQuery SQL query with retry logic. Returns DataFrame or empty DataFrame."""
+def query(sql, _retries=_MAX_RETRIES, params=None):
+    """Run a BigQuery SQL query with retry logic. Returns DataFrame or empty DataFrame.
+
+    params is an optional list of bigquery query parameters (@name in sql).
+    """
+    job_config = bigquery.QueryJobConfig(query_parameters=params) if params else None
     last_err = None
     for attempt in range(_retries):
         try:
             client = _get_client(force_new=(attempt > 0))
-            df = client.query(sql).to_dataframe()
+            df = _download(client.query(sql, job_config=job_config))
             if attempt > 0:
                 log.info(f"BQ query succeeded on retry {attempt}")
             return df
@@ -80,38 +151,181 @@ def query(sql, _retries=_MAX_RETRIES):
     return pd.DataFrame()
 
 
-def query_ga4(sql, _retries=_MAX_RETRIES):
+def query_ga4(sql, _retries=_MAX_RETRIES, params=None):
     """Run a GA4 BigQuery query. Same as query() — GA4 tables are in the same dataset."""
-    return query(sql, _retries=_retries)
+    return query(sql, _retries=_retries, params=params)
 
 
 # ═══════════════════════════════════════════════════════════════════
 #  SIMPLE TTL CACHE
 # ═══════════════════════════════════════════════════════════════════
 
-_cache = {}
+_cache = {}  # key -> (ts, compact df, is_ok, (bytes before, bytes after))
 _CACHE_TTL = 600  # 10 minutes
 _FAIL_TTL = 30  # Only cache failures for 30 seconds (retry sooner)
+# Keys include app and date range, so without a bound a long-lived worker
+# would keep every variant it ever served; least recently used go first
+CACHE_MAX_ENTRIES = int(os.environ.get("DASH_CACHE_MAX_ENTRIES", "200"))
+CACHE_MAX_MB = float(os.environ.get("DASH_CACHE_MAX_MB", "1024"))
+_cache_lock = threading.Lock()
+
+# A string column becomes categorical when it has at most this share of
+# distinct values (and enough rows for the dictionary to pay off)
+_CATEGORY_MAX_RATIO = 0.5
+_CATEGORY_MIN_ROWS = 50
+
+
+def _first_valid(s):
+    idx = s.first_valid_index()
+    return None if idx is None else s.loc[idx]
+
+
+def _compact_frame(df):
+    """Normalise a loaded frame for the cache (in place).
+
+    Low-cardinality strings -> category, DATE columns -> datetime64,
+    integer counts -> the smallest int dtype that holds them. DATE columns
+    are listed in df.attrs["date_columns"] so _expand_frame can hand them
+    back as dates.
+    """
+    n = len(df)
+    date_columns = []
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            continue
+        if str(s.dtype) == "dbdate":
+            df[col] = pd.to_datetime(s.astype(str), errors="coerce")
+            date_columns.append(col)
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            df[col] = pd.to_numeric(s, downcast="integer")
+        elif s.dtype == object or pd.api.types.is_string_dtype(s):
+            first = _first_valid(s)
+            if isinstance(first, date) and not isinstance(first, datetime):
+                df[col] = pd.to_datetime(s, errors="coerce")
+                date_columns.append(col)
+            elif (
+                isinstance(first, str)
+                and n >= _CATEGORY_MIN_ROWS
+                and s.nunique() <= n * _CATEGORY_MAX_RATIO
+            ):
+                df[col] = s.astype("category")
+    df.attrs["date_columns"] = date_columns
+    return df
+
+
+def _expand_frame(df):
+    """Copy of a cached frame with categoricals back to strings, ints to 64-bit
+    and DATE columns back to datetime.date values.
+
+    Pages filter, fill, group and multiply these columns freely, and tables
+    render dates as-is (a datetime64 shows as YYYY-MM-DDT00:00:00), so they
+    get the dtypes the loader returned; only the cached copy stays compact.
+    """
+    df = df.copy()
+    date_columns = set(df.attrs.get("date_columns", ()))
+    df.attrs = {k: v for k, v in df.attrs.items() if k != "date_columns"}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(dtype.categories.dtype)
+        elif pd.api.types.is_integer_dtype(dtype) and dtype.itemsize < 8:
+            nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+            df[col] = df[col].astype("Int64" if nullable else "int64")
+        elif col in date_columns:
+            df[col] = df[col].dt.date.where(df[col].notna(), None)
+    return df
 
 
 def _cached_query(key, sql_fn):
     """Cache a query result. Empty/failed results are cached for a much shorter TTL."""
     now = time()
-    if key in _cache:
-        ts, df, was_ok = _cache[key]
+    entry = _cache.get(key)
+    if entry is not None:
+        ts, df, was_ok = entry[:3]
         ttl = _CACHE_TTL if was_ok else _FAIL_TTL
         if now - ts < ttl:
-            return df.copy()
+            with _cache_lock:
+                if key in _cache:  # mark as most recently used
+                    _cache[key] = _cache.pop(key)
+            return _expand_frame(df)
     try:
         df = sql_fn()
     except Exception as e:
         log.error(f"_cached_query({key}): loader raised {e}")
         df = pd.DataFrame()
     is_ok = not df.empty
-    _cache[key] = (now, df, is_ok)
+    mem = (0, 0)
+    if is_ok:
+        before = int(df.memory_usage(deep=True).sum())
+        try:
+            _compact_frame(df)
+        except Exception as e:
+            log.warning(f"_cached_query({key}): dtype normalisation skipped: {e}")
+        mem = (before, int(df.memory_usage(deep=True).sum()))
+        log.info(
+            f"cache {key}: {len(df):,} rows, "
+            f"{mem[0] / 1e6:.1f} MB -> {mem[1] / 1e6:.1f} MB"
+        )
+    with _cache_lock:
+        _cache.pop(key, None)
+        _cache[key] = (now, df, is_ok, mem)
+    _evict_cache(now)
     if not is_ok:
         log.warning(f"_cached_query({key}): empty result — will retry in {_FAIL_TTL}s")
-    return df.copy()
+    return _expand_frame(df)
+
+
+def _evict_cache(now):
+    """Drop expired entries, then the least recently used ones while the cache
+    is over CACHE_MAX_ENTRIES or CACHE_MAX_MB (the newest entry always stays)."""
+    with _cache_lock:
+        for key, entry in list(_cache.items()):
+            if now - entry[0] >= (_CACHE_TTL if entry[2] else _FAIL_TTL):
+                del _cache[key]
+        total = sum(entry[3][1] for entry in _cache.values())
+        while len(_cache) > 1 and (
+            len(_cache) > CACHE_MAX_ENTRIES or total > CACHE_MAX_MB * 1e6
+        ):
+            key = next(iter(_cache))
+            total -= _cache.pop(key)[3][1]
+            log.info(f"cache {key}: evicted (least recently used)")
+
+
+def cache_memory_report():
+    """Per-key memory of cached frames, largest first.
+
+    Returns a DataFrame with key, rows, mb_before (as loaded) and mb_cached.
+    """
+    rows = [
+        {
+            "key": key,
+            "rows": len(entry[1]),
+            "mb_before": entry[3][0] / 1e6,
+            "mb_cached": entry[3][1] / 1e6,
+        }
+        for key, entry in list(_cache.items())
+    ]
+    if not rows:
+        return pd.DataFrame(columns=["key", "rows", "mb_before", "mb_cached"])
+    return pd.DataFrame(rows).sort_values("mb_cached", ascending=False)
+
+
+def cache_generation(keys):
+    """Load timestamps of the cached entries for keys.
+
+    None when any of them is missing or expired, i.e. the next load would
+    re-query. Derived results memoised against this tuple stay valid exactly
+    as long as their inputs are served from the cache.
+    """
+    now = time()
+    gen = []
+    for key in keys:
+        entry = _cache.get(key)
+        if entry is None or now - entry[0] >= (_CACHE_TTL if entry[2] else _FAIL_TTL):
+            return None
+        gen.append(entry[0])
+    return tuple(gen)
 
 
 def clear_cache():
@@ -120,6 +334,166 @@ def clear_cache():
     _cache = {}
 
 
+# ═══════════════════════════════════════════════════════════════════
+#  TABLE METADATA (row counts / sizes / modified times, one query)
+# ═══════════════════════════════════════════════════════════════════
+
+_TABLE_METADATA_TTL = 60  # seconds
+_table_metadata = (0.0, {})
+
+
+def table_metadata(max_age=_TABLE_METADATA_TTL):
+    """{table_name: {"rows", "size_bytes", "last_modified", "is_view"}} for the dataset.
+
+    One __TABLES__ query (metadata only, no table scans) serves the health
+    monitor, the Home status panel and startup validation instead of a
+    COUNT(*) job per table. Results are reused for max_age seconds. Views
+    report 0 rows here (their row count isn't stored).
+    """
+    global _table_metadata
+    ts, meta = _table_metadata
+    if time() - ts < (max_age if meta else _FAIL_TTL):
+        return meta
+    df = query(
+        f"""
+        SELECT
+            table_id,
+            row_count,
+            size_bytes,
+            TIMESTAMP_MILLIS(last_modified_time) AS last_modified,
+            type = 2 AS is_view
+        FROM `{DATA_PROJECT}.{DATASET}.__TABLES__`
+        """
+    )
+    meta = {
+        row["table_id"]: {
+            "rows": int(row["row_count"]),
+            "size_bytes": int(row["size_bytes"]),
+            "last_modified": row["last_modified"],
+            "is_view": bool(row["is_view"]),
+        }
+        for row in df.to_dict("records")
+    }
+    _table_metadata = (time(), meta)
+    return meta
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  REFRESH LEDGER (written by refresh_dashboard.run_step)
+# ═══════════════════════════════════════════════════════════════════
+
+
+def load_refresh_ledger():
+    """Latest ledger entry per table, plus when that table was last confirmed current.
+
+    "unchanged" entries (rebuild skipped because no source changed) count as
+    successful refreshes.
+    """
+    return _cached_query(
+        "refresh_ledger",
+        lambda: query(
+            f"""
+            SELECT * EXCEPT(rn) FROM (
+                SELECT
+                    *,
+                    MAX(IF(status IN ('ok', 'unchanged'), finished_at, NULL))
+                        OVER (PARTITION BY table_name) AS last_success_at,
+                    ROW_NUMBER()
+                        OVER (PARTITION BY table_name ORDER BY finished_at DESC) AS rn
+                FROM {T('refresh_ledger')}
+                WHERE table_name IS NOT NULL
+            )
+            WHERE rn = 1
+            """
+        ),
+    )
+
+
+def refresh_ledger_by_table():
+    """{table_name: latest ledger row as a dict}; empty if the ledger is unavailable."""
+    df = load_refresh_ledger()
+    if df.empty:
+        return {}
+    return {row["table_name"]: row for row in df.to_dict("records")}
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  PROJECTION / PREDICATE PUSHDOWN
+# ═══════════════════════════════════════════════════════════════════
+
+
+def _param(name, value):
+    if isinstance(value, (bool, np.bool_)):
+        return bigquery.ScalarQueryParameter(name, "BOOL", bool(value))
+    if isinstance(value, (int, np.integer)):
+        return bigquery.ScalarQueryParameter(name, "INT64", int(value))
+    if isinstance(value, (float, np.floating)):
+        return bigquery.ScalarQueryParameter(name, "FLOAT64", float(value))
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return bigquery.ScalarQueryParameter(name, "DATE", value)
+    return bigquery.ScalarQueryParameter(name, "STRING", str(value))
+
+
+def cutoff_date(days_back):
+    """First date inside a "last N days" window (None for all-time / unset).
+
+    Matches the pages' previous pandas filter `date >= now - N days`.
+    """
+    if days_back is None or days_back >= 99999:
+        return None
+    return (datetime.now() - timedelta(days=days_back)).date() + timedelta(days=1)
+
+
+def _load(
+    key,
+    table,
+    columns=None,
+    order_by=None,
+    date_col=None,
+    since=None,
+    until=None,
+    app_id=None,
+    app_name=None,
+    runner=None,
+):
+    """Cached, parameterised SELECT over a dashboard table.
+
+    columns limits the projection; app_id/app_name filter on
+    application_id/application_name and since/until (inclusive dates) on
+    date_col — all pushed into BigQuery so pages only transfer what they
+    render. The cache key includes every argument.
+    """
+    where, params, key_parts = [], [], [key]
+    if app_id is not None:
+        where.append("application_id = @app_id")
+        params.append(_param("app_id", app_id))
+        key_parts.append(f"app_id={app_id}")
+    if app_name is not None:
+        where.append("application_name = @app_name")
+        params.append(_param("app_name", app_name))
+        key_parts.append(f"app={app_name}")
+    if date_col and since is not None:
+        where.append(f"CAST({date_col} AS DATE) >= @since")
+        params.append(_param("since", since))
+        key_parts.append(f"since={since}")
+    if date_col and until is not None:
+        where.append(f"CAST({date_col} AS DATE) <= @until")
+        params.append(_param("until", until))
+        key_parts.append(f"until={until}")
+    if columns:
+        key_parts.append("cols=" + ",".join(columns))
+
+    sql = f"SELECT {', '.join(f'`{c}`' for c in columns) if columns else '*'} FROM {T(table)}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    run = runner or query
+    return _cached_query("|".join(key_parts), lambda: run(sql, params=params or None))
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  DATA LOADERS
 # ═══════════════════════════════════════════════════════════════════
@@ -319,17 +693,27 @@ def load_firstweek_retention():
 # ── Growth Metrics ──
 
 
-def load_growth_metrics():
-    return _cached_query(
+def load_growth_metrics(columns=None, since=None, until=None):
+    return _load(
         "growth_metrics",
-        lambda: query(f"SELECT * FROM {T('d1_growth_metrics')} ORDER BY week_start"),
+        "d1_growth_metrics",
+        columns,
+        order_by="week_start",
+        date_col="week_start",
+        since=since,
+        until=until,
     )
 
 
-def load_device_type():
-    return _cached_query(
+def load_device_type(columns=None, since=None, until=None):
+    return _load(
         "device_type",
-        lambda: query(f"SELECT * FROM {T('d1_device_type')} ORDER BY date"),
+        "d1_device_type",
+        columns,
+        order_by="date",
+        date_col="date",
+        since=since,
+        until=until,
     )
 
 
@@ -342,49 +726,70 @@ def load_app_lookup():
     )
 
 
-def load_app_engagement_d2():
-    return _cached_query(
+def load_app_engagement_d2(columns=None, app_id=None, since=None, until=None):
+    return _load(
         "app_engagement_d2",
-        lambda: query(f"SELECT * FROM {T('d2_engagement')} ORDER BY date"),
+        "d2_engagement",
+        columns,
+        order_by="date",
+        date_col="date",
+        since=since,
+        until=until,
+        app_id=app_id,
     )
 
 
-def load_app_subscriptions():
-    return _cached_query(
+def load_app_subscriptions(columns=None, app_id=None, since=None, until=None):
+    return _load(
         "app_subscriptions",
-        lambda: query(f"SELECT * FROM {T('d2_subscriptions_revenue')} ORDER BY date"),
+        "d2_subscriptions_revenue",
+        columns,
+        order_by="date",
+        date_col="date",
+        since=since,
+        until=until,
+        app_id=app_id,
     )
 
 
-def load_app_user_overview():
-    return _cached_query(
-        "app_user_overview", lambda: query(f"SELECT * FROM {T('d2_user_overview')}")
-    )
+def load_app_user_overview(columns=None, app_id=None):
+    return _load("app_user_overview", "d2_user_overview", columns, app_id=app_id)
 
 
-def load_app_dau():
-    return _cached_query(
-        "app_dau", lambda: query(f"SELECT * FROM {T('d2_dau')} ORDER BY date")
+def load_app_dau(columns=None, app_id=None, since=None, until=None):
+    return _load(
+        "app_dau",
+        "d2_dau",
+        columns,
+        order_by="date",
+        date_col="date",
+        since=since,
+        until=until,
+        app_id=app_id,
     )
 
 
-def load_app_mau():
-    return _cached_query(
-        "app_mau", lambda: query(f"SELECT * FROM {T('d2_mau')} ORDER BY month")
+def load_app_mau(columns=None, app_id=None, since=None, until=None):
+    return _load(
+        "app_mau",
+        "d2_mau",
+        columns,
+        order_by="month",
+        date_col="month",
+        since=since,
+        until=until,
+        app_id=app_id,
     )
 
 
-def load_app_device_breakdown():
-    return _cached_query(
-        "app_device_breakdown",
-        lambda: query(f"SELECT * FROM {T('d1_app_device_breakdown')}"),
+def load_app_device_breakdown(columns=None, app_name=None):
+    return _load(
+        "app_device_breakdown", "d1_app_device_breakdown", columns, app_name=app_name
     )
 
 
-def load_app_downloads():
-    return _cached_query(
-        "app_downloads", lambda: query(f"SELECT * FROM {T('d1_app_downloads')}")
-    )
+def load_app_downloads(columns=None, app_name=None):
+    return _load("app_downloads", "d1_app_downloads", columns, app_name=app_name)
 
 
 # ── Coach Types ──
@@ -407,17 +812,29 @@ def load_coach_types():
 # ── Acquisition (GA4) ──
 
 
-def load_ga4_acquisition():
-    return _cached_query(
+def load_ga4_acquisition(columns=None, since=None, until=None):
+    return _load(
         "ga4_acquisition",
-        lambda: query_ga4(f"SELECT * FROM {T('d1_ga4_acquisition')} ORDER BY date"),
+        "d1_ga4_acquisition",
+        columns,
+        order_by="date",
+        date_col="date",
+        since=since,
+        until=until,
+        runner=query_ga4,
     )
 
 
-def load_ga4_traffic():
-    return _cached_query(
+def load_ga4_traffic(columns=None, since=None, until=None):
+    return _load(
         "ga4_traffic",
-        lambda: query_ga4(f"SELECT * FROM {T('d1_ga4_traffic')} ORDER BY date"),
+        "d1_ga4_traffic",
+        columns,
+        order_by="date",
+        date_col="date",
+        since=since,
+        until=until,
+        runner=query_ga4,
     )
 
 
@@ -430,21 +847,27 @@ def load_ga4_funnel():
 # ── Funnels ──
 
 
-def load_onboarding_funnel():
-    return _cached_query(
+def load_onboarding_funnel(columns=None, since=None, until=None):
+    return _load(
         "onboarding_funnel",
-        lambda: query(
-            f"SELECT * FROM {T('d1_onboarding_funnel')} ORDER BY date, step_order"
-        ),
+        "d1_onboarding_funnel",
+        columns,
+        order_by="date, step_order",
+        date_col="date",
+        since=since,
+        until=until,
     )
 
 
-def load_engagement_funnel():
-    return _cached_query(
+def load_engagement_funnel(columns=None, since=None, until=None):
+    return _load(
         "engagement_funnel",
-        lambda: query(
-            f"SELECT * FROM {T('d1_engagement_funnel')} ORDER BY date, step_order"
-        ),
+        "d1_engagement_funnel",
+        columns,
+        order_by="date, step_order",
+        date_col="date",
+        since=since,
+        until=until,
     )
 
 
@@ -624,19 +1047,30 @@ MODULE_MAP = {
 }
 
 
+# Feature Adoption loaders read the daily rollup maintained by
+# refresh_dashboard.refresh_d1_event_daily_rollup instead of raw events.
+_ROLLUP_CTE = f"""
+    rollup AS (
+        SELECT a.application_name, r.event_name, r.entity_name, r.day, r.event_count
+        FROM {T('d1_event_daily_rollup')} r
+        JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON r.application_id = a.id
+        WHERE a.application_name IS NOT NULL
+    )
+"""
+
+
 def load_feature_adoption_platform():
     return _cached_query(
         "feature_adoption_platform",
         lambda: query(
             f"""
-        WITH events AS (
-            SELECT e.event_name, a.application_name,
-                   FORMAT_DATE('%Y-%m', DATE(e.event_date)) AS month, COUNT(*) AS cnt
-            FROM `{DATA_PROJECT}.prod_dataset.events` e
-            LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-            WHERE a.application_name IS NOT NULL
-              AND e.event_name NOT LIKE 'onboarding%' AND e.event_name NOT LIKE 'self_serve%'
-            GROUP BY e.event_name, a.application_name, month
+        WITH {_ROLLUP_CTE},
+        events AS (
+            SELECT event_name, application_name,
+                   FORMAT_DATE('%Y-%m', day) AS month, SUM(event_count) AS cnt
+            FROM rollup
+            WHERE event_name NOT LIKE 'onboarding%' AND event_name NOT LIKE 'self_serve%'
+            GROUP BY event_name, application_name, month
         )
         SELECT event_name, SUM(cnt) AS total_events, COUNT(DISTINCT application_name) AS apps_using,
                COUNT(DISTINCT month) AS months_active, MIN(month) AS first_seen, MAX(month) AS last_seen
@@ -651,13 +1085,12 @@ def load_feature_adoption_per_app():
         "feature_adoption_per_app",
         lambda: query(
             f"""
-        SELECT a.application_name AS app, e.event_name, COUNT(*) AS event_count,
-               COUNT(DISTINCT FORMAT_DATE('%Y-%m', DATE(e.event_date))) AS months_used
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        WHERE a.application_name IS NOT NULL
-          AND e.event_name NOT LIKE 'onboarding%' AND e.event_name NOT LIKE 'self_serve%'
-        GROUP BY app, e.event_name ORDER BY app, event_count DESC
+        WITH {_ROLLUP_CTE}
+        SELECT application_name AS app, event_name, SUM(event_count) AS event_count,
+               COUNT(DISTINCT FORMAT_DATE('%Y-%m', day)) AS months_used
+        FROM rollup
+        WHERE event_name NOT LIKE 'onboarding%' AND event_name NOT LIKE 'self_serve%'
+        GROUP BY app, event_name ORDER BY app, event_count DESC
     """
         ),
     )
@@ -668,12 +1101,11 @@ def load_feature_monthly_trend():
         "feature_monthly_trend",
         lambda: query(
             f"""
-        SELECT e.event_name, FORMAT_DATE('%Y-%m', DATE(e.event_date)) AS month,
-               COUNT(*) AS event_count, COUNT(DISTINCT a.application_name) AS apps_active
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        WHERE a.application_name IS NOT NULL
-          AND e.event_name IN (
+        WITH {_ROLLUP_CTE}
+        SELECT event_name, FORMAT_DATE('%Y-%m', day) AS month,
+               SUM(event_count) AS event_count, COUNT(DISTINCT application_name) AS apps_active
+        FROM rollup
+        WHERE event_name IN (
             'app_opened', 'visits_community_page', 'engage_with_blog_post',
             'completes_program_workout', 'live_session_joined', 'live_session_created',
             'user_subscribed', 'recurring_payment', 'purchase_success',
@@ -681,7 +1113,7 @@ def load_feature_monthly_trend():
             'post_on_community', 'post_on_community_feed_with_photo',
             'publish_module', 'publishes_program', 'starts_program',
             'connects_health_device', 'completed_1_to_1_session')
-        GROUP BY e.event_name, month ORDER BY month, event_count DESC
+        GROUP BY event_name, month ORDER BY month, event_count DESC
     """
         ),
     )
@@ -706,15 +1138,15 @@ def load_module_adoption():
         "module_adoption",
         lambda: query(
             f"""
-        SELECT e.entity_name, a.application_name, COUNT(*) AS event_count,
-               COUNT(DISTINCT FORMAT_DATE('%Y-%m', DATE(e.event_date))) AS months_active,
-               MIN(DATE(e.event_date)) AS first_used, MAX(DATE(e.event_date)) AS last_used
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        WHERE a.application_name IS NOT NULL AND e.entity_name IS NOT NULL AND e.entity_name != ''
-          AND e.entity_name NOT IN ('app_opened','onboarding','self_serve','temp_self_serve',
-                                     'self_serve_product','user','customer_behaviour','application','package')
-        GROUP BY e.entity_name, a.application_name ORDER BY event_count DESC
+        WITH {_ROLLUP_CTE}
+        SELECT entity_name, application_name, SUM(event_count) AS event_count,
+               COUNT(DISTINCT FORMAT_DATE('%Y-%m', day)) AS months_active,
+               MIN(day) AS first_used, MAX(day) AS last_used
+        FROM rollup
+        WHERE entity_name IS NOT NULL AND entity_name != ''
+          AND entity_name NOT IN ('app_opened','onboarding','self_serve','temp_self_serve',
+                                  'self_serve_product','user','customer_behaviour','application','package')
+        GROUP BY entity_name, application_name ORDER BY event_count DESC
     """
         ),
     )
@@ -725,119 +1157,27 @@ def load_module_monthly_trend():
         "module_monthly_trend",
         lambda: query(
             f"""
-        SELECT e.entity_name, FORMAT_DATE('%Y-%m', DATE(e.event_date)) AS month,
-               COUNT(*) AS event_count, COUNT(DISTINCT a.application_name) AS apps_active
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        WHERE a.application_name IS NOT NULL AND e.entity_name IS NOT NULL AND e.entity_name != ''
-          AND e.entity_name NOT IN ('app_opened','onboarding','self_serve','temp_self_serve',
-                                     'self_serve_product','user','customer_behaviour','application','package')
-        GROUP BY e.entity_name, month ORDER BY month, event_count DESC
+        WITH {_ROLLUP_CTE}
+        SELECT entity_name, FORMAT_DATE('%Y-%m', day) AS month,
+               SUM(event_count) AS event_count, COUNT(DISTINCT application_name) AS apps_active
+        FROM rollup
+        WHERE entity_name IS NOT NULL AND entity_name != ''
+          AND entity_name NOT IN ('app_opened','onboarding','self_serve','temp_self_serve',
+                                  'self_serve_product','user','customer_behaviour','application','package')
+        GROUP BY entity_name, month ORDER BY month, event_count DESC
     """
         ),
     )
 
 
-# ── Growth Strategy (complex queries) ──
-
-_FX_CTE = """
-    fx_rates AS (
-        SELECT currency, rate FROM UNNEST([
-            STRUCT("USD" AS currency, 1.0 AS rate),
-            STRUCT("GBP", 1.27), STRUCT("EUR", 1.08), STRUCT("AUD", 0.64),
-            STRUCT("CAD", 0.72), STRUCT("CHF", 1.13), STRUCT("DKK", 0.145),
-            STRUCT("NOK", 0.093), STRUCT("SEK", 0.095), STRUCT("NZD", 0.60),
-            STRUCT("SGD", 0.75), STRUCT("HUF", 0.0027), STRUCT("CLP", 0.00105),
-            STRUCT("COP", 0.00024), STRUCT("CZK", 0.042), STRUCT("PLN", 0.25),
-            STRUCT("BRL", 0.19), STRUCT("MXN", 0.055), STRUCT("TRY", 0.031),
-            STRUCT("RUB", 0.011), STRUCT("ILS", 0.28), STRUCT("SAR", 0.267),
-            STRUCT("AED", 0.272), STRUCT("INR", 0.012), STRUCT("ZAR", 0.054),
-            STRUCT("RON", 0.22)
-        ])
-    )
-"""
+# ── Growth Strategy (materialised by refresh_dashboard.py) ──
 
 
 def load_growth_strategy_app_stats():
     return _cached_query(
         "growth_strategy_app_stats",
         lambda: query(
-            f"""
-    WITH {_FX_CTE},
-    sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')}),
-    apple_rev AS (
-        SELECT COALESCE(m.application_name, 'Unknown') AS app,
-               ROUND(SUM(SAFE_CAST(s.customer_price AS FLOAT64) * COALESCE(fx.rate, 1.0) * SAFE_CAST(s.units AS INT64)), 2) AS apple_sales,
-               COUNT(DISTINCT FORMAT_DATE('%Y-%m', s.report_date)) AS apple_months
-        FROM {T('d1_appstore_sales')} s
-        LEFT JOIN sku_map m ON s.sku = m.product_id
-        LEFT JOIN fx_rates fx ON s.customer_currency = fx.currency
-        WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(s.customer_price AS FLOAT64) > 0
-        GROUP BY app
-    ),
-    apple_sku_prices AS (
-        SELECT sku, ROUND(AVG(SAFE_CAST(customer_price AS FLOAT64) * COALESCE(fx.rate, 1.0)), 2) AS avg_price_usd
-        FROM {T('d1_appstore_sales')} s LEFT JOIN fx_rates fx ON s.customer_currency = fx.currency
-        WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(customer_price AS FLOAT64) > 0 GROUP BY sku
-    ),
-    ios_avg AS (
-        SELECT ROUND(AVG(SAFE_CAST(customer_price AS FLOAT64) * COALESCE(fx.rate, 1.0)), 2) AS fallback_price
-        FROM {T('d1_appstore_sales')} s LEFT JOIN fx_rates fx ON s.customer_currency = fx.currency
-        WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(customer_price AS FLOAT64) > 0
-    ),
-    google_rev AS (
-        SELECT a.application_name AS app,
-               ROUND(SUM(COALESCE(ap.avg_price_usd, iavg.fallback_price)), 2) AS google_sales,
-               COUNT(DISTINCT FORMAT_DATE('%Y-%m', DATE(e.event_date))) AS google_months
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        LEFT JOIN apple_sku_prices ap ON JSON_VALUE(e.data, '$.in_app_product_id') = ap.sku
-        CROSS JOIN ios_avg iavg
-        WHERE e.event_name = 'purchase_success' AND a.application_name IS NOT NULL GROUP BY app
-    ),
-    app_events AS (
-        SELECT a.application_name AS app,
-            COUNTIF(e.event_name = 'purchase_success') AS purchases,
-            COUNTIF(e.event_name = 'recurring_payment') AS recurring_payments,
-            COUNTIF(e.event_name = 'user_subscribed') AS new_subscribers,
-            COUNTIF(e.event_name = 'cancels_subscription') AS cancellations,
-            COUNTIF(e.event_name = 'live_session_created') AS livestreams,
-            COUNTIF(e.event_name = 'live_session_joined') AS live_joins,
-            COUNTIF(e.event_name = 'completes_program_workout') AS workouts,
-            COUNTIF(e.event_name IN ('post_on_community','post_on_community_feed_with_photo','post_on_community_feed_with_voice_notes')) AS community_posts,
-            COUNTIF(e.event_name = 'app_opened') AS app_opens,
-            COUNTIF(e.event_name = 'publish_module') AS modules_published,
-            COUNTIF(e.event_name = 'publishes_program') AS programs_published,
-            COUNT(DISTINCT FORMAT_DATE('%Y-%m', DATE(e.event_date))) AS event_months
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        WHERE a.application_name IS NOT NULL GROUP BY app
-    ),
-    apps_meta AS (
-        SELECT application_name AS app, DATE(created_at) AS created_date
-        FROM `{DATA_PROJECT}.prod_dataset.applications` WHERE application_name IS NOT NULL
-    ),
-    fees AS (
-        SELECT application_name AS app, kliq_fee_pct FROM {T('d1_app_fee_lookup')} WHERE kliq_fee_pct IS NOT NULL
-    )
-    SELECT COALESCE(ae.app, ar.app, gr.app) AS app, am.created_date,
-        COALESCE(ar.apple_sales, 0) + COALESCE(gr.google_sales, 0) AS iap_revenue,
-        COALESCE(ar.apple_sales, 0) AS apple_sales, COALESCE(gr.google_sales, 0) AS google_sales,
-        GREATEST(COALESCE(ar.apple_months, 0), COALESCE(gr.google_months, 0)) AS active_rev_months,
-        COALESCE(ae.purchases, 0) AS purchases, COALESCE(ae.recurring_payments, 0) AS recurring_payments,
-        COALESCE(ae.new_subscribers, 0) AS new_subscribers, COALESCE(ae.cancellations, 0) AS cancellations,
-        COALESCE(ae.livestreams, 0) AS livestreams, COALESCE(ae.live_joins, 0) AS live_joins,
-        COALESCE(ae.workouts, 0) AS workouts, COALESCE(ae.community_posts, 0) AS community_posts,
-        COALESCE(ae.app_opens, 0) AS app_opens, COALESCE(ae.modules_published, 0) AS modules_published,
-        COALESCE(ae.programs_published, 0) AS programs_published,
-        COALESCE(ae.event_months, 0) AS event_months, COALESCE(f.kliq_fee_pct, 0) AS kliq_fee_pct
-    FROM app_events ae
-    FULL OUTER JOIN apple_rev ar ON ae.app = ar.app
-    FULL OUTER JOIN google_rev gr ON COALESCE(ae.app, ar.app) = gr.app
-    LEFT JOIN apps_meta am ON COALESCE(ae.app, ar.app, gr.app) = am.app
-    LEFT JOIN fees f ON COALESCE(ae.app, ar.app, gr.app) = f.app
-    WHERE COALESCE(ae.app_opens, 0) > 0 ORDER BY iap_revenue DESC
-    """
+            f"SELECT * FROM {T('d1_growth_strategy_app_stats')} ORDER BY iap_revenue DESC"
         ),
     )
 
@@ -846,63 +1186,7 @@ def load_growth_strategy_monthly():
     return _cached_query(
         "growth_strategy_monthly",
         lambda: query(
-            f"""
-    WITH {_FX_CTE},
-    sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')}),
-    apple_monthly AS (
-        SELECT COALESCE(m.application_name, 'Unknown') AS app,
-               FORMAT_DATE('%Y-%m', s.report_date) AS month,
-               ROUND(SUM(SAFE_CAST(s.customer_price AS FLOAT64) * COALESCE(fx.rate, 1.0) * SAFE_CAST(s.units AS INT64)), 2) AS sales
-        FROM {T('d1_appstore_sales')} s
-        LEFT JOIN sku_map m ON s.sku = m.product_id LEFT JOIN fx_rates fx ON s.customer_currency = fx.currency
-        WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(s.customer_price AS FLOAT64) > 0
-        GROUP BY app, month
-    ),
-    apple_sku_prices AS (
-        SELECT sku, ROUND(AVG(SAFE_CAST(customer_price AS FLOAT64) * COALESCE(fx.rate, 1.0)), 2) AS avg_price_usd
-        FROM {T('d1_appstore_sales')} s LEFT JOIN fx_rates fx ON s.customer_currency = fx.currency
-        WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(customer_price AS FLOAT64) > 0 GROUP BY sku
-    ),
-    ios_avg AS (
-        SELECT ROUND(AVG(SAFE_CAST(customer_price AS FLOAT64) * COALESCE(fx.rate, 1.0)), 2) AS fallback_price
-        FROM {T('d1_appstore_sales')} s LEFT JOIN fx_rates fx ON s.customer_currency = fx.currency
-        WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(customer_price AS FLOAT64) > 0
-    ),
-    google_monthly AS (
-        SELECT a.application_name AS app, FORMAT_DATE('%Y-%m', DATE(e.event_date)) AS month,
-               ROUND(SUM(COALESCE(ap.avg_price_usd, iavg.fallback_price)), 2) AS sales
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        LEFT JOIN apple_sku_prices ap ON JSON_VALUE(e.data, '$.in_app_product_id') = ap.sku
-        CROSS JOIN ios_avg iavg
-        WHERE e.event_name = 'purchase_success' AND a.application_name IS NOT NULL GROUP BY app, month
-    ),
-    combined_rev AS (
-        SELECT app, month, SUM(sales) AS total_sales FROM (
-            SELECT * FROM apple_monthly UNION ALL SELECT * FROM google_monthly
-        ) GROUP BY app, month
-    ),
-    monthly_events AS (
-        SELECT a.application_name AS app, FORMAT_DATE('%Y-%m', DATE(e.event_date)) AS month,
-            COUNTIF(e.event_name = 'user_subscribed') AS new_subs,
-            COUNTIF(e.event_name = 'cancels_subscription') AS cancels,
-            COUNTIF(e.event_name = 'purchase_success') AS purchases,
-            COUNTIF(e.event_name = 'recurring_payment') AS recurring,
-            COUNTIF(e.event_name = 'live_session_created') AS livestreams,
-            COUNTIF(e.event_name = 'app_opened') AS app_opens
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        WHERE a.application_name IS NOT NULL GROUP BY app, month
-    )
-    SELECT COALESCE(r.app, e.app) AS app, COALESCE(r.month, e.month) AS month,
-        COALESCE(r.total_sales, 0) AS total_sales, COALESCE(e.new_subs, 0) AS new_subs,
-        COALESCE(e.cancels, 0) AS cancels, COALESCE(e.purchases, 0) AS purchases,
-        COALESCE(e.recurring, 0) AS recurring, COALESCE(e.livestreams, 0) AS livestreams,
-        COALESCE(e.app_opens, 0) AS app_opens
-    FROM combined_rev r FULL OUTER JOIN monthly_events e ON r.app = e.app AND r.month = e.month
-    WHERE COALESCE(r.total_sales, 0) > 0 OR COALESCE(e.app_opens, 0) > 0
-    ORDER BY app, month
-    """
+            f"SELECT * FROM {T('d1_growth_strategy_monthly')} ORDER BY app, month"
         ),
     )
 
@@ -912,13 +1196,12 @@ def load_feature_frequency():
         "feature_frequency",
         lambda: query(
             f"""
-    WITH event_dates AS (
-        SELECT a.application_name AS app, e.event_name, DATE(e.event_date) AS event_date
-        FROM `{DATA_PROJECT}.prod_dataset.events` e
-        LEFT JOIN `{DATA_PROJECT}.prod_dataset.applications` a ON e.application_id = a.id
-        WHERE a.application_name IS NOT NULL
-          AND e.event_name NOT LIKE 'onboarding%' AND e.event_name NOT LIKE 'self_serve%'
-        GROUP BY app, e.event_name, event_date
+    WITH {_ROLLUP_CTE},
+    event_dates AS (
+        SELECT application_name AS app, event_name, day AS event_date
+        FROM rollup
+        WHERE event_name NOT LIKE 'onboarding%' AND event_name NOT LIKE 'self_serve%'
+        GROUP BY app, event_name, event_date
     ),
     date_gaps AS (
         SELECT app, event_name, event_date,
@@ -932,3 +1215,81 @@ def load_feature_frequency():
     """
         ),
     )
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  APPLICATION DIMENSION (shared id <-> name mapping)
+# ═══════════════════════════════════════════════════════════════════
+
+# Built once per app_lookup cache generation. Every application name gets an
+# integer key (its position in `index`). The index is rebuilt (and keys can
+# move) whenever app_lookup expires, so keys are only comparable within one
+# app_keys() call — see there.
+_app_dim = {"ts": None, "index": pd.Index([], dtype=object), "ids": [], "names": []}
+_app_dim_lock = threading.Lock()
+
+
+def _app_dimension():
+    entry = _cache.get("app_lookup")
+    if entry is None or time() - entry[0] >= (_CACHE_TTL if entry[2] else _FAIL_TTL):
+        lookup = load_app_lookup()
+        # Normally the entry just stored; the frame itself if already evicted
+        entry = _cache.get("app_lookup") or (time(), lookup, not lookup.empty)
+    with _app_dim_lock:
+        if _app_dim["ts"] != entry[0]:
+            lookup = entry[1]
+            if "application_name" in lookup.columns:
+                lookup = lookup[lookup["application_name"].notna()]
+                lookup = lookup[lookup["application_name"].astype(str) != ""]
+                lookup = lookup.drop_duplicates("application_name")
+                names = lookup["application_name"].astype(object).tolist()
+                ids = (
+                    lookup["application_id"].tolist()
+                    if "application_id" in lookup.columns
+                    else [None] * len(names)
+                )
+            else:
+                names, ids = [], []
+            _app_dim.update(
+                ts=entry[0],
+                index=pd.Index(names, dtype=object),
+                ids=ids,
+                names=sorted(names),
+            )
+        return _app_dim
+
+
+def app_options():
+    """Dropdown options for app filters: All Apps, then every app name sorted."""
+    return [{"label": "All Apps", "value": "All Apps"}] + [
+        {"label": n, "value": n} for n in _app_dimension()["names"]
+    ]
+
+
+def app_id_for(app_name):
+    """application_id for an app name; None for All Apps or an unknown name."""
+    if app_name is None or app_name == "All Apps":
+        return None
+    dim = _app_dimension()
+    pos = dim["index"].get_indexer([app_name])[0]
+    return dim["ids"][pos] if 0 <= pos < len(dim["ids"]) else None
+
+
+def app_keys(*columns):
+    """Vectorised application_name -> integer key (-1 for missing names).
+
+    Takes one or more name columns and returns one key array per column,
+    all from a single snapshot of the dimension, so keys from one call can be
+    joined with each other (never with keys from another call). Names that
+    are not in d2_app_lookup (e.g. 'Unknown' Apple SKUs) get keys past the
+    end of the index for that call, so joins on keys match joins on names
+    exactly.
+    """
+    index = _app_dimension()["index"]
+    columns = [pd.Series(c, dtype=object) for c in columns]
+    seen = pd.Index(pd.concat(columns).dropna().unique(), dtype=object)
+    unknown = seen.difference(index)
+    if len(unknown):
+        index = index.append(unknown)
+    return [index.get_indexer(c) for c in columns]
+
@@ -27,6 +27,8 @@ CHECK_INTERVAL_H = int(os.environ.get("HEALTH_CHECK_HOURS", "1"))
 BREVO_API_KEY = os.environ.get("BREVO_API_KEY", "")
 BREVO_FROM_EMAIL = os.environ.get("BREVO_FROM_EMAIL", "ben@joinkliq.io")
 BREVO_FROM_NAME = os.environ.get("BREVO_FROM_NAME", "KLIQ Health Monitor")
+# Tables with no successful refresh in this many hours are reported as stale
+STALE_AFTER_H = int(os.environ.get("HEALTH_STALE_HOURS", "36"))
 
 # ── BQ tables to monitor ──
 # (table_name, expected_min_rows, description)
@@ -67,6 +69,11 @@ BQ_TABLES = [
     ("d1_app_device_breakdown", 5, "App device breakdown"),
     ("d1_app_downloads", 5, "App downloads"),
     ("d1_app_top_users", 5, "Top users per app"),
+    # Feature adoption
+    ("d1_event_daily_rollup", 1000, "Daily event rollup (feature adoption)"),
+    ("d1_purchase_sku_daily", 1, "Daily purchases by SKU"),
+    ("d1_growth_strategy_app_stats", 10, "Growth strategy per-app stats"),
+    ("d1_growth_strategy_monthly", 10, "Growth strategy monthly series"),
     # Dashboard 2
     ("d2_app_lookup", 10, "App lookup"),
     ("d2_engagement", 10, "D2 engagement"),
@@ -110,53 +117,86 @@ def _send_alert_email(subject, html_body):
         return False
 
 
+def _hours_since(ts, now):
+    """Hours between a ledger timestamp and now; None for missing/NaT values."""
+    try:
+        hours = (now - ts).total_seconds() / 3600
+    except (TypeError, AttributeError):
+        return None
+    return None if hours != hours else hours
+
+
 def check_bq_tables():
-    """Check all BQ tables for existence and minimum row count."""
+    """Check every BQ table's row count and freshness.
+
+    Row counts come from one dataset-wide metadata query; freshness from the
+    refresh ledger, falling back to the table's last-modified time.
+    """
     results = []
     try:
-        from data import query, T
+        from data import refresh_ledger_by_table, table_metadata
     except ImportError:
         _dash_dir = os.path.dirname(os.path.abspath(__file__))
         if _dash_dir not in sys.path:
             sys.path.insert(0, _dash_dir)
-        from data import query, T
+        from data import refresh_ledger_by_table, table_metadata
 
+    meta = table_metadata()
+    ledger = refresh_ledger_by_table()
+    now = datetime.now(timezone.utc)
     for table_name, min_rows, description in BQ_TABLES:
-        try:
-            df = query(f"SELECT COUNT(*) AS cnt FROM {T(table_name)}")
-            if df.empty:
-                results.append(
-                    {
-                        "name": table_name,
-                        "description": description,
-                        "status": "FAIL",
-                        "detail": "Query returned empty",
-                        "rows": 0,
-                    }
-                )
-            else:
-                cnt = int(df.iloc[0]["cnt"])
-                ok = cnt >= min_rows
-                results.append(
-                    {
-                        "name": table_name,
-                        "description": description,
-                        "status": "OK" if ok else "WARN",
-                        "detail": f"{cnt:,} rows"
-                        + ("" if ok else f" (expected ≥{min_rows})"),
-                        "rows": cnt,
-                    }
-                )
-        except Exception as e:
+        info = meta.get(table_name)
+        if info is None:
             results.append(
                 {
                     "name": table_name,
                     "description": description,
                     "status": "FAIL",
-                    "detail": str(e)[:200],
+                    "detail": "Table not found" if meta else "Metadata query failed",
+                    "rows": 0,
+                }
+            )
+            continue
+
+        if info["is_view"]:
+            results.append(
+                {
+                    "name": table_name,
+                    "description": description,
+                    "status": "OK",
+                    "detail": "View (row count not tracked)",
                     "rows": 0,
                 }
             )
+            continue
+
+        cnt = info["rows"]
+        entry = ledger.get(table_name)
+        if entry is not None:
+            age_h = _hours_since(entry.get("last_success_at"), now)
+        else:
+            age_h = _hours_since(info["last_modified"], now)
+        if entry is not None and entry.get("status") == "error":
+            status = "FAIL"
+            detail = f"Last refresh failed: {str(entry.get('error') or '')[:150]}"
+        elif cnt < min_rows:
+            status = "WARN"
+            detail = f"{cnt:,} rows (expected ≥{min_rows})"
+        elif age_h is None or age_h > STALE_AFTER_H:
+            status = "WARN"
+            detail = f"{cnt:,} rows — stale, no successful refresh in {STALE_AFTER_H}h"
+        else:
+            status = "OK"
+            detail = f"{cnt:,} rows — refreshed {age_h:.0f}h ago"
+        results.append(
+            {
+                "name": table_name,
+                "description": description,
+                "status": status,
+                "detail": detail,
+                "rows": cnt,
+            }
+        )
     return results
 
 
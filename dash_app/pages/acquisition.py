@@ -9,7 +9,6 @@ from dash import html, dcc, callback, Input, Output, dash_table
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import pandas as pd
-from datetime import datetime, timedelta
 import sys, os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -20,7 +19,7 @@ from kliq_ui import (
 from data import (
     load_growth_metrics, load_ga4_acquisition, load_ga4_traffic,
     load_ga4_funnel, load_device_type, load_onboarding_funnel,
-    load_engagement_funnel,
+    load_engagement_funnel, cutoff_date,
 )
 
 dash.register_page(__name__, path="/acquisition", name="Acquisition", title="Acquisition — KLIQ")
@@ -34,13 +33,12 @@ DAYS_OPTIONS = [
 ]
 
 
-def _filter_by_date(df, days_back, date_col="date"):
+def _parse_dates(df, date_col="date"):
     if df.empty or date_col not in df.columns:
         return df
     df = df.copy()
     df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    cutoff = datetime.now() - timedelta(days=days_back)
-    return df[df[date_col] >= cutoff]
+    return df
 
 
 layout = html.Div([
@@ -146,12 +144,14 @@ def update_acquisition(days_back):
     )
 
     # Load data
-    growth = _filter_by_date(load_growth_metrics(), days_back, "week_start")
-    acquisition = _filter_by_date(load_ga4_acquisition(), days_back)
-    traffic = _filter_by_date(load_ga4_traffic(), days_back)
-    devices = _filter_by_date(load_device_type(), days_back)
-    onboarding = _filter_by_date(load_onboarding_funnel(), days_back)
-    engagement = _filter_by_date(load_engagement_funnel(), days_back)
+    # Date window is pushed into the SQL; only the selected range is transferred
+    since = cutoff_date(days_back)
+    growth = _parse_dates(load_growth_metrics(since=since), "week_start")
+    acquisition = _parse_dates(load_ga4_acquisition(since=since))
+    traffic = _parse_dates(load_ga4_traffic(since=since))
+    devices = _parse_dates(load_device_type(since=since))
+    onboarding = _parse_dates(load_onboarding_funnel(since=since))
+    engagement = _parse_dates(load_engagement_funnel(since=since))
 
     # ── KPI Cards ──
     kpi_children = []
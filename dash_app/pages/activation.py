@@ -41,7 +41,7 @@ from data import (
     load_coach_retention_curve,
     load_cohort_retention,
     load_churn_analysis,
-    load_app_lookup,
+    app_options,
     load_coach_types,
 )
 
@@ -218,13 +218,7 @@ def _empty_fig(msg="No data available"):
     Input("act-app-filter", "value"),  # trigger on load
 )
 def populate_app_filter(_):
-    apps = load_app_lookup()
-    names = []
-    if not apps.empty and "application_name" in apps.columns:
-        names = sorted([n for n in apps["application_name"].dropna().unique() if n])
-    return [{"label": "All Apps", "value": "All Apps"}] + [
-        {"label": n, "value": n} for n in names
-    ]
+    return app_options()
 
 
 @callback(
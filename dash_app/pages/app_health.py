@@ -10,7 +10,6 @@ import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from datetime import datetime, timedelta
 import sys, os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -25,7 +24,8 @@ from kliq_ui import (
     card_wrapper,
 )
 from data import (
-    load_app_lookup,
+    app_options,
+    app_id_for,
     load_app_engagement_d2,
     load_app_subscriptions,
     load_app_user_overview,
@@ -34,6 +34,7 @@ from data import (
     load_app_device_breakdown,
     load_app_downloads,
     load_ga4_acquisition,
+    cutoff_date,
 )
 
 dash.register_page(
@@ -165,15 +166,7 @@ layout = html.Div(
 
 @callback(Output("health-app-filter", "options"), Input("health-app-filter", "value"))
 def populate_apps(_):
-    apps = load_app_lookup()
-    names = (
-        sorted([n for n in apps["application_name"].dropna().unique() if n])
-        if not apps.empty and "application_name" in apps.columns
-        else []
-    )
-    return [{"label": "All Apps", "value": "All Apps"}] + [
-        {"label": n, "value": n} for n in names
-    ]
+    return app_options()
 
 
 @callback(
@@ -191,48 +184,15 @@ def populate_apps(_):
     Input("health-date-range", "value"),
 )
 def update_health(selected_app, days_back):
-    apps = load_app_lookup()
-    app_map = {}
-    if (
-        not apps.empty
-        and "application_name" in apps.columns
-        and "application_id" in apps.columns
-    ):
-        app_map = dict(zip(apps["application_name"], apps["application_id"]))
-    app_id = app_map.get(selected_app) if selected_app != "All Apps" else None
-
-    def filt_id(df):
-        if app_id is None or df.empty or "application_id" not in df.columns:
-            return df
-        return df[df["application_id"] == app_id]
-
-    def filt_name(df):
-        if (
-            selected_app == "All Apps"
-            or df.empty
-            or "application_name" not in df.columns
-        ):
-            return df
-        return df[df["application_name"] == selected_app]
-
-    def filt_date(df, date_col="date"):
-        if (
-            days_back is None
-            or days_back >= 99999
-            or df.empty
-            or date_col not in df.columns
-        ):
-            return df
-        df = df.copy()
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-        cutoff = datetime.now() - timedelta(days=days_back)
-        return df[df[date_col] >= cutoff]
+    app_id = app_id_for(selected_app)
+    app_name = selected_app if selected_app != "All Apps" else None
+    # App and date filters are pushed into the loaders' SQL
+    since = cutoff_date(days_back)
 
     # KPIs
     kpi = []
     try:
-        users_all = load_app_user_overview()
-        users_kpi = filt_id(users_all) if selected_app != "All Apps" else users_all
+        users_kpi = load_app_user_overview(app_id=app_id)
         total_reg = (
             int(users_kpi["total_users"].sum())
             if not users_kpi.empty and "total_users" in users_kpi.columns
@@ -265,7 +225,7 @@ def update_health(selected_app, days_back):
     # MAU
     fig_mau = _empty_fig("No MAU data")
     try:
-        mau = filt_id(load_app_mau())
+        mau = load_app_mau(["application_id", "month", "mau"], app_id=app_id)
         if not mau.empty and "month" in mau.columns and "mau" in mau.columns:
             agg = mau.groupby("month")["mau"].sum().reset_index()
             fig_mau = px.bar(
@@ -286,7 +246,7 @@ def update_health(selected_app, days_back):
     # DAU
     fig_dau = _empty_fig("No DAU data")
     try:
-        dau = filt_date(filt_id(load_app_dau()), "date")
+        dau = load_app_dau(["application_id", "date", "dau"], app_id=app_id, since=since)
         if not dau.empty and "date" in dau.columns and "dau" in dau.columns:
             dau = dau.copy()
             dau["date"] = pd.to_datetime(dau["date"], errors="coerce")
@@ -308,7 +268,7 @@ def update_health(selected_app, days_back):
     # User Overview
     user_table = html.P("No data", style={"color": NEUTRAL})
     try:
-        users = filt_id(load_app_user_overview())
+        users = load_app_user_overview(app_id=app_id)
         if not users.empty:
             cols = [
                 c
@@ -343,7 +303,9 @@ def update_health(selected_app, days_back):
     # Engagement
     fig_eng = _empty_fig("No engagement data")
     try:
-        eng = filt_date(filt_id(load_app_engagement_d2()), "date")
+        eng = load_app_engagement_d2(
+            ["date", "metric", "value"], app_id=app_id, since=since
+        )
         if (
             not eng.empty
             and "metric" in eng.columns
@@ -372,7 +334,9 @@ def update_health(selected_app, days_back):
     # Subscriptions
     fig_subs = _empty_fig("No subscription data")
     try:
-        subs = filt_date(filt_id(load_app_subscriptions()), "date")
+        subs = load_app_subscriptions(
+            ["date", "metric", "value"], app_id=app_id, since=since
+        )
         if (
             not subs.empty
             and "metric" in subs.columns
@@ -400,7 +364,9 @@ def update_health(selected_app, days_back):
     # Device Breakdown
     fig_dev = _empty_fig("No device data")
     try:
-        devices = filt_name(load_app_device_breakdown())
+        devices = load_app_device_breakdown(
+            ["application_name", "device", "unique_users"], app_name=app_name
+        )
         if (
             not devices.empty
             and "device" in devices.columns
@@ -421,7 +387,7 @@ def update_health(selected_app, days_back):
     # Downloads
     dl_table = html.P("No data", style={"color": NEUTRAL})
     try:
-        downloads = filt_name(load_app_downloads())
+        downloads = load_app_downloads(app_name=app_name)
         if not downloads.empty:
             cols = [
                 c
@@ -464,7 +430,7 @@ def update_health(selected_app, days_back):
     fig_map = _empty_fig("No location data")
     country_table = html.P("No data", style={"color": NEUTRAL})
     try:
-        acq = load_ga4_acquisition()
+        acq = load_ga4_acquisition(["country", "unique_users"])
         if not acq.empty and "country" in acq.columns and "unique_users" in acq.columns:
             ca = acq.groupby("country")["unique_users"].sum().nlargest(25).reset_index()
             fig_map = px.choropleth(
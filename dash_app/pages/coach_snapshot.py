@@ -10,7 +10,6 @@ import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from datetime import datetime, timedelta
 import sys, os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -34,10 +33,12 @@ from data import (
     load_coach_growth_stages,
     load_coach_gmv_timeline,
     load_unified_revenue,
-    load_app_lookup,
+    app_options,
+    app_id_for,
     load_app_mau,
     load_app_dau,
     load_app_engagement_d2,
+    cutoff_date,
     load_churn_analysis,
 )
 
@@ -150,13 +151,7 @@ layout = html.Div(
     Input("snap-app-filter", "value"),
 )
 def populate_app_filter(_):
-    apps = load_app_lookup()
-    names = []
-    if not apps.empty and "application_name" in apps.columns:
-        names = sorted([n for n in apps["application_name"].dropna().unique() if n])
-    return [{"label": "All Apps", "value": "All Apps"}] + [
-        {"label": n, "value": n} for n in names
-    ]
+    return app_options()
 
 
 @callback(
@@ -190,33 +185,9 @@ def update_snapshot(selected_app, days_back):
     unified_f = filter_by_name(unified_rev)
 
     # Get app_id for MAU/DAU filtering
-    apps = load_app_lookup()
-    app_map = {}
-    if (
-        not apps.empty
-        and "application_name" in apps.columns
-        and "application_id" in apps.columns
-    ):
-        app_map = dict(zip(apps["application_name"], apps["application_id"]))
-    app_id = app_map.get(selected_app) if selected_app != "All Apps" else None
-
-    def filter_by_id(df):
-        if app_id is None or df.empty or "application_id" not in df.columns:
-            return df
-        return df[df["application_id"] == app_id]
-
-    def filt_date(df, date_col="date"):
-        if (
-            days_back is None
-            or days_back >= 99999
-            or df.empty
-            or date_col not in df.columns
-        ):
-            return df
-        df = df.copy()
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-        cutoff = datetime.now() - timedelta(days=days_back)
-        return df[df[date_col] >= cutoff]
+    app_id = app_id_for(selected_app)
+    # App and date filters for MAU/DAU/engagement are pushed into the SQL
+    since = cutoff_date(days_back)
 
     # Total GMV
     total_gmv = (
@@ -369,7 +340,7 @@ def update_snapshot(selected_app, days_back):
     # ── MAU ──
     fig_mau = _empty_fig("No MAU data")
     try:
-        mau = filter_by_id(load_app_mau())
+        mau = load_app_mau(["application_id", "month", "mau"], app_id=app_id)
         if not mau.empty and "month" in mau.columns and "mau" in mau.columns:
             agg = mau.groupby("month")["mau"].sum().reset_index()
             title = (
@@ -389,7 +360,7 @@ def update_snapshot(selected_app, days_back):
     # ── DAU ──
     fig_dau = _empty_fig("No DAU data")
     try:
-        dau = filt_date(filter_by_id(load_app_dau()), "date")
+        dau = load_app_dau(["application_id", "date", "dau"], app_id=app_id, since=since)
         if not dau.empty and "date" in dau.columns and "dau" in dau.columns:
             dau = dau.copy()
             dau["date"] = pd.to_datetime(dau["date"], errors="coerce")
@@ -411,7 +382,9 @@ def update_snapshot(selected_app, days_back):
     # ── App Opens ──
     fig_opens = _empty_fig("No app opens data")
     try:
-        engagement = filt_date(filter_by_id(load_app_engagement_d2()), "date")
+        engagement = load_app_engagement_d2(
+            ["date", "metric", "value"], app_id=app_id, since=since
+        )
         if (
             not engagement.empty
             and "metric" in engagement.columns
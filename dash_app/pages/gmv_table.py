@@ -28,7 +28,7 @@ from data import (
     load_coach_gmv_timeline,
     load_coach_growth_stages,
     load_unified_revenue,
-    load_app_lookup,
+    app_options,
     load_inapp_purchases,
     load_recurring_payments,
     load_revenue_by_channel,
@@ -152,15 +152,7 @@ layout = html.Div(
 
 @callback(Output("gmv-app-filter", "options"), Input("gmv-app-filter", "value"))
 def populate_apps(_):
-    apps = load_app_lookup()
-    names = (
-        sorted([n for n in apps["application_name"].dropna().unique() if n])
-        if not apps.empty and "application_name" in apps.columns
-        else []
-    )
-    return [{"label": "All Apps", "value": "All Apps"}] + [
-        {"label": n, "value": n} for n in names
-    ]
+    return app_options()
 
 
 @callback(
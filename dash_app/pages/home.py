@@ -6,7 +6,7 @@ import dash
 from dash import html, dcc, callback, Input, Output
 import dash_bootstrap_components as dbc
 import sys, os
-from datetime import datetime
+from datetime import datetime, timezone
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from kliq_ui import (
@@ -279,13 +279,21 @@ layout = html.Div(
 )
 
 
+def _format_age(hours):
+    if hours < 1:
+        return f"{hours * 60:.0f}m ago"
+    if hours < 48:
+        return f"{hours:.0f}h ago"
+    return f"{hours / 24:.0f}d ago"
+
+
 @callback(
     Output("home-data-status", "children"),
     Input("home-status-trigger", "n_intervals"),
 )
 def update_data_status(_):
     """Check all data sources and display their status."""
-    from data import query, T, _cache
+    from data import _cache, refresh_ledger_by_table, table_metadata
 
     checks = []
 
@@ -305,57 +313,67 @@ def update_data_status(_):
         "d1_coach_summary": "Coach Summary",
     }
 
+    meta = table_metadata()
+    ledger = refresh_ledger_by_table()
+    now = datetime.now(timezone.utc)
     bq_rows = []
     for table, label in bq_tables.items():
+        info = meta.get(table)
+        entry = ledger.get(table)
+        cnt = info["rows"] if info and not info["is_view"] else None
+        if entry is not None:
+            last_refresh = entry.get("last_success_at")
+        else:
+            last_refresh = info["last_modified"] if info else None
         try:
-            df = query(f"SELECT COUNT(*) AS cnt FROM {T(table)}")
-            cnt = int(df.iloc[0]["cnt"]) if not df.empty else 0
-            ok = cnt > 0
-            bq_rows.append(
-                html.Tr(
-                    [
-                        html.Td("✅" if ok else "⚠️", style={"width": "30px"}),
-                        html.Td(label, style={"fontWeight": "600"}),
-                        html.Td(
-                            table,
-                            style={
-                                "fontFamily": "monospace",
-                                "fontSize": "12px",
-                                "color": NEUTRAL,
-                            },
-                        ),
-                        html.Td(f"{cnt:,} rows"),
-                        html.Td(
-                            html.Span(
-                                "OK", style={"color": "#15803D", "fontWeight": "600"}
-                            )
-                            if ok
-                            else html.Span(
-                                "EMPTY", style={"color": "#DC2626", "fontWeight": "600"}
-                            )
-                        ),
-                    ]
-                )
+            hours = (now - last_refresh).total_seconds() / 3600
+            age = "never" if hours != hours else _format_age(hours)
+        except (TypeError, AttributeError):
+            age = "—"
+
+        if info is None:
+            icon = "❌"
+            badge = html.Span(
+                "NOT FOUND" if meta else "METADATA UNAVAILABLE",
+                style={"color": "#DC2626", "fontWeight": "600"},
             )
-        except Exception as e:
-            bq_rows.append(
-                html.Tr(
-                    [
-                        html.Td("❌"),
-                        html.Td(label, style={"fontWeight": "600"}),
-                        html.Td(
-                            table, style={"fontFamily": "monospace", "fontSize": "12px"}
-                        ),
-                        html.Td("—"),
-                        html.Td(
-                            html.Span(
-                                f"ERROR: {str(e)[:60]}",
-                                style={"color": "#DC2626", "fontSize": "11px"},
-                            )
-                        ),
-                    ]
-                )
+        elif entry is not None and entry.get("status") == "error":
+            icon = "❌"
+            badge = html.Span(
+                f"ERROR: {str(entry.get('error') or '')[:60]}",
+                style={"color": "#DC2626", "fontSize": "11px"},
+            )
+        elif cnt or info["is_view"]:
+            icon = "✅"
+            badge = html.Span("OK", style={"color": "#15803D", "fontWeight": "600"})
+        else:
+            icon = "⚠️"
+            badge = html.Span(
+                "EMPTY", style={"color": "#DC2626", "fontWeight": "600"}
+            )
+        bq_rows.append(
+            html.Tr(
+                [
+                    html.Td(icon, style={"width": "30px"}),
+                    html.Td(label, style={"fontWeight": "600"}),
+                    html.Td(
+                        table,
+                        style={
+                            "fontFamily": "monospace",
+                            "fontSize": "12px",
+                            "color": NEUTRAL,
+                        },
+                    ),
+                    html.Td(
+                        "view"
+                        if info and info["is_view"]
+                        else "—" if cnt is None else f"{cnt:,} rows"
+                    ),
+                    html.Td(age),
+                    html.Td(badge),
+                ]
             )
+        )
 
     checks.append(
         html.Div(
@@ -373,6 +391,7 @@ def update_data_status(_):
                                     html.Th("Source"),
                                     html.Th("Table"),
                                     html.Th("Data"),
+                                    html.Th("Last refresh"),
                                     html.Th("Status"),
                                 ]
                             )
@@ -474,8 +493,12 @@ def update_data_status(_):
 
     # ── Cache Status ──
     cache_rows = []
+    cache_mb = cache_mb_before = 0.0
     for key, cache_entry in sorted(_cache.items()):
         ts, df = cache_entry[0], cache_entry[1]
+        before, after = cache_entry[3]
+        cache_mb += after / 1e6
+        cache_mb_before += before / 1e6
         age_min = round((datetime.utcnow().timestamp() - ts) / 60, 1)
         rows = len(df) if hasattr(df, "__len__") else 0
         cache_rows.append(
@@ -484,6 +507,7 @@ def update_data_status(_):
                     html.Td("🟢" if rows > 0 else "🔴", style={"width": "30px"}),
                     html.Td(key, style={"fontFamily": "monospace", "fontSize": "12px"}),
                     html.Td(f"{rows:,} rows"),
+                    html.Td(f"{after / 1e6:.1f} MB (loaded {before / 1e6:.1f} MB)"),
                     html.Td(f"{age_min} min ago"),
                 ]
             )
@@ -498,7 +522,8 @@ def update_data_status(_):
                         style={"fontWeight": "700", "marginBottom": "8px"},
                     ),
                     html.P(
-                        f"Cache TTL: 10 minutes · {len(_cache)} items cached",
+                        f"Cache TTL: 10 minutes · {len(_cache)} items cached · "
+                        f"{cache_mb:.1f} MB (loaded {cache_mb_before:.1f} MB)",
                         style={
                             "fontSize": "12px",
                             "color": NEUTRAL,
@@ -513,6 +538,7 @@ def update_data_status(_):
                                         html.Th("", style={"width": "30px"}),
                                         html.Th("Key"),
                                         html.Th("Data"),
+                                        html.Th("Memory"),
                                         html.Th("Age"),
                                     ]
                                 )
@@ -34,335 +34,26 @@ from kliq_ui import (
     chart_card,
     card_wrapper,
 )
-from data import query as run_query, _cached_query, T
+from payout_engine import (
+    fiscal_to_apple_month,
+    payment_due_date,
+    load_fiscal_periods,
+    payouts,
+    products,
+    select,
+    resolve_period,
+    receipt_spec,
+    batch_receipts_zip,
+)
 from receipt_generator import generate_receipt_pdf
 
 dash.register_page(
     __name__, path="/iap-payouts", name="IAP Payouts", title="IAP Payouts — KLIQ"
 )
 
-APPLE_FEE_PCT = 30.0
-GOOGLE_FEE_PCT = 30.0
-
 from calendar import month_name as _month_name
 
 
-def _fiscal_to_apple_month(fiscal_period):
-    """Convert Apple fiscal period (e.g. '2026-03') to calendar month ('2025-12')."""
-    fy = int(fiscal_period[:4])
-    fm = int(fiscal_period[5:7])
-    if fm <= 3:
-        return f"{fy - 1}-{fm + 9:02d}"
-    return f"{fy}-{fm - 3:02d}"
-
-
-def _compute_payment_due_date(apple_month):
-    """KLIQ pays coaches 2 months after Apple's fiscal month."""
-    y, m = int(apple_month[:4]), int(apple_month[5:7])
-    m += 2
-    if m > 12:
-        m -= 12
-        y += 1
-    return f"{_month_name[m]} {y}"
-
-
-def _load_apple_monthly():
-    """Load Apple monthly revenue from Sales Reports (calendar months).
-    Uses customer_price_usd / developer_proceeds_usd pre-computed with
-    ECB historical rates via frankfurter.app at ingestion time."""
-    return _cached_query(
-        "iap_apple_monthly",
-        lambda: run_query(
-            f"""
-    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
-    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
-           FORMAT_DATE("%Y-%m", s.report_date) AS month,
-           SUM(SAFE_CAST(s.units AS INT64)) AS total_units,
-           ROUND(SUM(SAFE_CAST(s.customer_price_usd AS FLOAT64) * SAFE_CAST(s.units AS INT64)), 2) AS sales,
-           ROUND(SUM(SAFE_CAST(s.developer_proceeds_usd AS FLOAT64) * SAFE_CAST(s.units AS INT64)), 2) AS proceeds
-    FROM {T('d1_appstore_sales')} s
-    LEFT JOIN sku_map m ON s.sku = m.product_id
-    WHERE s.product_type_identifier IN ('IA1', 'IAY')
-      AND SAFE_CAST(s.customer_price_usd AS FLOAT64) > 0
-    GROUP BY application_name, month ORDER BY application_name, month
-    """
-        ),
-    )
-
-
-def _load_google_monthly():
-    return _cached_query(
-        "iap_google_monthly",
-        lambda: run_query(
-            f"""
-    SELECT e.application_name, e.month, COUNT(*) AS total_units,
-           ROUND(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64)), 2) AS sales,
-           ROUND(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64)) * 0.70, 2) AS proceeds
-    FROM {T('d1_google_earnings')} e
-    WHERE e.transaction_type = 'Charge' AND e.application_name IS NOT NULL
-    GROUP BY e.application_name, e.month ORDER BY e.application_name, e.month
-    """
-        ),
-    )
-
-
-def _load_apple_refunds():
-    return _cached_query(
-        "iap_apple_refunds",
-        lambda: run_query(
-            f"""
-    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
-    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
-           FORMAT_DATE("%Y-%m", s.report_date) AS month,
-           ABS(SUM(SAFE_CAST(s.units AS INT64))) AS refund_units,
-           ROUND(ABS(SUM(SAFE_CAST(s.customer_price_usd AS FLOAT64) * SAFE_CAST(s.units AS INT64))), 2) AS refund_amount
-    FROM {T('d1_appstore_sales')} s LEFT JOIN sku_map m ON s.sku = m.product_id
-    WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(s.units AS INT64) < 0
-    GROUP BY 1, 2 ORDER BY 1, 2
-    """
-        ),
-    )
-
-
-def _load_google_refunds():
-    return _cached_query(
-        "iap_google_refunds",
-        lambda: run_query(
-            f"""
-    SELECT e.application_name, e.month, COUNT(*) AS refund_units,
-           ROUND(ABS(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64))), 2) AS refund_amount
-    FROM {T('d1_google_earnings')} e
-    WHERE e.transaction_type = 'Charge refund' AND e.application_name IS NOT NULL
-    GROUP BY 1, 2 ORDER BY 1, 2
-    """
-        ),
-    )
-
-
-def _load_fee_lookup():
-    return _cached_query(
-        "iap_fee_lookup",
-        lambda: run_query(
-            f"SELECT application_name, kliq_fee_pct FROM {T('d1_app_fee_lookup')}"
-        ),
-    )
-
-
-def _load_apple_product_details():
-    return _cached_query(
-        "iap_apple_product_details",
-        lambda: run_query(
-            f"""
-    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
-    SELECT
-        COALESCE(m.application_name, 'Unknown') AS application_name,
-        FORMAT_DATE("%Y-%m", s.report_date) AS month,
-        s.sku AS product_id,
-        s.title AS product_name,
-        s.subscription AS sub_type,
-        s.period,
-        SUM(SAFE_CAST(s.units AS INT64)) AS units,
-        ROUND(SUM(SAFE_CAST(s.customer_price_usd AS FLOAT64)
-              * SAFE_CAST(s.units AS INT64)), 2) AS revenue_usd
-    FROM {T('d1_appstore_sales')} s
-    LEFT JOIN sku_map m ON s.sku = m.product_id
-    WHERE s.product_type_identifier IN ('IA1', 'IAY')
-      AND SAFE_CAST(s.units AS INT64) > 0
-    GROUP BY 1, 2, 3, 4, 5, 6
-    ORDER BY 1, 2, revenue_usd DESC
-    """
-        ),
-    )
-
-
-def _load_google_product_details():
-    return _cached_query(
-        "iap_google_product_details",
-        lambda: run_query(
-            f"""
-    SELECT
-        e.application_name,
-        e.month,
-        e.sku_id AS product_id,
-        e.product_title AS product_name,
-        'Purchase' AS sub_type,
-        CASE
-            WHEN LOWER(e.sku_id) LIKE '%monthly%' OR LOWER(e.sku_id) LIKE '%month%' THEN '1 Month'
-            WHEN LOWER(e.sku_id) LIKE '%quarterly%' OR LOWER(e.sku_id) LIKE '%quarter%' THEN '3 Months'
-            WHEN LOWER(e.sku_id) LIKE '%sixmonth%' OR LOWER(e.sku_id) LIKE '%6month%' THEN '6 Months'
-            WHEN LOWER(e.sku_id) LIKE '%yearly%' OR LOWER(e.sku_id) LIKE '%year%' OR LOWER(e.sku_id) LIKE '%annual%' THEN '1 Year'
-            ELSE 'Other'
-        END AS period,
-        COUNT(*) AS units,
-        ROUND(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64)), 2) AS revenue_usd
-    FROM {T('d1_google_earnings')} e
-    WHERE e.transaction_type = 'Charge'
-      AND e.application_name IS NOT NULL
-    GROUP BY 1, 2, 3, 4, 5, 6
-    ORDER BY 1, 2, revenue_usd DESC
-    """
-        ),
-    )
-
-
-# ── Apple Financial Reports (settlement / fiscal period) loaders ──
-
-
-def _load_apple_financial():
-    """Load Apple Financial Reports settlement data grouped by app + fiscal period."""
-    return _cached_query(
-        "iap_apple_financial",
-        lambda: run_query(
-            f"""
-    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
-    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
-           f.apple_month, f.fiscal_period,
-           MIN(f.period_start) AS period_start,
-           MAX(f.period_end) AS period_end,
-           SUM(SAFE_CAST(f.quantity AS INT64)) AS total_units,
-           ROUND(SUM(f.gross_revenue_usd), 2) AS sales,
-           ROUND(SUM(f.extended_partner_share_usd), 2) AS proceeds
-    FROM {T('d1_appstore_financial')} f
-    LEFT JOIN sku_map m ON f.vendor_identifier = m.product_id
-    WHERE f.product_type_identifier IN ('IA1', 'IAY')
-      AND UPPER(f.sales_or_return) = 'S'
-    GROUP BY 1, 2, 3
-    ORDER BY 1, 2
-    """
-        ),
-    )
-
-
-def _load_apple_financial_refunds():
-    """Load refunds from Apple Financial Reports."""
-    return _cached_query(
-        "iap_apple_financial_refunds",
-        lambda: run_query(
-            f"""
-    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
-    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
-           f.apple_month, f.fiscal_period,
-           ABS(SUM(SAFE_CAST(f.quantity AS INT64))) AS refund_units,
-           ROUND(ABS(SUM(f.gross_revenue_usd)), 2) AS refund_amount
-    FROM {T('d1_appstore_financial')} f
-    LEFT JOIN sku_map m ON f.vendor_identifier = m.product_id
-    WHERE f.product_type_identifier IN ('IA1', 'IAY')
-      AND UPPER(f.sales_or_return) = 'R'
-    GROUP BY 1, 2, 3
-    ORDER BY 1, 2
-    """
-        ),
-    )
-
-
-def _load_apple_financial_product_details():
-    """Load per-product details from Apple Financial Reports."""
-    return _cached_query(
-        "iap_apple_financial_product_details",
-        lambda: run_query(
-            f"""
-    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
-    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
-           f.apple_month, f.fiscal_period,
-           f.vendor_identifier AS product_id,
-           f.title AS product_name,
-           SUM(SAFE_CAST(f.quantity AS INT64)) AS units,
-           ROUND(SUM(f.gross_revenue_usd), 2) AS revenue_usd,
-           ROUND(SUM(f.extended_partner_share_usd), 2) AS proceeds_usd
-    FROM {T('d1_appstore_financial')} f
-    LEFT JOIN sku_map m ON f.vendor_identifier = m.product_id
-    WHERE f.product_type_identifier IN ('IA1', 'IAY')
-      AND UPPER(f.sales_or_return) = 'S'
-    GROUP BY 1, 2, 3, 4, 5
-    ORDER BY 1, 2, revenue_usd DESC
-    """
-        ),
-    )
-
-
-def _load_fiscal_periods():
-    """Load distinct fiscal periods with date ranges."""
-    return _cached_query(
-        "iap_fiscal_periods",
-        lambda: run_query(
-            f"""
-    SELECT DISTINCT fiscal_period, apple_month,
-           MIN(period_start) AS period_start,
-           MAX(period_end) AS period_end
-    FROM {T('d1_appstore_financial')}
-    GROUP BY fiscal_period, apple_month
-    ORDER BY fiscal_period DESC
-    """
-        ),
-    )
-
-
-def _compute_breakdown(
-    df_platform, fee_lookup, platform_fee_pct, platform_name, refunds_df=None
-):
-    if df_platform.empty:
-        return pd.DataFrame()
-    df = df_platform.merge(fee_lookup, on="application_name", how="left")
-    df["platform_fee_pct"] = platform_fee_pct
-    df["platform_fee"] = (df["sales"] * platform_fee_pct / 100).round(2)
-    df["proceeds"] = (df["sales"] - df["platform_fee"]).round(2)
-    df["kliq_fee_pct"] = df["kliq_fee_pct"].fillna(0)
-    df["kliq_fee"] = (df["sales"] * df["kliq_fee_pct"] / 100).round(2)
-    df["refund_amount"] = 0.0
-    df["refund_units"] = 0
-    if refunds_df is not None and not refunds_df.empty:
-        ref = refunds_df.rename(
-            columns={"refund_amount": "_ref_amt", "refund_units": "_ref_units"}
-        )
-        df = df.merge(
-            ref[["application_name", "month", "_ref_amt", "_ref_units"]],
-            on=["application_name", "month"],
-            how="left",
-        )
-        df["refund_amount"] = df["_ref_amt"].fillna(0).round(2)
-        df["refund_units"] = df["_ref_units"].fillna(0).astype(int).abs()
-        df = df.drop(columns=["_ref_amt", "_ref_units"])
-    df["payout"] = (
-        df["sales"] - df["platform_fee"] - df["kliq_fee"] - df["refund_amount"]
-    ).round(2)
-    df["platform"] = platform_name
-    return df
-
-
-def _compute_fiscal_breakdown(df_fiscal, fee_lookup, refunds_df=None):
-    """Compute breakdown from Apple Financial Reports.
-    Platform fee = sales - proceeds (actual Apple commission, captures 15% SBP vs 30%)."""
-    if df_fiscal.empty:
-        return pd.DataFrame()
-    df = df_fiscal.merge(fee_lookup, on="application_name", how="left")
-    df["platform_fee"] = (df["sales"] - df["proceeds"]).round(2)
-    df["platform_fee_pct"] = (
-        (df["platform_fee"] / df["sales"] * 100).where(df["sales"] > 0, 0).round(1)
-    )
-    df["kliq_fee_pct"] = df["kliq_fee_pct"].fillna(0)
-    df["kliq_fee"] = (df["sales"] * df["kliq_fee_pct"] / 100).round(2)
-    df["refund_amount"] = 0.0
-    df["refund_units"] = 0
-    if refunds_df is not None and not refunds_df.empty:
-        ref = refunds_df.rename(
-            columns={"refund_amount": "_ref_amt", "refund_units": "_ref_units"}
-        )
-        df = df.merge(
-            ref[["application_name", "fiscal_period", "_ref_amt", "_ref_units"]],
-            on=["application_name", "fiscal_period"],
-            how="left",
-        )
-        df["refund_amount"] = df["_ref_amt"].fillna(0).round(2)
-        df["refund_units"] = df["_ref_units"].fillna(0).astype(int).abs()
-        df = df.drop(columns=["_ref_amt", "_ref_units"])
-    df["payout"] = (
-        df["sales"] - df["platform_fee"] - df["kliq_fee"] - df["refund_amount"]
-    ).round(2)
-    df["platform"] = "Apple"
-    df["month"] = df["apple_month"]
-    return df
-
-
 def _empty_fig(msg="No data available"):
     fig = go.Figure()
     fig.update_layout(
@@ -515,7 +206,7 @@ layout = html.Div(
                                     style={"fontSize": "13px"},
                                 ),
                             ],
-                            md=5,
+                            md=4,
                         ),
                         dbc.Col(
                             [
@@ -530,11 +221,24 @@ layout = html.Div(
                             ],
                             md=3,
                         ),
+                        dbc.Col(
+                            [
+                                html.Div(style={"height": "22px"}),
+                                dbc.Button(
+                                    "🗂 All Receipts (ZIP)",
+                                    id="iap-gen-all-receipts-btn",
+                                    color="secondary",
+                                    className="w-100",
+                                    style={"fontWeight": "600", "fontSize": "13px"},
+                                ),
+                            ],
+                            md=2,
+                        ),
                         dbc.Col(
                             [
                                 html.Div(id="iap-receipt-status"),
                             ],
-                            md=4,
+                            md=3,
                         ),
                     ]
                 ),
@@ -602,31 +306,12 @@ layout = html.Div(
 )
 def populate_filters(_, view_mode):
     is_fiscal = view_mode == "fiscal"
+    result = payouts("fiscal" if is_fiscal else "calendar")
+    app_opts = [{"label": n, "value": n} for n in result["apps"]]
 
     if is_fiscal:
-        # Fiscal mode: use Financial Reports data
-        fiscal_raw = _load_apple_financial()
-        google_raw = _load_google_monthly()
-        fee_lookup = _load_fee_lookup()
-        fiscal = _compute_fiscal_breakdown(
-            fiscal_raw, fee_lookup, _load_apple_financial_refunds()
-        )
-        google = _compute_breakdown(
-            google_raw, fee_lookup, GOOGLE_FEE_PCT, "Google", _load_google_refunds()
-        )
-        combined = pd.concat([fiscal, google], ignore_index=True)
-
-        app_opts = (
-            [
-                {"label": n, "value": n}
-                for n in sorted(combined["application_name"].unique())
-            ]
-            if not combined.empty
-            else []
-        )
-
         # Build fiscal period dropdown
-        periods = _load_fiscal_periods()
+        periods = load_fiscal_periods()
         if not periods.empty:
             period_opts = [{"label": "All Periods", "value": "All Periods"}]
             for _, row in periods.iterrows():
@@ -647,31 +332,7 @@ def populate_filters(_, view_mode):
 
         return app_opts, period_opts, default_val, app_opts
     else:
-        # Calendar mode: unchanged
-        apple_raw = _load_apple_monthly()
-        google_raw = _load_google_monthly()
-        fee_lookup = _load_fee_lookup()
-        apple = _compute_breakdown(
-            apple_raw, fee_lookup, APPLE_FEE_PCT, "Apple", _load_apple_refunds()
-        )
-        google = _compute_breakdown(
-            google_raw, fee_lookup, GOOGLE_FEE_PCT, "Google", _load_google_refunds()
-        )
-        combined = pd.concat([apple, google], ignore_index=True)
-
-        app_opts = (
-            [
-                {"label": n, "value": n}
-                for n in sorted(combined["application_name"].unique())
-            ]
-            if not combined.empty
-            else []
-        )
-        months = (
-            sorted(combined["month"].unique(), reverse=True)
-            if not combined.empty
-            else []
-        )
+        months = result["months"]
         month_opts = [{"label": "All Months", "value": "All Months"}] + [
             {"label": m, "value": m} for m in months
         ]
@@ -694,48 +355,19 @@ def populate_filters(_, view_mode):
 )
 def update_iap(selected_apps, platform_filter, selected_month, view_mode):
     is_fiscal = view_mode == "fiscal"
-    fee_lookup = _load_fee_lookup()
-
-    # ── Load data based on view mode ──
-    if is_fiscal:
-        fiscal_raw = _load_apple_financial()
-        fiscal_refunds = _load_apple_financial_refunds()
-        apple = _compute_fiscal_breakdown(fiscal_raw, fee_lookup, fiscal_refunds)
-    else:
-        apple_raw = _load_apple_monthly()
-        apple = _compute_breakdown(
-            apple_raw, fee_lookup, APPLE_FEE_PCT, "Apple", _load_apple_refunds()
-        )
+    result = payouts("fiscal" if is_fiscal else "calendar")
 
-    google_raw = _load_google_monthly()
-    # Normalise Google names to Apple casing
-    apple_names = apple["application_name"].unique() if not apple.empty else []
-    _canon = {n.lower(): n for n in apple_names if n}
-    for _df in [google_raw]:
-        if not _df.empty and "application_name" in _df.columns:
-            _df["application_name"] = _df["application_name"].apply(
-                lambda x: _canon.get(x.lower(), x) if isinstance(x, str) else x
-            )
-    google = _compute_breakdown(
-        google_raw, fee_lookup, GOOGLE_FEE_PCT, "Google", _load_google_refunds()
-    )
-    combined = pd.concat([apple, google], ignore_index=True)
-
-    if combined.empty:
+    if result["table"].empty:
         empty = _empty_fig("No IAP data")
         no_data = html.P("No data", style={"color": NEUTRAL})
         return [], empty, no_data, no_data, empty, None, None
 
-    df_all = combined.copy()
-    if selected_apps:
-        df_all = df_all[df_all["application_name"].isin(selected_apps)]
-    if platform_filter != "All":
-        df_all = df_all[df_all["platform"] == platform_filter]
+    df_all = select(result, apps=selected_apps, platform=platform_filter)
 
     # ── Resolve effective month filter ──
     if is_fiscal and selected_month and selected_month.startswith("fiscal:"):
         fp = selected_month.split(":")[1]
-        filter_month = _fiscal_to_apple_month(fp)
+        filter_month = fiscal_to_apple_month(fp)
     elif is_fiscal:
         filter_month = None  # All Periods
     elif selected_month and selected_month != "All Months":
@@ -743,14 +375,11 @@ def update_iap(selected_apps, platform_filter, selected_month, view_mode):
     else:
         filter_month = None  # All Months
 
-    df_trend = df_all.copy()
-    df = df_all.copy()
+    df_trend = df_all
     actual_month = filter_month
-    if filter_month:
-        df = df[df["month"] == filter_month]
-    elif not df.empty:
-        actual_month = sorted(df["month"].unique(), reverse=True)[0]
-        df = df[df["month"] == actual_month]
+    if not filter_month and not df_all.empty:
+        actual_month = df_all["month"].max()
+    df = select(result, month=actual_month, apps=selected_apps, platform=platform_filter)
 
     if df.empty:
         empty = _empty_fig("No data for selected filters")
@@ -1089,7 +718,7 @@ def update_iap(selected_apps, platform_filter, selected_month, view_mode):
     # ── Fiscal banner ──
     banner_content = None
     if is_fiscal and actual_month:
-        periods = _load_fiscal_periods()
+        periods = load_fiscal_periods()
         fp_match = periods[periods["apple_month"] == actual_month]
         if not fp_match.empty:
             row = fp_match.iloc[0]
@@ -1098,7 +727,7 @@ def update_iap(selected_apps, platform_filter, selected_month, view_mode):
                 end_str = pd.to_datetime(row["period_end"]).strftime("%b %d, %Y")
             except Exception:
                 start_str, end_str = "?", "?"
-            due_date = _compute_payment_due_date(actual_month)
+            due_date = payment_due_date(actual_month)
             y, m = int(actual_month[:4]), int(actual_month[5:7])
             banner_content = dbc.Alert(
                 [
@@ -1157,303 +786,38 @@ def generate_receipt(n_clicks, selected_app, selected_month, view_mode):
             },
         )
 
-    is_fiscal = view_mode == "fiscal"
+    view = "fiscal" if view_mode == "fiscal" else "calendar"
 
     try:
-        fee_lookup = _load_fee_lookup()
-
-        if is_fiscal:
-            # ── Fiscal mode: settlement data ──
-            fiscal_raw = _load_apple_financial()
-            fiscal_refunds = _load_apple_financial_refunds()
-            fiscal = _compute_fiscal_breakdown(fiscal_raw, fee_lookup, fiscal_refunds)
-
-            # Determine fiscal period
-            if selected_month and selected_month.startswith("fiscal:"):
-                fp = selected_month.split(":")[1]
-            elif not fiscal.empty:
-                fp = sorted(fiscal["fiscal_period"].unique(), reverse=True)[0]
-            else:
-                return no_update, html.Span(
-                    "No fiscal data available.",
-                    style={"color": NEUTRAL, "fontSize": "12px"},
-                )
-
-            apple_month = _fiscal_to_apple_month(fp)
-
-            # Filter Apple data
-            app_fiscal = fiscal[
-                (fiscal["application_name"] == selected_app)
-                & (fiscal["fiscal_period"] == fp)
-            ]
-            if app_fiscal.empty:
-                return no_update, html.Span(
-                    f"No settlement data for {selected_app} in fiscal period {fp}.",
-                    style={
-                        "color": NEUTRAL,
-                        "fontSize": "12px",
-                        "marginTop": "28px",
-                        "display": "block",
-                    },
-                )
-
-            a_sales = float(app_fiscal["sales"].sum())
-            a_units = int(app_fiscal["total_units"].sum())
-            a_pf = float(app_fiscal["platform_fee"].sum())
-            a_pf_pct = round(a_pf / a_sales * 100, 1) if a_sales > 0 else 0.0
-            a_ref = float(app_fiscal["refund_amount"].sum())
-            kliq_pct = float(app_fiscal["kliq_fee_pct"].iloc[0])
-
-            # Google data for same month
-            google_raw = _load_google_monthly()
-            _canon = {n.lower(): n for n in fiscal_raw["application_name"].unique() if n}
-            for _df in [google_raw]:
-                if not _df.empty and "application_name" in _df.columns:
-                    _df["application_name"] = _df["application_name"].apply(
-                        lambda x: _canon.get(x.lower(), x) if isinstance(x, str) else x
-                    )
-            google = _compute_breakdown(
-                google_raw, fee_lookup, GOOGLE_FEE_PCT, "Google", _load_google_refunds()
-            )
-            g_row = google[
-                (google["application_name"] == selected_app)
-                & (google["month"] == apple_month)
-            ]
-            g_sales = float(g_row["sales"].sum()) if not g_row.empty else 0.0
-            g_units = int(g_row["total_units"].sum()) if not g_row.empty else 0
-            g_ref = float(g_row["refund_amount"].sum()) if not g_row.empty else 0.0
-            g_payout = float(g_row["payout"].sum()) if not g_row.empty else 0.0
-
-            total_payout = float(app_fiscal["payout"].sum()) + g_payout
-
-            # Period info
-            periods = _load_fiscal_periods()
-            pr = periods[periods["fiscal_period"] == fp]
-            try:
-                period_start_str = pd.to_datetime(pr.iloc[0]["period_start"]).strftime(
-                    "%b %d, %Y"
-                )
-                period_end_str = pd.to_datetime(pr.iloc[0]["period_end"]).strftime(
-                    "%b %d, %Y"
-                )
-            except Exception:
-                period_start_str, period_end_str = "", ""
-            due_date = _compute_payment_due_date(apple_month)
-
-            # Product details (fiscal)
-            fiscal_products = _load_apple_financial_product_details()
-            google_products = _load_google_product_details()
-            for _df in [google_products]:
-                if not _df.empty and "application_name" in _df.columns:
-                    _df["application_name"] = _df["application_name"].apply(
-                        lambda x: _canon.get(x.lower(), x) if isinstance(x, str) else x
-                    )
-
-            prod_rows = []
-            if not fiscal_products.empty:
-                filt = fiscal_products[
-                    (fiscal_products["application_name"] == selected_app)
-                    & (fiscal_products["fiscal_period"] == fp)
-                ]
-                for _, r in filt.sort_values("revenue_usd", ascending=False).iterrows():
-                    prod_rows.append(
-                        {
-                            "platform": "Apple",
-                            "product_name": r.get("product_name", "—"),
-                            "sub_type": "—",
-                            "period": "—",
-                            "units": int(r.get("units", 0)),
-                            "revenue_usd": float(r.get("revenue_usd", 0)),
-                        }
-                    )
-            if not google_products.empty:
-                filt = google_products[
-                    (google_products["application_name"] == selected_app)
-                    & (google_products["month"] == apple_month)
-                ]
-                for _, r in filt.sort_values("revenue_usd", ascending=False).iterrows():
-                    prod_rows.append(
-                        {
-                            "platform": "Google",
-                            "product_name": r.get("product_name", "—"),
-                            "sub_type": r.get("sub_type", "—"),
-                            "period": r.get("period", "—"),
-                            "units": int(r.get("units", 0)),
-                            "revenue_usd": float(r.get("revenue_usd", 0)),
-                        }
-                    )
-
-            pdf_bytes = generate_receipt_pdf(
-                app_name=selected_app,
-                month=apple_month,
-                apple_sales=a_sales,
-                apple_units=a_units,
-                google_sales=g_sales,
-                google_units=g_units,
-                kliq_fee_pct=kliq_pct,
-                total_payout=total_payout,
-                apple_refunds=a_ref,
-                google_refunds=g_ref,
-                product_details=prod_rows if prod_rows else None,
-                is_fiscal=True,
-                fiscal_period=fp,
-                period_start=period_start_str,
-                period_end=period_end_str,
-                apple_platform_fee=a_pf,
-                apple_platform_fee_pct=a_pf_pct,
-                payment_due_date=due_date,
-            )
-
-            safe_name = selected_app.replace(" ", "_").replace("/", "_")
-            filename = f"KLIQ_Settlement_{safe_name}_{fp}.pdf"
-            status = html.Span(
-                f"✅ Settlement receipt for {selected_app} (Fiscal {fp})",
-                style={
-                    "color": GREEN,
-                    "fontSize": "12px",
-                    "fontWeight": "600",
-                    "marginTop": "28px",
-                    "display": "block",
-                },
-            )
-            return dcc.send_bytes(pdf_bytes, filename), status
-
-        else:
-            # ── Calendar mode: unchanged ──
-            apple_raw = _load_apple_monthly()
-            google_raw = _load_google_monthly()
-            apple_refunds = _load_apple_refunds()
-            google_refunds = _load_google_refunds()
-
-            _canon = {n.lower(): n for n in apple_raw["application_name"].unique() if n}
-            for _df in [google_raw, google_refunds]:
-                if not _df.empty and "application_name" in _df.columns:
-                    _df["application_name"] = _df["application_name"].apply(
-                        lambda x: _canon.get(x.lower(), x) if isinstance(x, str) else x
-                    )
-
-            apple = _compute_breakdown(
-                apple_raw, fee_lookup, APPLE_FEE_PCT, "Apple", apple_refunds
-            )
-            google = _compute_breakdown(
-                google_raw, fee_lookup, GOOGLE_FEE_PCT, "Google", google_refunds
+        period = resolve_period(view, selected_month)
+        if period is None:
+            raise LookupError(
+                "No fiscal data available." if view == "fiscal" else "No data available."
             )
-            combined = pd.concat([apple, google], ignore_index=True)
-
-            actual_month = selected_month
-            if not selected_month or selected_month == "All Months":
-                if not combined.empty:
-                    actual_month = sorted(combined["month"].unique(), reverse=True)[0]
-                else:
-                    return no_update, html.Span(
-                        "No data available.",
-                        style={"color": NEUTRAL, "fontSize": "12px"},
-                    )
-
-            month_data = combined[
-                (combined["application_name"] == selected_app)
-                & (combined["month"] == actual_month)
-            ]
-            if month_data.empty:
-                return no_update, html.Span(
-                    f"No data for {selected_app} in {actual_month}.",
-                    style={
-                        "color": NEUTRAL,
-                        "fontSize": "12px",
-                        "marginTop": "28px",
-                        "display": "block",
-                    },
-                )
-
-            apple_row = month_data[month_data["platform"] == "Apple"]
-            google_row = month_data[month_data["platform"] == "Google"]
-            apple_sales = (
-                float(apple_row["sales"].sum()) if not apple_row.empty else 0.0
-            )
-            apple_units = (
-                int(apple_row["total_units"].sum()) if not apple_row.empty else 0
-            )
-            google_sales = (
-                float(google_row["sales"].sum()) if not google_row.empty else 0.0
-            )
-            google_units = (
-                int(google_row["total_units"].sum()) if not google_row.empty else 0
-            )
-            kliq_pct = (
-                float(month_data["kliq_fee_pct"].iloc[0])
-                if not month_data.empty
-                else 0.0
-            )
-            total_payout = float(month_data["payout"].sum())
-            apple_ref = (
-                float(apple_row["refund_amount"].sum()) if not apple_row.empty else 0.0
-            )
-            google_ref = (
-                float(google_row["refund_amount"].sum())
-                if not google_row.empty
-                else 0.0
-            )
-
-            apple_products = _load_apple_product_details()
-            google_products = _load_google_product_details()
-            for _df in [google_products]:
-                if not _df.empty and "application_name" in _df.columns:
-                    _df["application_name"] = _df["application_name"].apply(
-                        lambda x: _canon.get(x.lower(), x) if isinstance(x, str) else x
-                    )
-
-            prod_rows = []
-            for src, plat in [
-                (apple_products, "Apple"),
-                (google_products, "Google"),
-            ]:
-                if src is not None and not src.empty:
-                    filt = src[
-                        (src["application_name"] == selected_app)
-                        & (src["month"] == actual_month)
-                    ]
-                    for _, pr in filt.sort_values(
-                        "revenue_usd", ascending=False
-                    ).iterrows():
-                        prod_rows.append(
-                            {
-                                "platform": plat,
-                                "product_name": pr.get("product_name", "—"),
-                                "sub_type": pr.get("sub_type", "—"),
-                                "period": pr.get("period", "—"),
-                                "units": int(pr.get("units", 0)),
-                                "revenue_usd": float(pr.get("revenue_usd", 0)),
-                            }
-                        )
-
-            pdf_bytes = generate_receipt_pdf(
-                app_name=selected_app,
-                month=actual_month,
-                apple_sales=apple_sales,
-                apple_units=apple_units,
-                google_sales=google_sales,
-                google_units=google_units,
-                kliq_fee_pct=kliq_pct,
-                total_payout=total_payout,
-                apple_refunds=apple_ref,
-                google_refunds=google_ref,
-                product_details=prod_rows if prod_rows else None,
-            )
-
-            safe_name = selected_app.replace(" ", "_").replace("/", "_")
-            filename = f"KLIQ_Receipt_{safe_name}_{actual_month}.pdf"
-            status = html.Span(
-                f"✅ Receipt generated for {selected_app} ({actual_month})",
-                style={
-                    "color": GREEN,
-                    "fontSize": "12px",
-                    "fontWeight": "600",
-                    "marginTop": "28px",
-                    "display": "block",
-                },
-            )
-            return dcc.send_bytes(pdf_bytes, filename), status
+        spec = receipt_spec(view, selected_app, period)
+        pdf_bytes = generate_receipt_pdf(**spec["pdf_args"])
+        status = html.Span(
+            f"✅ {spec['title']}",
+            style={
+                "color": GREEN,
+                "fontSize": "12px",
+                "fontWeight": "600",
+                "marginTop": "28px",
+                "display": "block",
+            },
+        )
+        return dcc.send_bytes(pdf_bytes, spec["filename"]), status
 
+    except LookupError as e:
+        return no_update, html.Span(
+            str(e.args[0]),
+            style={
+                "color": NEUTRAL,
+                "fontSize": "12px",
+                "marginTop": "28px",
+                "display": "block",
+            },
+        )
     except Exception as e:
         return no_update, html.Span(
             f"❌ Error: {str(e)[:100]}",
@@ -1466,6 +830,41 @@ def generate_receipt(n_clicks, selected_app, selected_month, view_mode):
         )
 
 
+@callback(
+    Output("iap-receipt-download", "data", allow_duplicate=True),
+    Output("iap-receipt-status", "children", allow_duplicate=True),
+    Input("iap-gen-all-receipts-btn", "n_clicks"),
+    State("iap-month", "value"),
+    State("iap-view-toggle", "value"),
+    prevent_initial_call=True,
+)
+def generate_all_receipts(n_clicks, selected_month, view_mode):
+    if not n_clicks:
+        return no_update, no_update
+
+    view = "fiscal" if view_mode == "fiscal" else "calendar"
+    style = {"fontSize": "12px", "marginTop": "28px", "display": "block"}
+
+    try:
+        period = resolve_period(view, selected_month)
+        if period is None:
+            raise LookupError("No data available.")
+        zip_bytes, filename, stats = batch_receipts_zip(view, period)
+        status = html.Span(
+            f"✅ {stats['receipts']} receipts for {period} "
+            f"({stats['per_second']:.1f}/s)",
+            style={"color": GREEN, "fontWeight": "600", **style},
+        )
+        return dcc.send_bytes(zip_bytes, filename), status
+
+    except LookupError as e:
+        return no_update, html.Span(str(e.args[0]), style={"color": NEUTRAL, **style})
+    except Exception as e:
+        return no_update, html.Span(
+            f"❌ Error: {str(e)[:100]}", style={"color": "#DC2626", **style}
+        )
+
+
 @callback(
     Output("iap-product-details", "children"),
     Input("iap-app-filter", "value"),
@@ -1476,80 +875,23 @@ def generate_receipt(n_clicks, selected_app, selected_month, view_mode):
 def update_product_details(selected_apps, platform_filter, selected_month, view_mode):
     is_fiscal = view_mode == "fiscal"
     try:
-        if is_fiscal:
-            apple_products = _load_apple_financial_product_details()
-            if not apple_products.empty:
-                apple_products["sub_type"] = "—"
-                apple_products["period"] = "—"
-                apple_products["month"] = apple_products["apple_month"]
-        else:
-            apple_products = _load_apple_product_details()
-
-        google_products = _load_google_product_details()
-
-        # Normalise Google names
-        apple_names = (
-            apple_products["application_name"].unique()
-            if not apple_products.empty
-            else []
-        )
-        _canon = {n.lower(): n for n in apple_names if n}
-        for _df in [google_products]:
-            if not _df.empty and "application_name" in _df.columns:
-                _df["application_name"] = _df["application_name"].apply(
-                    lambda x: _canon.get(x.lower(), x) if isinstance(x, str) else x
-                )
+        result = products("fiscal" if is_fiscal else "calendar")
 
         # Determine actual month
         if is_fiscal and selected_month and selected_month.startswith("fiscal:"):
             fp = selected_month.split(":")[1]
-            actual_month = _fiscal_to_apple_month(fp)
+            actual_month = fiscal_to_apple_month(fp)
         elif selected_month and selected_month not in ("All Months", "All Periods"):
             actual_month = selected_month
+        elif result["months"]:
+            actual_month = result["months"][0]
         else:
-            all_months = set()
-            if not apple_products.empty:
-                all_months.update(apple_products["month"].unique())
-            if not google_products.empty:
-                all_months.update(google_products["month"].unique())
-            if all_months:
-                actual_month = sorted(all_months, reverse=True)[0]
-            else:
-                return html.P("No product data available.", style={"color": NEUTRAL})
+            return html.P("No product data available.", style={"color": NEUTRAL})
 
-        # Filter by month
-        ap = (
-            apple_products[apple_products["month"] == actual_month].copy()
-            if not apple_products.empty
-            else pd.DataFrame()
-        )
-        gp = (
-            google_products[google_products["month"] == actual_month].copy()
-            if not google_products.empty
-            else pd.DataFrame()
+        all_prods = select(
+            result, month=actual_month, apps=selected_apps, platform=platform_filter
         )
 
-        # Filter by selected apps
-        if selected_apps:
-            if not ap.empty:
-                ap = ap[ap["application_name"].isin(selected_apps)]
-            if not gp.empty:
-                gp = gp[gp["application_name"].isin(selected_apps)]
-
-        # Filter by platform
-        if platform_filter == "Apple":
-            gp = pd.DataFrame()
-        elif platform_filter == "Google":
-            ap = pd.DataFrame()
-
-        # Tag and combine
-        if not ap.empty:
-            ap["platform"] = "Apple"
-        if not gp.empty:
-            gp["platform"] = "Google"
-
-        all_prods = pd.concat([ap, gp], ignore_index=True)
-
         if all_prods.empty:
             return html.P(
                 f"No product details for {actual_month}.", style={"color": NEUTRAL}
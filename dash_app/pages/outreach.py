@@ -88,7 +88,7 @@ try:
     from sequences import render_sms, render_email, SMS_TEMPLATES, EMAIL_CONFIG
     from email_sender import send_email
     from sms_sender import send_sms
-    from cheat_sheet import generate_cheat_sheet
+    from cheat_sheet import cheat_sheet_path
     from task_progress import get_task_progress
     import autopilot as _autopilot
     from gsheet_leads import (
@@ -3303,7 +3303,7 @@ def send_individual_email(n_clicks, btn_id):
 
         attachment_path = None
         if tpl_key == "cheat_sheet":
-            attachment_path = generate_cheat_sheet(enriched)
+            attachment_path = cheat_sheet_path(enriched)
 
         msg_id = send_email(
             to_email=email,
@@ -3503,9 +3503,7 @@ def generate_cheatsheet(n_clicks, app_id_str):
             )
 
         enriched = _enrich_prospect(prospect)
-        pdf_path = generate_cheat_sheet(enriched)
-
-        with open(pdf_path, "rb") as f:
+        with open(cheat_sheet_path(enriched), "rb") as f:
             pdf_bytes = f.read()
 
         name = prospect.get("name", "coach").replace(" ", "_")
@@ -0,0 +1,668 @@
+"""
+IAP Payout Engine
+Computes the (app × month × platform) payout breakdown — sales, platform fee,
+KLIQ fee, refunds and coach payout — once per data generation and memoises
+it as a columnar table. The IAP Payouts page and batch receipts slice it.
+"""
+
+import threading
+from calendar import month_name as _month_name
+
+import pandas as pd
+
+from data import query as run_query, _cached_query, T, app_keys, cache_generation
+
+APPLE_FEE_PCT = 30.0
+GOOGLE_FEE_PCT = 30.0
+
+
+def fiscal_to_apple_month(fiscal_period):
+    """Convert Apple fiscal period (e.g. '2026-03') to calendar month ('2025-12')."""
+    fy = int(fiscal_period[:4])
+    fm = int(fiscal_period[5:7])
+    if fm <= 3:
+        return f"{fy - 1}-{fm + 9:02d}"
+    return f"{fy}-{fm - 3:02d}"
+
+
+def payment_due_date(apple_month):
+    """KLIQ pays coaches 2 months after Apple's fiscal month."""
+    y, m = int(apple_month[:4]), int(apple_month[5:7])
+    m += 2
+    if m > 12:
+        m -= 12
+        y += 1
+    return f"{_month_name[m]} {y}"
+
+
+def _load_apple_monthly():
+    """Load Apple monthly revenue from Sales Reports (calendar months).
+    Uses customer_price_usd / developer_proceeds_usd pre-computed with
+    ECB historical rates via frankfurter.app at ingestion time."""
+    return _cached_query(
+        "iap_apple_monthly",
+        lambda: run_query(
+            f"""
+    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
+    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
+           FORMAT_DATE("%Y-%m", s.report_date) AS month,
+           SUM(SAFE_CAST(s.units AS INT64)) AS total_units,
+           ROUND(SUM(SAFE_CAST(s.customer_price_usd AS FLOAT64) * SAFE_CAST(s.units AS INT64)), 2) AS sales,
+           ROUND(SUM(SAFE_CAST(s.developer_proceeds_usd AS FLOAT64) * SAFE_CAST(s.units AS INT64)), 2) AS proceeds
+    FROM {T('d1_appstore_sales')} s
+    LEFT JOIN sku_map m ON s.sku = m.product_id
+    WHERE s.product_type_identifier IN ('IA1', 'IAY')
+      AND SAFE_CAST(s.customer_price_usd AS FLOAT64) > 0
+    GROUP BY application_name, month ORDER BY application_name, month
+    """
+        ),
+    )
+
+
+def _load_google_monthly():
+    return _cached_query(
+        "iap_google_monthly",
+        lambda: run_query(
+            f"""
+    SELECT e.application_name, e.month, COUNT(*) AS total_units,
+           ROUND(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64)), 2) AS sales,
+           ROUND(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64)) * 0.70, 2) AS proceeds
+    FROM {T('d1_google_earnings')} e
+    WHERE e.transaction_type = 'Charge' AND e.application_name IS NOT NULL
+    GROUP BY e.application_name, e.month ORDER BY e.application_name, e.month
+    """
+        ),
+    )
+
+
+def _load_apple_refunds():
+    return _cached_query(
+        "iap_apple_refunds",
+        lambda: run_query(
+            f"""
+    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
+    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
+           FORMAT_DATE("%Y-%m", s.report_date) AS month,
+           ABS(SUM(SAFE_CAST(s.units AS INT64))) AS refund_units,
+           ROUND(ABS(SUM(SAFE_CAST(s.customer_price_usd AS FLOAT64) * SAFE_CAST(s.units AS INT64))), 2) AS refund_amount
+    FROM {T('d1_appstore_sales')} s LEFT JOIN sku_map m ON s.sku = m.product_id
+    WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(s.units AS INT64) < 0
+    GROUP BY 1, 2 ORDER BY 1, 2
+    """
+        ),
+    )
+
+
+def _load_google_refunds():
+    return _cached_query(
+        "iap_google_refunds",
+        lambda: run_query(
+            f"""
+    SELECT e.application_name, e.month, COUNT(*) AS refund_units,
+           ROUND(ABS(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64))), 2) AS refund_amount
+    FROM {T('d1_google_earnings')} e
+    WHERE e.transaction_type = 'Charge refund' AND e.application_name IS NOT NULL
+    GROUP BY 1, 2 ORDER BY 1, 2
+    """
+        ),
+    )
+
+
+def _load_fee_lookup():
+    return _cached_query(
+        "iap_fee_lookup",
+        lambda: run_query(
+            f"SELECT application_name, kliq_fee_pct FROM {T('d1_app_fee_lookup')}"
+        ),
+    )
+
+
+def _load_apple_product_details():
+    return _cached_query(
+        "iap_apple_product_details",
+        lambda: run_query(
+            f"""
+    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
+    SELECT
+        COALESCE(m.application_name, 'Unknown') AS application_name,
+        FORMAT_DATE("%Y-%m", s.report_date) AS month,
+        s.sku AS product_id,
+        s.title AS product_name,
+        s.subscription AS sub_type,
+        s.period,
+        SUM(SAFE_CAST(s.units AS INT64)) AS units,
+        ROUND(SUM(SAFE_CAST(s.customer_price_usd AS FLOAT64)
+              * SAFE_CAST(s.units AS INT64)), 2) AS revenue_usd
+    FROM {T('d1_appstore_sales')} s
+    LEFT JOIN sku_map m ON s.sku = m.product_id
+    WHERE s.product_type_identifier IN ('IA1', 'IAY')
+      AND SAFE_CAST(s.units AS INT64) > 0
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ORDER BY 1, 2, revenue_usd DESC
+    """
+        ),
+    )
+
+
+def _load_google_product_details():
+    return _cached_query(
+        "iap_google_product_details",
+        lambda: run_query(
+            f"""
+    SELECT
+        e.application_name,
+        e.month,
+        e.sku_id AS product_id,
+        e.product_title AS product_name,
+        'Purchase' AS sub_type,
+        CASE
+            WHEN LOWER(e.sku_id) LIKE '%monthly%' OR LOWER(e.sku_id) LIKE '%month%' THEN '1 Month'
+            WHEN LOWER(e.sku_id) LIKE '%quarterly%' OR LOWER(e.sku_id) LIKE '%quarter%' THEN '3 Months'
+            WHEN LOWER(e.sku_id) LIKE '%sixmonth%' OR LOWER(e.sku_id) LIKE '%6month%' THEN '6 Months'
+            WHEN LOWER(e.sku_id) LIKE '%yearly%' OR LOWER(e.sku_id) LIKE '%year%' OR LOWER(e.sku_id) LIKE '%annual%' THEN '1 Year'
+            ELSE 'Other'
+        END AS period,
+        COUNT(*) AS units,
+        ROUND(SUM(SAFE_CAST(e.amount_buyer_usd AS FLOAT64)), 2) AS revenue_usd
+    FROM {T('d1_google_earnings')} e
+    WHERE e.transaction_type = 'Charge'
+      AND e.application_name IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ORDER BY 1, 2, revenue_usd DESC
+    """
+        ),
+    )
+
+
+# ── Apple Financial Reports (settlement / fiscal period) loaders ──
+
+
+def _load_apple_financial():
+    """Load Apple Financial Reports settlement data grouped by app + fiscal period."""
+    return _cached_query(
+        "iap_apple_financial",
+        lambda: run_query(
+            f"""
+    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
+    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
+           f.apple_month, f.fiscal_period,
+           MIN(f.period_start) AS period_start,
+           MAX(f.period_end) AS period_end,
+           SUM(SAFE_CAST(f.quantity AS INT64)) AS total_units,
+           ROUND(SUM(f.gross_revenue_usd), 2) AS sales,
+           ROUND(SUM(f.extended_partner_share_usd), 2) AS proceeds
+    FROM {T('d1_appstore_financial')} f
+    LEFT JOIN sku_map m ON f.vendor_identifier = m.product_id
+    WHERE f.product_type_identifier IN ('IA1', 'IAY')
+      AND UPPER(f.sales_or_return) = 'S'
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2
+    """
+        ),
+    )
+
+
+def _load_apple_financial_refunds():
+    """Load refunds from Apple Financial Reports."""
+    return _cached_query(
+        "iap_apple_financial_refunds",
+        lambda: run_query(
+            f"""
+    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
+    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
+           f.apple_month, f.fiscal_period,
+           ABS(SUM(SAFE_CAST(f.quantity AS INT64))) AS refund_units,
+           ROUND(ABS(SUM(f.gross_revenue_usd)), 2) AS refund_amount
+    FROM {T('d1_appstore_financial')} f
+    LEFT JOIN sku_map m ON f.vendor_identifier = m.product_id
+    WHERE f.product_type_identifier IN ('IA1', 'IAY')
+      AND UPPER(f.sales_or_return) = 'R'
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2
+    """
+        ),
+    )
+
+
+def _load_apple_financial_product_details():
+    """Load per-product details from Apple Financial Reports."""
+    return _cached_query(
+        "iap_apple_financial_product_details",
+        lambda: run_query(
+            f"""
+    WITH sku_map AS (SELECT DISTINCT product_id, application_name FROM {T('d1_inapp_products')})
+    SELECT COALESCE(m.application_name, 'Unknown') AS application_name,
+           f.apple_month, f.fiscal_period,
+           f.vendor_identifier AS product_id,
+           f.title AS product_name,
+           SUM(SAFE_CAST(f.quantity AS INT64)) AS units,
+           ROUND(SUM(f.gross_revenue_usd), 2) AS revenue_usd,
+           ROUND(SUM(f.extended_partner_share_usd), 2) AS proceeds_usd
+    FROM {T('d1_appstore_financial')} f
+    LEFT JOIN sku_map m ON f.vendor_identifier = m.product_id
+    WHERE f.product_type_identifier IN ('IA1', 'IAY')
+      AND UPPER(f.sales_or_return) = 'S'
+    GROUP BY 1, 2, 3, 4, 5
+    ORDER BY 1, 2, revenue_usd DESC
+    """
+        ),
+    )
+
+
+def load_fiscal_periods():
+    """Load distinct fiscal periods with date ranges."""
+    return _cached_query(
+        "iap_fiscal_periods",
+        lambda: run_query(
+            f"""
+    SELECT DISTINCT fiscal_period, apple_month,
+           MIN(period_start) AS period_start,
+           MAX(period_end) AS period_end
+    FROM {T('d1_appstore_financial')}
+    GROUP BY fiscal_period, apple_month
+    ORDER BY fiscal_period DESC
+    """
+        ),
+    )
+
+
+def _keyed(*frames):
+    """Copies of frames with an integer app_key, all keyed from one snapshot
+    of the application dimension so they can be joined on it."""
+    keys = app_keys(*(f["application_name"] for f in frames))
+    return [f.assign(app_key=k) for f, k in zip(frames, keys)]
+
+
+def _compute_breakdown(
+    df_platform, fee_lookup, platform_fee_pct, platform_name, refunds_df=None
+):
+    if df_platform.empty:
+        return pd.DataFrame()
+    has_refunds = refunds_df is not None and not refunds_df.empty
+    df, fees, *refunds = _keyed(
+        df_platform, fee_lookup, *([refunds_df] if has_refunds else [])
+    )
+    df = df.merge(fees.drop(columns="application_name"), on="app_key", how="left")
+    df["platform_fee_pct"] = platform_fee_pct
+    df["platform_fee"] = (df["sales"] * platform_fee_pct / 100).round(2)
+    df["proceeds"] = (df["sales"] - df["platform_fee"]).round(2)
+    df["kliq_fee_pct"] = df["kliq_fee_pct"].fillna(0)
+    df["kliq_fee"] = (df["sales"] * df["kliq_fee_pct"] / 100).round(2)
+    df["refund_amount"] = 0.0
+    df["refund_units"] = 0
+    if has_refunds:
+        ref = refunds[0].rename(
+            columns={"refund_amount": "_ref_amt", "refund_units": "_ref_units"}
+        )
+        df = df.merge(
+            ref[["app_key", "month", "_ref_amt", "_ref_units"]],
+            on=["app_key", "month"],
+            how="left",
+        )
+        df["refund_amount"] = df["_ref_amt"].fillna(0).round(2)
+        df["refund_units"] = df["_ref_units"].fillna(0).astype(int).abs()
+        df = df.drop(columns=["_ref_amt", "_ref_units"])
+    df["payout"] = (
+        df["sales"] - df["platform_fee"] - df["kliq_fee"] - df["refund_amount"]
+    ).round(2)
+    df["platform"] = platform_name
+    return df.drop(columns="app_key")
+
+
+def _compute_fiscal_breakdown(df_fiscal, fee_lookup, refunds_df=None):
+    """Compute breakdown from Apple Financial Reports.
+    Platform fee = sales - proceeds (actual Apple commission, captures 15% SBP vs 30%)."""
+    if df_fiscal.empty:
+        return pd.DataFrame()
+    has_refunds = refunds_df is not None and not refunds_df.empty
+    df, fees, *refunds = _keyed(
+        df_fiscal, fee_lookup, *([refunds_df] if has_refunds else [])
+    )
+    df = df.merge(fees.drop(columns="application_name"), on="app_key", how="left")
+    df["platform_fee"] = (df["sales"] - df["proceeds"]).round(2)
+    df["platform_fee_pct"] = (
+        (df["platform_fee"] / df["sales"] * 100).where(df["sales"] > 0, 0).round(1)
+    )
+    df["kliq_fee_pct"] = df["kliq_fee_pct"].fillna(0)
+    df["kliq_fee"] = (df["sales"] * df["kliq_fee_pct"] / 100).round(2)
+    df["refund_amount"] = 0.0
+    df["refund_units"] = 0
+    if has_refunds:
+        ref = refunds[0].rename(
+            columns={"refund_amount": "_ref_amt", "refund_units": "_ref_units"}
+        )
+        df = df.merge(
+            ref[["app_key", "fiscal_period", "_ref_amt", "_ref_units"]],
+            on=["app_key", "fiscal_period"],
+            how="left",
+        )
+        df["refund_amount"] = df["_ref_amt"].fillna(0).round(2)
+        df["refund_units"] = df["_ref_units"].fillna(0).astype(int).abs()
+        df = df.drop(columns=["_ref_amt", "_ref_units"])
+    df["payout"] = (
+        df["sales"] - df["platform_fee"] - df["kliq_fee"] - df["refund_amount"]
+    ).round(2)
+    df["platform"] = "Apple"
+    df["month"] = df["apple_month"]
+    return df.drop(columns="app_key")
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  ENGINE (memoised per data generation)
+# ═══════════════════════════════════════════════════════════════════
+
+VIEWS = ("calendar", "fiscal")
+
+# Cache keys each view is computed from; the memoised tables are rebuilt
+# when any of these entries is reloaded.
+_PAYOUT_SOURCES = {
+    "calendar": (
+        "iap_apple_monthly",
+        "iap_apple_refunds",
+        "iap_google_monthly",
+        "iap_google_refunds",
+        "iap_fee_lookup",
+    ),
+    "fiscal": (
+        "iap_apple_financial",
+        "iap_apple_financial_refunds",
+        "iap_google_monthly",
+        "iap_google_refunds",
+        "iap_fee_lookup",
+    ),
+}
+_PRODUCT_SOURCES = {
+    "calendar": ("iap_apple_product_details", "iap_google_product_details"),
+    "fiscal": ("iap_apple_financial_product_details", "iap_google_product_details"),
+}
+
+_memo = {}  # (kind, view) -> (generation, result dict)
+_memo_lock = threading.Lock()
+
+
+def _memoised(name, keys, build):
+    hit = _memo.get(name)
+    gen = cache_generation(keys)
+    if hit is not None and gen is not None and hit[0] == gen:
+        return hit[1]
+    with _memo_lock:
+        hit = _memo.get(name)
+        gen = cache_generation(keys)
+        if hit is not None and gen is not None and hit[0] == gen:
+            return hit[1]
+        result = build()
+        _memo[name] = (cache_generation(keys), result)
+        return result
+
+
+def _canonicalised(df, reference_names):
+    """Copy of df with application_name mapped case-insensitively onto the
+    casing used in reference_names (Google names follow Apple's)."""
+    if df.empty or "application_name" not in df.columns:
+        return df
+    ref = pd.Series(reference_names, dtype=object).dropna()
+    ref = ref[ref != ""]
+    canon = pd.Series(ref.to_numpy(), index=ref.str.lower()).groupby(level=0).last()
+    names = df["application_name"].astype(object)
+    mapped = names.str.lower().map(canon)
+    return df.assign(application_name=mapped.where(mapped.notna(), names))
+
+
+def _indexed(table):
+    """Sort by month and record row positions per month and per (app, month)."""
+    if table.empty:
+        return {"table": table, "months": [], "apps": [], "by_month": {}, "by_app_month": {}}
+    table = table.sort_values(
+        ["month", "application_name", "platform"], ignore_index=True
+    )
+    return {
+        "table": table,
+        "months": sorted(table["month"].dropna().unique(), reverse=True),
+        "apps": sorted(table["application_name"].dropna().unique()),
+        "by_month": table.groupby("month").indices,
+        "by_app_month": table.groupby(["application_name", "month"]).indices,
+    }
+
+
+def _build_payouts(view):
+    fee_lookup = _load_fee_lookup()
+    if view == "fiscal":
+        apple_raw = _load_apple_financial()
+        apple = _compute_fiscal_breakdown(
+            apple_raw, fee_lookup, _load_apple_financial_refunds()
+        )
+    else:
+        apple_raw = _load_apple_monthly()
+        apple = _compute_breakdown(
+            apple_raw, fee_lookup, APPLE_FEE_PCT, "Apple", _load_apple_refunds()
+        )
+    reference = apple_raw["application_name"] if not apple_raw.empty else []
+    google = _compute_breakdown(
+        _canonicalised(_load_google_monthly(), reference),
+        fee_lookup,
+        GOOGLE_FEE_PCT,
+        "Google",
+        _canonicalised(_load_google_refunds(), reference),
+    )
+    return _indexed(pd.concat([apple, google], ignore_index=True))
+
+
+def _build_products(view):
+    if view == "fiscal":
+        apple = _load_apple_financial_product_details()
+        if not apple.empty:
+            apple = apple.assign(sub_type="—", period="—", month=apple["apple_month"])
+    else:
+        apple = _load_apple_product_details()
+    reference = apple["application_name"] if not apple.empty else []
+    google = _canonicalised(_load_google_product_details(), reference)
+    parts = [
+        df.assign(platform=plat)
+        for df, plat in [(apple, "Apple"), (google, "Google")]
+        if not df.empty
+    ]
+    return _indexed(pd.concat(parts, ignore_index=True) if parts else pd.DataFrame())
+
+
+def payouts(view="calendar"):
+    """Full payout breakdown for a view ("calendar" or "fiscal").
+
+    Returns a dict: table (one row per app × month × platform, read-only),
+    months (newest first), apps, and row-position indexes by_month /
+    by_app_month used by select().
+    """
+    return _memoised(
+        ("payouts", view), _PAYOUT_SOURCES[view], lambda: _build_payouts(view)
+    )
+
+
+def products(view="calendar"):
+    """Per-product sales for a view, indexed like payouts()."""
+    return _memoised(
+        ("products", view), _PRODUCT_SOURCES[view], lambda: _build_products(view)
+    )
+
+
+def select(result, month=None, apps=None, platform=None, app=None):
+    """Rows of a payouts()/products() result for a month, app(s) and platform.
+
+    Uses the precomputed row positions for month / (app, month); apps (a
+    list) and platform are masks over that slice. Returns a new frame.
+    """
+    table = result["table"]
+    if table.empty:
+        return table.copy()
+    if app is not None and month is not None:
+        df = table.take(result["by_app_month"].get((app, month), []))
+    elif month is not None:
+        df = table.take(result["by_month"].get(month, []))
+    else:
+        df = table
+    if app is not None and month is None:
+        df = df[df["application_name"] == app]
+    if apps:
+        df = df[df["application_name"].isin(apps)]
+    if platform and platform != "All":
+        df = df[df["platform"] == platform]
+    return df.copy()
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  RECEIPTS
+# ═══════════════════════════════════════════════════════════════════
+
+
+def resolve_period(view, selected_month=None):
+    """Period a receipt covers: the selected one, else the latest with data.
+
+    Fiscal view returns the fiscal period ("2026-03"), calendar the month.
+    None when there is no data at all.
+    """
+    if view == "fiscal":
+        if selected_month and selected_month.startswith("fiscal:"):
+            return selected_month.split(":")[1]
+        table = payouts("fiscal")["table"]
+        apple = table[table["platform"] == "Apple"] if not table.empty else table
+        return (
+            sorted(apple["fiscal_period"].dropna().unique(), reverse=True)[0]
+            if not apple.empty
+            else None
+        )
+    if selected_month and selected_month != "All Months":
+        return selected_month
+    months = payouts("calendar")["months"]
+    return months[0] if months else None
+
+
+def _product_rows(view, app_name, month, fiscal_period=None):
+    rows = select(products(view), month=month, app=app_name)
+    if fiscal_period is not None and "fiscal_period" in rows.columns:
+        rows = rows[(rows["platform"] != "Apple") | (rows["fiscal_period"] == fiscal_period)]
+    out = []
+    for plat in ("Apple", "Google"):
+        part = rows[rows["platform"] == plat].sort_values("revenue_usd", ascending=False)
+        for r in part.to_dict("records"):
+            out.append(
+                {
+                    "platform": plat,
+                    "product_name": r.get("product_name", "—"),
+                    "sub_type": r.get("sub_type", "—"),
+                    "period": r.get("period", "—"),
+                    "units": int(r.get("units", 0)),
+                    "revenue_usd": float(r.get("revenue_usd", 0)),
+                }
+            )
+    return out or None
+
+
+def receipt_spec(view, app_name, period):
+    """Arguments for receipt_generator.generate_receipt_pdf for one app/period.
+
+    Returns {"pdf_args", "filename", "title"}; raises LookupError with a
+    user-facing message when the app has no data for the period.
+    """
+    if view == "fiscal":
+        apple_month = fiscal_to_apple_month(period)
+        rows = select(payouts("fiscal"), month=apple_month, app=app_name)
+        apple = rows[(rows["platform"] == "Apple") & (rows["fiscal_period"] == period)]
+        if apple.empty:
+            raise LookupError(
+                f"No settlement data for {app_name} in fiscal period {period}."
+            )
+        google = rows[rows["platform"] == "Google"]
+        a_sales = float(apple["sales"].sum())
+        a_pf = float(apple["platform_fee"].sum())
+
+        fp = load_fiscal_periods()
+        fp = fp[fp["fiscal_period"] == period] if not fp.empty else fp
+        try:
+            period_start = pd.to_datetime(fp.iloc[0]["period_start"]).strftime("%b %d, %Y")
+            period_end = pd.to_datetime(fp.iloc[0]["period_end"]).strftime("%b %d, %Y")
+        except Exception:
+            period_start, period_end = "", ""
+
+        pdf_args = dict(
+            app_name=app_name,
+            month=apple_month,
+            apple_sales=a_sales,
+            apple_units=int(apple["total_units"].sum()),
+            google_sales=float(google["sales"].sum()),
+            google_units=int(google["total_units"].sum()),
+            kliq_fee_pct=float(apple["kliq_fee_pct"].iloc[0]),
+            total_payout=float(apple["payout"].sum()) + float(google["payout"].sum()),
+            apple_refunds=float(apple["refund_amount"].sum()),
+            google_refunds=float(google["refund_amount"].sum()),
+            product_details=_product_rows("fiscal", app_name, apple_month, period),
+            is_fiscal=True,
+            fiscal_period=period,
+            period_start=period_start,
+            period_end=period_end,
+            apple_platform_fee=a_pf,
+            apple_platform_fee_pct=round(a_pf / a_sales * 100, 1) if a_sales > 0 else 0.0,
+            payment_due_date=payment_due_date(apple_month),
+        )
+        safe_name = app_name.replace(" ", "_").replace("/", "_")
+        return {
+            "pdf_args": pdf_args,
+            "filename": f"KLIQ_Settlement_{safe_name}_{period}.pdf",
+            "title": f"Settlement receipt for {app_name} (Fiscal {period})",
+        }
+
+    rows = select(payouts("calendar"), month=period, app=app_name)
+    if rows.empty:
+        raise LookupError(f"No data for {app_name} in {period}.")
+    apple = rows[rows["platform"] == "Apple"]
+    google = rows[rows["platform"] == "Google"]
+    pdf_args = dict(
+        app_name=app_name,
+        month=period,
+        apple_sales=float(apple["sales"].sum()),
+        apple_units=int(apple["total_units"].sum()),
+        google_sales=float(google["sales"].sum()),
+        google_units=int(google["total_units"].sum()),
+        kliq_fee_pct=float(rows["kliq_fee_pct"].iloc[0]),
+        total_payout=float(rows["payout"].sum()),
+        apple_refunds=float(apple["refund_amount"].sum()),
+        google_refunds=float(google["refund_amount"].sum()),
+        product_details=_product_rows("calendar", app_name, period),
+    )
+    safe_name = app_name.replace(" ", "_").replace("/", "_")
+    return {
+        "pdf_args": pdf_args,
+        "filename": f"KLIQ_Receipt_{safe_name}_{period}.pdf",
+        "title": f"Receipt generated for {app_name} ({period})",
+    }
+
+
+def batch_receipt_specs(view, period):
+    """receipt_spec() for every app with payout data in the period."""
+    if view == "fiscal":
+        table = select(payouts("fiscal"), month=fiscal_to_apple_month(period))
+        table = table[(table["platform"] == "Apple") & (table["fiscal_period"] == period)]
+    else:
+        table = select(payouts("calendar"), month=period)
+    specs = []
+    for app_name in sorted(table["application_name"].dropna().unique()):
+        try:
+            specs.append(receipt_spec(view, app_name, period))
+        except LookupError:
+            continue
+    return specs
+
+
+def batch_receipts_zip(view, period, workers=None):
+    """All receipts for a payout period as one ZIP.
+
+    Returns (zip bytes, filename, stats) — stats from
+    receipt_generator.render_receipts_zip (receipts, seconds, per_second).
+    """
+    from receipt_generator import render_receipts_zip
+
+    specs = batch_receipt_specs(view, period)
+    if not specs:
+        raise LookupError(f"No payout data for {period}.")
+    data, stats = render_receipts_zip(
+        [(s["filename"], s["pdf_args"]) for s in specs], workers=workers
+    )
+    kind = "Settlements" if view == "fiscal" else "Receipts"
+    return data, f"KLIQ_{kind}_{period}.zip", stats
@@ -5,8 +5,15 @@ Based on Template LWC_In-App Purchase App_Jan26_Updated.
 """
 
 import io
+import os
 import hashlib
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from time import perf_counter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
@@ -38,6 +45,11 @@ COMPANY_ADDRESS = "71-75 Shelton Street\nCovent Garden, London\nWC2H 9JQ"
 COMPANY_EMAIL = "support@joinkliq.io"
 COMPANY_WEB = "joinkliq.io"
 
+# Worker processes for batch rendering (0 = one per CPU up to
+# RECEIPT_MAX_WORKERS, 1 = render in-process)
+RECEIPT_WORKERS = int(os.environ.get("RECEIPT_WORKERS", "0"))
+RECEIPT_MAX_WORKERS = 4
+
 
 def _generate_invoice_number(app_name, month):
     """Generate a deterministic invoice number from app name + month."""
@@ -47,42 +59,16 @@ def _generate_invoice_number(app_name, month):
     return f"{month_code}{h}"
 
 
-def generate_receipt_pdf(
-    app_name,
-    month,
-    apple_sales=0.0,
-    apple_units=0,
-    google_sales=0.0,
-    google_units=0,
-    kliq_fee_pct=0.0,
-    total_payout=0.0,
-    payment_date=None,
-    apple_refunds=0.0,
-    google_refunds=0.0,
-    product_details=None,
-    # Fiscal settlement params
-    is_fiscal=False,
-    fiscal_period=None,
-    period_start=None,
-    period_end=None,
-    apple_platform_fee=None,
-    apple_platform_fee_pct=None,
-    payment_due_date=None,
-):
-    """Generate a branded PDF receipt. Returns bytes."""
-    buf = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=A4,
-        leftMargin=25 * mm,
-        rightMargin=25 * mm,
-        topMargin=20 * mm,
-        bottomMargin=20 * mm,
-    )
+_STYLES = None
+
 
+def _styles():
+    """Receipt stylesheet, built once per process and shared by every render."""
+    global _STYLES
+    if _STYLES is not None:
+        return _STYLES
     styles = getSampleStyleSheet()
 
-    # Custom styles
     styles.add(
         ParagraphStyle(
             "KLIQTitle",
@@ -145,6 +131,70 @@ def generate_receipt_pdf(
             alignment=TA_CENTER,
         )
     )
+    styles.add(
+        ParagraphStyle(
+            "Notes",
+            parent=styles["Normal"],
+            fontName="Helvetica",
+            fontSize=8,
+            textColor=colors.HexColor("#888888"),
+            leading=12,
+        )
+    )
+    _STYLES = styles
+    return styles
+
+
+# Static table layouts, shared by every render (TableStyle is read-only once built)
+_HEADER_TABLE_STYLE = TableStyle(
+    [
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+    ]
+)
+_DETAIL_TABLE_STYLE = TableStyle(
+    [
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 2),
+        ("TOPPADDING", (0, 1), (-1, 1), 0),
+    ]
+)
+
+
+def generate_receipt_pdf(
+    app_name,
+    month,
+    apple_sales=0.0,
+    apple_units=0,
+    google_sales=0.0,
+    google_units=0,
+    kliq_fee_pct=0.0,
+    total_payout=0.0,
+    payment_date=None,
+    apple_refunds=0.0,
+    google_refunds=0.0,
+    product_details=None,
+    # Fiscal settlement params
+    is_fiscal=False,
+    fiscal_period=None,
+    period_start=None,
+    period_end=None,
+    apple_platform_fee=None,
+    apple_platform_fee_pct=None,
+    payment_due_date=None,
+):
+    """Generate a branded PDF receipt. Returns bytes."""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=A4,
+        leftMargin=25 * mm,
+        rightMargin=25 * mm,
+        topMargin=20 * mm,
+        bottomMargin=20 * mm,
+    )
+
+    styles = _styles()
 
     elements = []
 
@@ -187,14 +237,7 @@ def generate_receipt_pdf(
         ]
     ]
     header_table = Table(header_data, colWidths=[90 * mm, 70 * mm])
-    header_table.setStyle(
-        TableStyle(
-            [
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-            ]
-        )
-    )
+    header_table.setStyle(_HEADER_TABLE_STYLE)
     elements.append(header_table)
     elements.append(Spacer(1, 4 * mm))
 
@@ -224,15 +267,7 @@ def generate_receipt_pdf(
         ],
     ]
     detail_table = Table(detail_data, colWidths=[45 * mm, 35 * mm, 40 * mm, 40 * mm])
-    detail_table.setStyle(
-        TableStyle(
-            [
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 2),
-                ("TOPPADDING", (0, 1), (-1, 1), 0),
-            ]
-        )
-    )
+    detail_table.setStyle(_DETAIL_TABLE_STYLE)
     elements.append(detail_table)
     elements.append(Spacer(1, 6 * mm))
 
@@ -437,14 +472,7 @@ def generate_receipt_pdf(
         HRFlowable(width="100%", thickness=0.5, color=KLIQ_BORDER, spaceAfter=6)
     )
 
-    notes_style = ParagraphStyle(
-        "Notes",
-        parent=styles["Normal"],
-        fontName="Helvetica",
-        fontSize=8,
-        textColor=colors.HexColor("#888888"),
-        leading=12,
-    )
+    notes_style = styles["Notes"]
     elements.append(
         Paragraph(
             f"<b>*Gross Sales</b> — KLIQ fee ({kliq_fee_pct:.1f}%) is calculated on gross sales "
@@ -478,3 +506,74 @@ def generate_receipt_pdf(
     doc.build(elements)
     buf.seek(0)
     return buf.getvalue()
+
+
+def _render(pdf_args):
+    return generate_receipt_pdf(**pdf_args)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _worker_count(workers=None):
+    workers = workers if workers is not None else RECEIPT_WORKERS
+    return min(workers or os.cpu_count() or 1, RECEIPT_MAX_WORKERS)
+
+
+def _get_pool():
+    """The shared render pool, started on first use.
+
+    Workers are spawned, not forked: the dashboard runs in threaded gunicorn
+    workers holding BigQuery clients, and forking those is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def render_receipts_zip(receipts, workers=None):
+    """Render many receipts into one ZIP archive.
+
+    receipts is a list of (filename, generate_receipt_pdf kwargs). Rendering
+    is CPU-bound, so large batches are spread over a shared pool of at most
+    RECEIPT_MAX_WORKERS spawned processes; each worker builds the stylesheet
+    once and reuses it for all its receipts. With one CPU (or workers=1)
+    everything renders in-process. Returns (zip bytes, stats) where stats
+    has receipts, seconds and per_second.
+    """
+    global _pool
+    receipts = list(receipts)
+    workers = _worker_count(workers)
+
+    started = perf_counter()
+    args = [a for _, a in receipts]
+    pdfs = None
+    if workers > 1 and len(args) >= 2 * workers:
+        pool = _get_pool()
+        try:
+            chunk = max(1, len(args) // (workers * 4))
+            pdfs = list(pool.map(_render, args, chunksize=chunk))
+        except BrokenProcessPool:  # a worker died: start a fresh pool next time
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+    if pdfs is None:
+        pdfs = [_render(a) for a in args]
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for (filename, _), pdf in zip(receipts, pdfs):
+            zf.writestr(filename, pdf)
+    seconds = perf_counter() - started
+    stats = {
+        "receipts": len(receipts),
+        "seconds": round(seconds, 2),
+        "per_second": round(len(receipts) / seconds, 1) if seconds > 0 else 0.0,
+    }
+    return buf.getvalue(), stats
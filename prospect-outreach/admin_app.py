@@ -23,7 +23,7 @@ from tracker import (
 from data_pipeline import fetch_new_signups, fetch_prospect_profile
 from sequences import render_sms, render_email, SMS_TEMPLATES, EMAIL_CONFIG
 from email_sender import send_email
-from cheat_sheet import generate_cheat_sheet
+from cheat_sheet import cheat_sheet_path
 from task_progress import get_task_progress
 
 st.set_page_config(
@@ -256,7 +256,7 @@ if page == "📧 Email Draft Queue":
                             with st.spinner("Sending..."):
                                 attachment_path = None
                                 if attach_pdf:
-                                    attachment_path = generate_cheat_sheet(enriched)
+                                    attachment_path = cheat_sheet_path(enriched)
 
                                 msg_id = send_email(
                                     to_email=email,
@@ -408,7 +408,7 @@ elif page == "📄 Cheat Sheets":
 
         if st.button("Generate Cheat Sheet PDF", type="primary"):
             enriched = _enrich_prospect(prospect)
-            pdf_path = generate_cheat_sheet(enriched)
+            pdf_path = cheat_sheet_path(enriched)
             st.success("PDF generated!")
 
             with open(pdf_path, "rb") as f:
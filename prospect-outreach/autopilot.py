@@ -38,6 +38,7 @@ from data_pipeline import (
 from sequences import render_sms, render_email
 from email_sender import send_email
 from sms_sender import send_sms
+from cheat_sheet import pregenerate_cheat_sheets
 from gsheet_leads import sync_sheet_leads
 from dedup_guard import sms_already_delivered, email_already_delivered
 from exclusions import is_excluded
@@ -390,6 +391,7 @@ def _auto_sync():
         return 0
 
     synced = 0
+    to_render = []
     for s in signups:
         app_id = s.get("application_id")
         if not app_id:
@@ -409,9 +411,19 @@ def _auto_sync():
                 profile_json=json.dumps(profile, default=str),
             )
             synced += 1
+            if profile["email"] and not already_sent(app_id, "cheat_sheet", "email"):
+                to_render.append(profile)
         except Exception as e:
             _log_entry("auto_sync", f"Error syncing app={app_id}: {e}", False)
 
+    # Render cheat sheets in the background so the email step attaches a ready file
+    try:
+        queued = pregenerate_cheat_sheets(to_render)
+        if queued:
+            _log_entry("auto_sync", f"Queued {queued} cheat sheets for pre-generation")
+    except Exception as e:
+        _log_entry("auto_sync", f"Cheat sheet pre-generation failed: {e}", False)
+
     return synced
 
 
@@ -2,8 +2,14 @@
 One-time backfill: sync all existing prospects and FB leads to Brevo contacts.
 Run this once to populate COACH_TYPE for contacts already in the DB.
 
+By default contacts are pushed through Brevo's bulk import API in chunks
+(see brevo_contacts.import_contacts_batched), which takes a minute or two for
+thousands of contacts instead of one POST per contact.
+
 Usage:
-    python backfill_brevo_contacts.py
+    python backfill_brevo_contacts.py               # batched import
+    python backfill_brevo_contacts.py --dry-run     # batched, against a local stub server
+    python backfill_brevo_contacts.py --one-by-one  # legacy per-contact POSTs
 """
 
 import sys
@@ -14,15 +20,104 @@ from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
 
 from tracker import get_all_prospects, get_fb_leads
-from brevo_contacts import sync_contact, sync_contact_from_fb_lead
+import brevo_contacts
+from brevo_contacts import (
+    sync_contact,
+    sync_contact_from_fb_lead,
+    contact_from_prospect,
+    contact_from_fb_lead,
+    import_contacts_batched,
+)
+import json
+import threading
 import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 
-def main():
-    print("=" * 60)
-    print("Backfilling Brevo contacts with coach_type...")
-    print("=" * 60)
+# ── Local stub of the Brevo contacts/import endpoints (for --dry-run) ──
+
+
+class _StubBrevoHandler(BaseHTTPRequestHandler):
+    """Accepts imports and single-contact upserts; every import completes immediately."""
+
+    received = 0
+    next_process_id = 1
+    lock = threading.Lock()
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body or {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        cls = type(self)
+        with cls.lock:
+            if self.path.endswith("/contacts/import"):
+                cls.received += len(payload.get("jsonBody", []))
+                pid = cls.next_process_id
+                cls.next_process_id += 1
+                return self._reply(202, {"processId": pid})
+            if self.path.endswith("/contacts"):
+                cls.received += 1
+                return self._reply(201, {"id": cls.received})
+        self._reply(404)
+
+    def do_GET(self):
+        if "/processes/" in self.path:
+            pid = self.path.rsplit("/", 1)[-1]
+            return self._reply(200, {"id": pid, "status": "completed"})
+        self._reply(404)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubBrevoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ── Backfill modes ──
+
 
+def backfill_batched(list_ids=None):
+    prospects = get_all_prospects()
+    fb_leads = get_fb_leads(campaign="fb_new_lead")
+    contacts = [contact_from_prospect(p) for p in prospects]
+    contacts += [contact_from_fb_lead(lead) for lead in fb_leads]
+    contacts = [c for c in contacts if c]
+    print(
+        f"\n[BATCH] {len(prospects)} prospects + {len(fb_leads)} FB leads "
+        f"→ {len(contacts)} contacts"
+    )
+
+    started = time.monotonic()
+    result = import_contacts_batched(contacts, list_ids=list_ids)
+    elapsed = time.monotonic() - started
+
+    for job in result["jobs"]:
+        print(
+            f"  job {job['process_id'] or '-'}: {job['size']} contacts — "
+            f"{job['status']}, {job['rejected']} rejected (attempt {job['attempt'] + 1})"
+        )
+    for email in result["failed"]:
+        print(f"  ❌ {email} — failed")
+    for email in result["unconfirmed"]:
+        print(f"  ⏳ {email} — import still running, not confirmed")
+    print(
+        f"\n[BATCH] Imported {result['imported']}/{len(contacts)} "
+        f"in {elapsed:.1f}s ({len(result['failed'])} failed)"
+    )
+    return result["imported"]
+
+
+def backfill_one_by_one():
     # 1. Sync all prospects (KLIQ signups)
     prospects = get_all_prospects()
     print(f"\n[PROSPECTS] Found {len(prospects)} prospects to sync")
@@ -71,9 +166,35 @@ def main():
         time.sleep(0.2)
 
     print(f"\n[FB LEADS] Synced {fb_synced}/{len(fb_leads)} to Brevo")
+    return synced + fb_synced
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv
+    one_by_one = "--one-by-one" in sys.argv
+
+    print("=" * 60)
+    print("Backfilling Brevo contacts with coach_type...")
+    print("=" * 60)
+
+    list_ids = None
+    server = None
+    if dry_run:
+        server = _start_stub_server()
+        host, port = server.server_address
+        brevo_contacts.set_endpoint(f"http://{host}:{port}/v3", api_key="dry-run")
+        list_ids = [1]
+        print(f"[DRY RUN] Using stub Brevo server at http://{host}:{port}")
+
+    try:
+        total = backfill_one_by_one() if one_by_one else backfill_batched(list_ids)
+    finally:
+        if server:
+            server.shutdown()
+            print(f"[DRY RUN] Stub server received {_StubBrevoHandler.received} contacts")
 
     print(f"\n{'=' * 60}")
-    print(f"DONE — Total synced: {synced + fb_synced}")
+    print(f"DONE — Total synced: {total}")
     print(f"{'=' * 60}")
 
 
@@ -6,16 +6,73 @@ Called when:
   1. A new coach signs up on KLIQ (process_signup in run.py)
   2. A Meta ad lead is processed (process_fb_leads in gsheet_leads.py)
 
+Batches of new contacts go through Brevo's bulk import endpoint
+(import_contacts) instead of one POST per contact.
+
 Requires BREVO_API_KEY env var.
 """
 
+import csv
+import io
 import logging
+import time
+
 import requests
-from config import BREVO_API_KEY
+from config import BREVO_API_KEY, BREVO_CONTACT_LIST_ID
 
 log = logging.getLogger("brevo_contacts")
 
-BREVO_CONTACTS_URL = "https://api.brevo.com/v3/contacts"
+BREVO_API_BASE = "https://api.brevo.com/v3"
+
+# Bulk import tuning — chunks stay small enough that a failed job is cheap to retry
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_RETRIES = 2
+IMPORT_POLL_SECONDS = 2
+IMPORT_POLL_TIMEOUT = 300
+
+_api_base = BREVO_API_BASE
+_api_key = BREVO_API_KEY
+
+
+def set_endpoint(api_base, api_key=None):
+    """Point the client at another Brevo-compatible server (e.g. a local stub for dry runs)."""
+    global _api_base, _api_key
+    _api_base = api_base.rstrip("/")
+    if api_key:
+        _api_key = api_key
+
+
+def _headers():
+    return {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "api-key": _api_key,
+    }
+
+
+def _build_attributes(
+    first_name=None,
+    last_name=None,
+    coach_type=None,
+    country=None,
+    phone=None,
+    source=None,
+):
+    """Brevo attribute dict (UPPERCASE keys), only including non-empty values."""
+    attributes = {}
+    if first_name:
+        attributes["FIRSTNAME"] = first_name
+    if last_name:
+        attributes["LASTNAME"] = last_name
+    if coach_type:
+        attributes["COACH_TYPE"] = coach_type
+    if country:
+        attributes["COUNTRY"] = country
+    if phone:
+        attributes["SMS"] = phone
+    if source:
+        attributes["SOURCE"] = source
+    return attributes
 
 
 def sync_contact(
@@ -47,46 +104,27 @@ def sync_contact(
     Returns:
         True if successful, False otherwise.
     """
-    if not BREVO_API_KEY:
+    if not _api_key:
         log.warning("BREVO_API_KEY not set — skipping contact sync.")
         return False
 
     if not email or "@" not in email:
         return False
 
-    # Build attributes dict — only include non-empty values
-    attributes = {}
-    if first_name:
-        attributes["FIRSTNAME"] = first_name
-    if last_name:
-        attributes["LASTNAME"] = last_name
-    if coach_type:
-        attributes["COACH_TYPE"] = coach_type
-    if country:
-        attributes["COUNTRY"] = country
-    if phone:
-        attributes["SMS"] = phone
-    if source:
-        attributes["SOURCE"] = source
-
     payload = {
         "email": email.lower().strip(),
         "updateEnabled": True,
-        "attributes": attributes,
+        "attributes": _build_attributes(
+            first_name, last_name, coach_type, country, phone, source
+        ),
     }
 
     if list_ids:
         payload["listIds"] = list_ids
 
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "api-key": BREVO_API_KEY,
-    }
-
     try:
         resp = requests.post(
-            BREVO_CONTACTS_URL, json=payload, headers=headers, timeout=15
+            f"{_api_base}/contacts", json=payload, headers=_headers(), timeout=15
         )
         if resp.status_code in (200, 201, 204):
             log.info(
@@ -103,33 +141,323 @@ def sync_contact(
         return False
 
 
-def sync_contact_from_prospect(prospect):
+def _default_list_ids(list_ids):
+    return list_ids or ([BREVO_CONTACT_LIST_ID] if BREVO_CONTACT_LIST_ID else [])
+
+
+def _post_import(contacts, list_ids):
+    """POST one import job. Returns the processId, or None if it was rejected."""
+    payload = {
+        "jsonBody": contacts,
+        "listIds": list_ids,
+        "updateExistingContacts": True,
+        "emptyContactsAttributes": False,
+    }
+    try:
+        resp = requests.post(
+            f"{_api_base}/contacts/import", json=payload, headers=_headers(), timeout=30
+        )
+        if resp.status_code in (200, 201, 202):
+            return resp.json().get("processId")
+        log.warning(
+            f"[BREVO CONTACT] Import failed: HTTP {resp.status_code} — {resp.text[:200]}"
+        )
+    except Exception as e:
+        log.warning(f"[BREVO CONTACT] Error importing {len(contacts)} contacts: {e}")
+    return None
+
+
+def import_contacts(contacts, list_ids=None):
     """
-    Convenience: sync a prospect dict (from tracker.py) to Brevo.
-    Extracts first_name, coach_type, country, phone from the prospect.
+    Create or update many contacts with a single call to Brevo's import API.
+
+    Args:
+        contacts: List of {"email": ..., "attributes": {...}} dicts, e.g. from
+            contact_from_prospect / contact_from_fb_lead.
+        list_ids: Brevo list IDs to import into (defaults to BREVO_CONTACT_LIST_ID).
+
+    Returns:
+        The Brevo import processId, or None if the import was not accepted.
+        Without an import list configured, falls back to per-contact sync.
     """
-    if not prospect:
-        return False
+    contacts = [c for c in contacts if c and "@" in (c.get("email") or "")]
+    if not contacts:
+        return None
 
-    email = prospect.get("email")
-    if not email:
-        return False
+    if not _api_key:
+        log.warning("BREVO_API_KEY not set — skipping contact import.")
+        return None
+
+    list_ids = _default_list_ids(list_ids)
+    if not list_ids:
+        log.warning(
+            "BREVO_CONTACT_LIST_ID not set — importing %d contacts one by one.",
+            len(contacts),
+        )
+        for c in contacts:
+            sync_contact(c["email"], **_contact_kwargs(c))
+        return None
+
+    process_id = _post_import(contacts, list_ids)
+    if process_id is not None:
+        log.info(
+            f"[BREVO CONTACT] Import of {len(contacts)} contacts queued — process {process_id}"
+        )
+    return process_id
+
+
+def get_process(process_id):
+    """Return a Brevo background process record (status, export_url, ...), or None."""
+    try:
+        resp = requests.get(
+            f"{_api_base}/processes/{process_id}", headers=_headers(), timeout=15
+        )
+        if resp.status_code == 200:
+            return resp.json()
+        log.warning(
+            f"[BREVO CONTACT] Process {process_id} status: HTTP {resp.status_code}"
+        )
+    except Exception as e:
+        log.warning(f"[BREVO CONTACT] Error polling process {process_id}: {e}")
+    return None
+
+
+def get_process_status(process_id):
+    """Return the status of a Brevo background process ('queued', 'in_process', 'completed', ...)."""
+    process = get_process(process_id)
+    return process.get("status") if process else None
+
+
+def wait_for_processes(
+    process_ids, timeout=IMPORT_POLL_TIMEOUT, interval=IMPORT_POLL_SECONDS
+):
+    """
+    Poll import processes until each finishes or the timeout passes.
+    Returns {process_id: final process record}; the record's status is
+    'timeout' if it was still running and 'unknown' if it could not be read.
+    """
+    pending = set(process_ids)
+    processes = {}
+    deadline = time.monotonic() + timeout
+    while pending:
+        for pid in list(pending):
+            process = get_process(pid)
+            status = process.get("status") if process else None
+            if status not in ("queued", "in_process"):
+                processes[pid] = {**(process or {}), "status": status or "unknown"}
+                pending.discard(pid)
+        if not pending:
+            break
+        if time.monotonic() >= deadline:
+            processes.update({pid: {"status": "timeout"} for pid in pending})
+            break
+        time.sleep(interval)
+    return processes
+
+
+def _rejected_emails(process):
+    """
+    Emails a completed import rejected, read from the process report Brevo
+    links in export_url. Empty if the job has no (readable) report, in which
+    case the whole job counts as imported.
+    """
+    url = process.get("export_url")
+    if not url:
+        return set()
+    try:
+        resp = requests.get(url, timeout=30)
+        resp.raise_for_status()
+        text = resp.text
+        first_line = text.split("\n", 1)[0]
+        delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+        rows = list(csv.reader(io.StringIO(text), delimiter=delimiter))
+    except Exception as e:
+        log.warning(f"[BREVO CONTACT] Could not read import report {url}: {e}")
+        return set()
+    if not rows:
+        return set()
+    header = [h.strip().lower() for h in rows[0]]
+    if "email" not in header:
+        log.warning(f"[BREVO CONTACT] Import report {url} has no EMAIL column")
+        return set()
+    col = header.index("email")
+    return {r[col].strip().lower() for r in rows[1:] if len(r) > col and r[col].strip()}
 
-    name = prospect.get("name", "")
+
+def import_contacts_batched(
+    contacts,
+    list_ids=None,
+    chunk_size=IMPORT_CHUNK_SIZE,
+    max_retries=IMPORT_MAX_RETRIES,
+):
+    """
+    Import a large contact set through Brevo's import API in chunks.
+
+    All chunks are submitted up front and their jobs polled together. Only
+    records that were not imported are retried:
+      - a completed job's rejected records (from its process report) are
+        retried one by one via sync_contact;
+      - a chunk whose POST is rejected was not imported at all, so it is
+        split in half and resubmitted (up to max_retries rounds) to isolate
+        the records Brevo refuses;
+      - a job that reports "failed" is resubmitted whole.
+    Jobs still running at the poll timeout are not resubmitted (they may yet
+    complete); their emails are returned under "unconfirmed".
+
+    Returns:
+        {"imported": int, "failed": [emails], "unconfirmed": [emails],
+         "jobs": [{"process_id", "size", "status", "attempt", "rejected"}]}
+    """
+    contacts = [c for c in contacts if c and "@" in (c.get("email") or "")]
+    result = {"imported": 0, "failed": [], "unconfirmed": [], "jobs": []}
+    if not contacts:
+        return result
+
+    if not _api_key:
+        log.warning("BREVO_API_KEY not set — skipping contact import.")
+        result["failed"] = [c["email"] for c in contacts]
+        return result
+
+    list_ids = _default_list_ids(list_ids)
+    if not list_ids:
+        log.warning(
+            "BREVO_CONTACT_LIST_ID not set — importing %d contacts one by one.",
+            len(contacts),
+        )
+        leftovers = contacts
+    else:
+        pending = [
+            contacts[i : i + chunk_size] for i in range(0, len(contacts), chunk_size)
+        ]
+        leftovers = []
+        for attempt in range(max_retries + 1):
+            submitted = []
+            retry = []
+            for chunk in pending:
+                pid = _post_import(chunk, list_ids)
+                if pid is None:
+                    result["jobs"].append(
+                        {
+                            "process_id": None,
+                            "size": len(chunk),
+                            "status": "rejected",
+                            "attempt": attempt,
+                            "rejected": len(chunk),
+                        }
+                    )
+                    # Nothing in this chunk was imported: bisect to isolate bad records
+                    mid = len(chunk) // 2
+                    retry.extend([chunk[:mid], chunk[mid:]] if mid else [chunk])
+                else:
+                    submitted.append((pid, chunk))
+
+            processes = wait_for_processes([pid for pid, _ in submitted])
+            for pid, chunk in submitted:
+                process = processes.get(pid, {"status": "unknown"})
+                status = process["status"]
+                job = {
+                    "process_id": pid,
+                    "size": len(chunk),
+                    "status": status,
+                    "attempt": attempt,
+                    "rejected": 0,
+                }
+                result["jobs"].append(job)
+                if status == "completed":
+                    rejected = _rejected_emails(process)
+                    bad = [c for c in chunk if c["email"].strip().lower() in rejected]
+                    job["rejected"] = len(bad)
+                    result["imported"] += len(chunk) - len(bad)
+                    leftovers.extend(bad)
+                elif status == "failed":
+                    retry.append(chunk)
+                else:
+                    result["unconfirmed"].extend(c["email"] for c in chunk)
+
+            if not retry:
+                break
+            if attempt == max_retries:
+                leftovers.extend(c for chunk in retry for c in chunk)
+                break
+            pending = retry
+
+    for c in leftovers:
+        if sync_contact(c["email"], **_contact_kwargs(c)):
+            result["imported"] += 1
+        else:
+            result["failed"].append(c["email"])
+
+    log.info(
+        f"[BREVO CONTACT] Batched import: {result['imported']} imported, "
+        f"{len(result['failed'])} failed, {len(result['unconfirmed'])} unconfirmed "
+        f"across {len(result['jobs'])} jobs"
+    )
+    return result
+
+
+def _contact_kwargs(contact):
+    """Map an import-style contact dict back to sync_contact keyword args."""
+    attrs = contact.get("attributes", {})
+    return {
+        "first_name": attrs.get("FIRSTNAME"),
+        "last_name": attrs.get("LASTNAME"),
+        "coach_type": attrs.get("COACH_TYPE"),
+        "country": attrs.get("COUNTRY"),
+        "phone": attrs.get("SMS"),
+        "source": attrs.get("SOURCE"),
+    }
+
+
+def contact_from_prospect(prospect):
+    """Build an import-style contact dict from a prospect (from tracker.py)."""
+    if not prospect or not prospect.get("email"):
+        return None
+
+    name = prospect.get("name") or ""
     first_name = prospect.get("first_name") or prospect.get("greeting_name")
     if not first_name:
         first_name = name.split()[0] if name else None
     last_name = " ".join(name.split()[1:]) if name and len(name.split()) > 1 else None
 
-    return sync_contact(
-        email=email,
-        first_name=first_name,
-        last_name=last_name,
-        coach_type=prospect.get("coach_type"),
-        country=prospect.get("country"),
-        phone=prospect.get("phone"),
-        source="kliq_signup",
-    )
+    return {
+        "email": prospect["email"].lower().strip(),
+        "attributes": _build_attributes(
+            first_name=first_name,
+            last_name=last_name,
+            coach_type=prospect.get("coach_type"),
+            country=prospect.get("country"),
+            phone=prospect.get("phone"),
+            source="kliq_signup",
+        ),
+    }
+
+
+def contact_from_fb_lead(lead):
+    """Build an import-style contact dict from a FB lead (from gsheet_leads.py)."""
+    if not lead or not lead.get("email"):
+        return None
+
+    return {
+        "email": lead["email"].lower().strip(),
+        "attributes": _build_attributes(
+            first_name=lead.get("first_name"),
+            last_name=lead.get("last_name"),
+            coach_type=lead.get("niche"),
+            phone=lead.get("phone"),
+            source="meta_lead",
+        ),
+    }
+
+
+def sync_contact_from_prospect(prospect):
+    """
+    Convenience: sync a prospect dict (from tracker.py) to Brevo.
+    Extracts first_name, coach_type, country, phone from the prospect.
+    """
+    contact = contact_from_prospect(prospect)
+    if not contact:
+        return False
+    return sync_contact(contact["email"], **_contact_kwargs(contact))
 
 
 def sync_contact_from_fb_lead(lead):
@@ -137,18 +465,7 @@ def sync_contact_from_fb_lead(lead):
     Convenience: sync a FB lead dict (from gsheet_leads.py) to Brevo.
     Extracts first_name, niche (as coach_type), phone from the lead.
     """
-    if not lead:
+    contact = contact_from_fb_lead(lead)
+    if not contact:
         return False
-
-    email = lead.get("email")
-    if not email:
-        return False
-
-    return sync_contact(
-        email=email,
-        first_name=lead.get("first_name"),
-        last_name=lead.get("last_name"),
-        coach_type=lead.get("niche"),
-        phone=lead.get("phone"),
-        source="meta_lead",
-    )
+    return sync_contact(contact["email"], **_contact_kwargs(contact))
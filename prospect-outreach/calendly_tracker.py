@@ -7,14 +7,26 @@ Requires CALENDLY_API_TOKEN env var (Personal Access Token).
 """
 
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from datetime import datetime, timezone, timedelta
 
-from config import CALENDLY_API_TOKEN, CALENDLY_EVENT_SLUGS, DB_PATH
+from config import CALENDLY_API_TOKEN, CALENDLY_EVENT_SLUGS
+from rate_limit import RateLimiter
+from tracker import _get_db as _get_tracker_db, lookup_attribution, get_campaign_send_stats
 
 BASE_URL = "https://api.calendly.com"
 _HEADERS = {}
 
+# Invitee fetches run concurrently; the limiter keeps us well under
+# Calendly's per-token rate limit regardless of worker count.
+_INVITEE_WORKERS = 8
+_REQUESTS_PER_SECOND = 8
+
+
+_rate_limiter = RateLimiter(_REQUESTS_PER_SECOND)
+
 
 def _ensure_headers():
     global _HEADERS
@@ -78,6 +90,7 @@ def fetch_scheduled_events(min_start_time=None, max_start_time=None, status="act
     url = f"{BASE_URL}/scheduled_events"
 
     while url:
+        _rate_limiter.wait()
         resp = requests.get(url, headers=_HEADERS, params=params, timeout=30)
         resp.raise_for_status()
         data = resp.json()
@@ -106,6 +119,7 @@ def fetch_event_invitees(event_uri):
     all_invitees = []
 
     while url:
+        _rate_limiter.wait()
         resp = requests.get(url, headers=_HEADERS, timeout=15)
         resp.raise_for_status()
         data = resp.json()
@@ -116,6 +130,28 @@ def fetch_event_invitees(event_uri):
     return all_invitees
 
 
+def fetch_invitees_for_events(event_uris, max_workers=_INVITEE_WORKERS):
+    """
+    Fetch invitees for many events concurrently (rate-limited).
+    Returns {event_uri: [invitee dicts]}; events whose fetch failed are omitted.
+    """
+    if not event_uris or not _ensure_headers():
+        return {}
+
+    def _fetch(uri):
+        try:
+            return uri, fetch_event_invitees(uri)
+        except Exception:
+            return uri, None
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for uri, invitees in pool.map(_fetch, event_uris):
+            if invitees is not None:
+                results[uri] = invitees
+    return results
+
+
 def _get_event_type_slug(event):
     """Extract the event type slug from the event_type URI."""
     # event_type is like https://api.calendly.com/event_types/UUID
@@ -134,7 +170,9 @@ def _get_event_type_slug(event):
 
 
 def _get_db():
-    conn = sqlite3.connect(DB_PATH)
+    # Shares the tracker connection setup so the outreach tables and the
+    # attribution index always exist alongside calendly_bookings.
+    conn = _get_tracker_db()
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS calendly_bookings (
@@ -182,9 +220,16 @@ def upsert_booking(
     invitee_name,
     event_start,
     event_status="active",
+    conn=None,
 ):
-    """Insert or update a Calendly booking."""
-    conn = _get_db()
+    """
+    Insert or update a Calendly booking.
+    Pass an open ``conn`` to batch several upserts into the caller's
+    transaction; the caller is then responsible for committing.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = _get_db()
 
     # Try to match this invitee to a sent message
     matched_campaign, matched_channel = _match_to_sent_message(conn, invitee_email)
@@ -211,40 +256,18 @@ def upsert_booking(
             matched_channel,
         ),
     )
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
 
 
 def _match_to_sent_message(conn, email):
-    """Try to match a booking invitee email to a sent outreach message."""
-    email_lower = email.lower()
-
-    # Check sent_messages for this email
-    row = conn.execute(
-        "SELECT sequence_step, channel FROM sent_messages WHERE LOWER(recipient) = ? ORDER BY sent_at DESC LIMIT 1",
-        (email_lower,),
-    ).fetchone()
-
-    if row:
-        return row[0], row[1]
-
-    # Check FB leads
-    row = conn.execute(
-        "SELECT campaign FROM fb_leads WHERE LOWER(email) = ? LIMIT 1",
-        (email_lower,),
-    ).fetchone()
-    if row:
-        return row[0], "fb_lead"
-
-    # Check prospects
-    row = conn.execute(
-        "SELECT 'signup' FROM prospects WHERE LOWER(email) = ? LIMIT 1",
-        (email_lower,),
-    ).fetchone()
-    if row:
-        return "signup", "organic"
-
-    return None, None
+    """
+    Try to match a booking invitee email to a sent outreach message.
+    Reads the precomputed attribution index maintained by tracker, which
+    already applies sent message > FB lead > signup precedence.
+    """
+    return lookup_attribution(email, conn=conn)
 
 
 def get_all_bookings():
@@ -295,15 +318,16 @@ def get_booking_stats():
     conn = _get_db()
     conn.row_factory = sqlite3.Row
 
-    # Total bookings
-    total = conn.execute(
-        "SELECT COUNT(*) as cnt FROM calendly_bookings WHERE event_status = 'active'"
-    ).fetchone()["cnt"]
-
-    # Matched vs unmatched totals
-    matched_total = conn.execute(
-        "SELECT COUNT(*) as cnt FROM calendly_bookings WHERE event_status = 'active' AND matched_campaign IS NOT NULL"
-    ).fetchone()["cnt"]
+    # Booking totals in a single pass
+    totals = conn.execute(
+        """SELECT COUNT(*) as cnt,
+                  SUM(CASE WHEN matched_campaign IS NOT NULL THEN 1 ELSE 0 END) as matched,
+                  SUM(CASE WHEN converted_to_sale = 1 THEN 1 ELSE 0 END) as sales
+           FROM calendly_bookings WHERE event_status = 'active'"""
+    ).fetchone()
+    total = totals["cnt"]
+    matched_total = totals["matched"] or 0
+    total_sales = totals["sales"] or 0
     unmatched_total = total - matched_total
 
     # Bookings by event type (with matched / unmatched split)
@@ -324,27 +348,11 @@ def get_booking_stats():
            GROUP BY matched_campaign"""
     ).fetchall()
 
-    # Total messages sent per campaign
-    msgs_by_campaign = conn.execute(
-        """SELECT sequence_step, COUNT(*) as cnt
-           FROM sent_messages
-           GROUP BY sequence_step"""
-    ).fetchall()
-
-    # Unique recipients per campaign
-    unique_recipients = conn.execute(
-        """SELECT sequence_step, COUNT(DISTINCT LOWER(recipient)) as cnt
-           FROM sent_messages
-           GROUP BY sequence_step"""
-    ).fetchall()
-
-    # Total unique outreach recipients (across all campaigns)
-    total_unique_outreach = conn.execute(
-        "SELECT COUNT(DISTINCT LOWER(recipient)) as cnt FROM sent_messages"
-    ).fetchone()["cnt"]
+    # Messages sent / unique recipients per campaign, from maintained counters
+    send_stats, total_unique_outreach = get_campaign_send_stats(conn=conn)
 
-    msgs_map = {r["sequence_step"]: r["cnt"] for r in msgs_by_campaign}
-    unique_map = {r["sequence_step"]: r["cnt"] for r in unique_recipients}
+    msgs_map = {k: v["total_sent"] for k, v in send_stats.items()}
+    unique_map = {k: v["unique_recipients"] for k, v in send_stats.items()}
     bookings_map = {r["matched_campaign"]: r["cnt"] for r in by_campaign}
 
     # Build conversion rates
@@ -373,9 +381,6 @@ def get_booking_stats():
     )
 
     # Sale conversions
-    total_sales = conn.execute(
-        "SELECT COUNT(*) as cnt FROM calendly_bookings WHERE event_status = 'active' AND converted_to_sale = 1"
-    ).fetchone()["cnt"]
     booking_to_sale_rate = round((total_sales / total * 100) if total > 0 else 0, 1)
     outreach_to_sale_rate = round(
         (total_sales / total_unique_outreach * 100) if total_unique_outreach > 0 else 0,
@@ -415,44 +420,52 @@ def sync_calendly_bookings(lookback_days=30):
     )
 
     events = fetch_scheduled_events(min_start_time=min_start)
-    new_count = 0
+    if not events:
+        return 0
 
-    for event in events:
-        event_uri = event.get("uri", "")
-        event_start = event.get("start_time", "")
-        event_status = event.get("status", "active")
-        slug = _get_event_type_slug(event)
+    invitees_by_event = fetch_invitees_for_events(
+        [e.get("uri", "") for e in events if e.get("uri")]
+    )
 
-        # Get invitees for this event
-        try:
-            invitees = fetch_event_invitees(event_uri)
-        except Exception:
-            continue
-
-        for inv in invitees:
-            email = inv.get("email", "")
-            name = inv.get("name", "")
-            if not email:
-                continue
-
-            # Check if we already have this booking
-            conn = _get_db()
-            existing = conn.execute(
-                "SELECT 1 FROM calendly_bookings WHERE event_uri = ?",
-                (event_uri,),
-            ).fetchone()
-            conn.close()
-
-            upsert_booking(
-                event_uri=event_uri,
-                event_type_slug=slug,
-                invitee_email=email,
-                invitee_name=name,
-                event_start=event_start,
-                event_status=event_status,
-            )
-
-            if not existing:
-                new_count += 1
+    new_count = 0
+    conn = _get_db()
+    try:
+        # One read of known events instead of an existence query per invitee
+        known_uris = {
+            row[0] for row in conn.execute("SELECT event_uri FROM calendly_bookings")
+        }
+
+        with conn:  # single transaction for all upserts + attribution matches
+            for event in events:
+                event_uri = event.get("uri", "")
+                invitees = invitees_by_event.get(event_uri)
+                if not invitees:
+                    continue
+
+                event_start = event.get("start_time", "")
+                event_status = event.get("status", "active")
+                slug = _get_event_type_slug(event)
+
+                for inv in invitees:
+                    email = inv.get("email", "")
+                    name = inv.get("name", "")
+                    if not email:
+                        continue
+
+                    upsert_booking(
+                        event_uri=event_uri,
+                        event_type_slug=slug,
+                        invitee_email=email,
+                        invitee_name=name,
+                        event_start=event_start,
+                        event_status=event_status,
+                        conn=conn,
+                    )
+
+                    if event_uri not in known_uris:
+                        known_uris.add(event_uri)
+                        new_count += 1
+    finally:
+        conn.close()
 
     return new_count
@@ -7,7 +7,14 @@ Includes Trustpilot social proof and a Calendly book-a-call CTA.
 
 import os
 import io
+import json
+import time
+import hashlib
+import threading
+import multiprocessing
 import requests
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image as PILImage
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm, cm
 from reportlab.lib.colors import HexColor, black, white
@@ -23,7 +30,8 @@ from reportlab.platypus import (
     KeepTogether,
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from config import CHEAT_SHEET_OUTPUT_DIR
+from config import CHEAT_SHEET_OUTPUT_DIR, CHEAT_SHEET_WORKERS, IMAGE_CACHE_DIR
+from name_resolver import resolve_greeting
 
 
 # ── KLIQ brand colours (from email template) ──
@@ -193,49 +201,221 @@ DEFAULT_TIPS = NICHE_TIPS["Fitness"]
 CARD_COLOURS = [CARD_GREEN, CARD_BLUE, CARD_PINK, CARD_GREEN, CARD_BLUE]
 
 
-def _download_image(url, max_width=None, max_height=None):
-    """Download an image from URL and return as a ReportLab Image object."""
+# ── Image cache ──
+# Remote images are downloaded once per URL into IMAGE_CACHE_DIR; each image
+# is then downscaled once per target box and kept in memory keyed by the
+# sha256 of its content, so a render only wraps ready-sized bytes.
+IMAGE_DPI = 150  # resolution images are downscaled to for the PDF
+IMAGE_RETRY_AFTER = 300  # seconds before retrying a failed download
+
+_sized_images = {}  # (content sha256, max_w, max_h, stretch) -> (bytes, w, h)
+_failed_urls = {}  # url -> time.monotonic() of the last failed download
+_image_lock = threading.Lock()
+
+
+def _source_bytes(url):
+    """Raw bytes for an image URL, downloaded at most once per URL."""
+    path = os.path.join(IMAGE_CACHE_DIR, hashlib.sha256(url.encode()).hexdigest())
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    failed_at = _failed_urls.get(url)
+    if failed_at is not None and time.monotonic() - failed_at < IMAGE_RETRY_AFTER:
+        return None
     try:
         resp = requests.get(url, timeout=10)
         resp.raise_for_status()
-        img_data = io.BytesIO(resp.content)
-        img = Image(img_data)
-        iw, ih = img.drawWidth, img.drawHeight
-        if max_width and iw > max_width:
-            ratio = max_width / iw
-            img.drawWidth = max_width
-            img.drawHeight = ih * ratio
-        if max_height and img.drawHeight > max_height:
-            ratio = max_height / img.drawHeight
-            img.drawHeight = max_height
-            img.drawWidth = img.drawWidth * ratio
-        return img
     except Exception as e:
+        _failed_urls[url] = time.monotonic()
         print(f"[PDF] Could not download image {url}: {e}")
         return None
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(resp.content)
+    os.replace(tmp, path)
+    return resp.content
 
 
-def _make_card(content_elements, bg_color, card_width):
-    """Wrap content in a neo-brutalist card (thick bottom/right border)."""
-    inner = Table(
-        [[e] for e in content_elements],
-        colWidths=[card_width - 24],
-    )
-    inner.setStyle(
-        TableStyle(
-            [
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 0),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-                ("TOPPADDING", (0, 0), (-1, -1), 0),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
-            ]
-        )
-    )
+def _sized_image(data, max_width=None, max_height=None, stretch=False):
+    """
+    ReportLab Image for image bytes, scaled to fit max_width/max_height
+    (points). With stretch=True the image is first scaled to max_width even
+    if that enlarges it. The pixel data is resized once per size and cached.
+    """
+    key = (hashlib.sha256(data).hexdigest(), max_width, max_height, stretch)
+    with _image_lock:
+        sized = _sized_images.get(key)
+    if sized is None:
+        with PILImage.open(io.BytesIO(data)) as im:
+            # ReportLab draws one pixel per point by default
+            w, h = float(im.width), float(im.height)
+            if max_width and (stretch or w > max_width):
+                w, h = max_width, h * max_width / w
+            if max_height and h > max_height:
+                w, h = w * max_height / h, max_height
+            px = (max(1, round(w * IMAGE_DPI / 72)), max(1, round(h * IMAGE_DPI / 72)))
+            if px[0] < im.width:
+                im = im.resize(px, PILImage.LANCZOS)
+                buf = io.BytesIO()
+                if im.mode in ("RGBA", "LA", "P"):
+                    im.save(buf, "PNG", optimize=True)
+                else:
+                    im.convert("RGB").save(buf, "JPEG", quality=88)
+                out = buf.getvalue()
+            else:
+                out = data
+        sized = (out, w, h)
+        with _image_lock:
+            _sized_images[key] = sized
+    out, w, h = sized
+    return Image(io.BytesIO(out), width=w, height=h)
 
-    card = Table([[inner]], colWidths=[card_width - 24])
-    card.setStyle(
-        TableStyle(
+
+def _download_image(url, max_width=None, max_height=None):
+    """Download an image from URL and return as a ReportLab Image object."""
+    data = _source_bytes(url)
+    if data is None:
+        return None
+    try:
+        return _sized_image(data, max_width, max_height)
+    except Exception as e:
+        print(f"[PDF] Could not load image {url}: {e}")
+        return None
+
+
+def _local_image(path, max_width=None, max_height=None, stretch=False):
+    """Same as _download_image for a bundled asset; None if it is missing."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    return _sized_image(data, max_width, max_height, stretch)
+
+
+# ── Styles and table layouts (built once, shared by every render) ──
+_STYLES = None
+
+_CARD_INNER_STYLE = TableStyle(
+    [
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 0),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ("TOPPADDING", (0, 0), (-1, -1), 0),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+    ]
+)
+_CARD_STYLES = {}  # background hex -> TableStyle
+_CTA_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, -1), DARK_GREEN),
+        ("ROUNDEDCORNERS", [8, 8, 8, 8]),
+        ("TOPPADDING", (0, 0), (-1, -1), 12),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]
+)
+
+
+def _styles():
+    """Cheat sheet paragraph styles, built once per process."""
+    global _STYLES
+    if _STYLES is not None:
+        return _STYLES
+    styles = getSampleStyleSheet()
+    _STYLES = {
+        "title": ParagraphStyle(
+            "CheatTitle",
+            parent=styles["Title"],
+            fontSize=26,
+            textColor=DARK_GREEN,
+            spaceAfter=4 * mm,
+            alignment=TA_CENTER,
+            fontName="Helvetica-Bold",
+        ),
+        "subtitle": ParagraphStyle(
+            "CheatSubtitle",
+            parent=styles["Normal"],
+            fontSize=13,
+            textColor=TEXT_DARK,
+            spaceAfter=8 * mm,
+            alignment=TA_CENTER,
+            leading=18,
+        ),
+        "heading": ParagraphStyle(
+            "CheatHeading",
+            parent=styles["Heading2"],
+            fontSize=16,
+            textColor=DARK_GREEN,
+            spaceBefore=6 * mm,
+            spaceAfter=3 * mm,
+            fontName="Helvetica-Bold",
+        ),
+        "body": ParagraphStyle(
+            "CheatBody",
+            parent=styles["Normal"],
+            fontSize=11,
+            textColor=TEXT_DARK,
+            spaceAfter=3 * mm,
+            leading=16,
+        ),
+        "step_title": ParagraphStyle(
+            "StepTitle",
+            parent=styles["Normal"],
+            fontSize=13,
+            textColor=DARK_GREEN,
+            spaceAfter=2 * mm,
+            fontName="Helvetica-Bold",
+        ),
+        "step_body": ParagraphStyle(
+            "StepBody",
+            parent=styles["Normal"],
+            fontSize=10.5,
+            textColor=TEXT_DARK,
+            leading=15,
+        ),
+        "cta": ParagraphStyle(
+            "CTA",
+            parent=styles["Normal"],
+            fontSize=14,
+            textColor=WHITE,
+            alignment=TA_CENTER,
+            fontName="Helvetica-Bold",
+            spaceAfter=0,
+        ),
+        "tp_caption": ParagraphStyle(
+            "TPCaption",
+            parent=styles["Normal"],
+            fontSize=11,
+            textColor=TEXT_DARK,
+            alignment=TA_CENTER,
+            spaceAfter=6 * mm,
+        ),
+        "cta_link": ParagraphStyle(
+            "CTALink",
+            parent=styles["Normal"],
+            fontSize=10,
+            textColor=LINK_TEAL,
+            alignment=TA_CENTER,
+        ),
+        "footer": ParagraphStyle(
+            "Footer",
+            parent=styles["Normal"],
+            fontSize=9,
+            textColor=HexColor("#888888"),
+            alignment=TA_CENTER,
+            spaceBefore=8 * mm,
+        ),
+    }
+    return _STYLES
+
+
+def _card_style(bg_color):
+    """Outer card TableStyle for a background colour, built once per colour."""
+    key = bg_color.hexval()
+    style = _CARD_STYLES.get(key)
+    if style is None:
+        style = _CARD_STYLES[key] = TableStyle(
             [
                 ("BACKGROUND", (0, 0), (-1, -1), bg_color),
                 ("BOX", (0, 0), (-1, -1), 1.5, black),
@@ -248,31 +428,63 @@ def _make_card(content_elements, bg_color, card_width):
                 ("ROUNDEDCORNERS", [6, 6, 6, 6]),
             ]
         )
+    return style
+
+
+def _make_card(content_elements, bg_color, card_width):
+    """Wrap content in a neo-brutalist card (thick bottom/right border)."""
+    inner = Table(
+        [[e] for e in content_elements],
+        colWidths=[card_width - 24],
     )
+    inner.setStyle(_CARD_INNER_STYLE)
+
+    card = Table([[inner]], colWidths=[card_width - 24])
+    card.setStyle(_card_style(bg_color))
     return card
 
 
-def generate_cheat_sheet(prospect, output_path=None):
+def _render_fields(prospect):
+    """The prospect values a cheat sheet depends on.
+
+    The greeting is always resolved from name/app_name (as run._enrich_greeting
+    does), so raw and greeting-enriched profiles render and hash the same.
+    """
+    first_name, _ = resolve_greeting(
+        prospect.get("name", ""), prospect.get("app_name", "")
+    )
+    coach_type = prospect.get("coach_type", "Fitness")
+    app_name = prospect.get("app_name", "your app")
+    return first_name, coach_type, app_name
+
+
+def render_cheat_sheet(prospect):
     """
-    Generate a personalised cheat sheet PDF for a prospect.
+    Render a personalised cheat sheet PDF for a prospect.
     Uses the KLIQ brand template with Trustpilot social proof and Calendly CTA.
 
     Returns:
-        Path to the generated PDF.
+        The PDF as bytes.
     """
-    name = prospect.get("name", "Coach")
-    first_name = prospect.get("first_name") or (name.split()[0] if name else "Coach")
-    coach_type = prospect.get("coach_type", "Fitness")
-    app_name = prospect.get("app_name", "your app")
-    app_id = prospect.get("application_id", "unknown")
+    return _render_pdf(prospect)[0]
 
-    niche = NICHE_TIPS.get(coach_type, DEFAULT_TIPS)
 
-    if output_path is None:
-        output_path = os.path.join(CHEAT_SHEET_OUTPUT_DIR, f"cheatsheet_{app_id}.pdf")
+def _render_pdf(prospect):
+    """render_cheat_sheet → (PDF bytes, URLs of remote images left out)."""
+    first_name, coach_type, app_name = _render_fields(prospect)
+    missing = []
+
+    def _remote_image(url, max_width):
+        img = _download_image(url, max_width=max_width)
+        if img is None:
+            missing.append(url)
+        return img
+
+    niche = NICHE_TIPS.get(coach_type, DEFAULT_TIPS)
 
+    buf = io.BytesIO()
     doc = SimpleDocTemplate(
-        output_path,
+        buf,
         pagesize=A4,
         topMargin=1.5 * cm,
         bottomMargin=1.5 * cm,
@@ -281,134 +493,59 @@ def generate_cheat_sheet(prospect, output_path=None):
     )
 
     page_width = A4[0] - 4 * cm  # usable width
-    styles = getSampleStyleSheet()
-
-    # ── Custom styles ──
-    title_style = ParagraphStyle(
-        "CheatTitle",
-        parent=styles["Title"],
-        fontSize=26,
-        textColor=DARK_GREEN,
-        spaceAfter=4 * mm,
-        alignment=TA_CENTER,
-        fontName="Helvetica-Bold",
-    )
-    subtitle_style = ParagraphStyle(
-        "CheatSubtitle",
-        parent=styles["Normal"],
-        fontSize=13,
-        textColor=TEXT_DARK,
-        spaceAfter=8 * mm,
-        alignment=TA_CENTER,
-        leading=18,
-    )
-    heading_style = ParagraphStyle(
-        "CheatHeading",
-        parent=styles["Heading2"],
-        fontSize=16,
-        textColor=DARK_GREEN,
-        spaceBefore=6 * mm,
-        spaceAfter=3 * mm,
-        fontName="Helvetica-Bold",
-    )
-    body_style = ParagraphStyle(
-        "CheatBody",
-        parent=styles["Normal"],
-        fontSize=11,
-        textColor=TEXT_DARK,
-        spaceAfter=3 * mm,
-        leading=16,
-    )
-    step_title_style = ParagraphStyle(
-        "StepTitle",
-        parent=styles["Normal"],
-        fontSize=13,
-        textColor=DARK_GREEN,
-        spaceAfter=2 * mm,
-        fontName="Helvetica-Bold",
-    )
-    step_body_style = ParagraphStyle(
-        "StepBody",
-        parent=styles["Normal"],
-        fontSize=10.5,
-        textColor=TEXT_DARK,
-        leading=15,
-    )
-    cta_style = ParagraphStyle(
-        "CTA",
-        parent=styles["Normal"],
-        fontSize=14,
-        textColor=WHITE,
-        alignment=TA_CENTER,
-        fontName="Helvetica-Bold",
-        spaceAfter=0,
-    )
-    footer_style = ParagraphStyle(
-        "Footer",
-        parent=styles["Normal"],
-        fontSize=9,
-        textColor=HexColor("#888888"),
-        alignment=TA_CENTER,
-        spaceBefore=8 * mm,
-    )
+    styles = _styles()
 
     elements = []
 
     # ── KLIQ Banner ──
-    banner = _download_image(KLIQ_BANNER_URL, max_width=page_width)
+    banner = _remote_image(KLIQ_BANNER_URL, page_width)
     if banner:
         banner.hAlign = "CENTER"
         elements.append(banner)
         elements.append(Spacer(1, 8 * mm))
 
     # ── Niche Hero Image ──
-    niche_img_path = NICHE_IMAGES.get(coach_type, DEFAULT_NICHE_IMAGE)
-    if os.path.exists(niche_img_path):
-        niche_img = Image(niche_img_path)
-        iw, ih = niche_img.drawWidth, niche_img.drawHeight
-        ratio = page_width / iw
-        niche_img.drawWidth = page_width
-        niche_img.drawHeight = ih * ratio
-        # Cap height so it doesn't dominate the page
-        max_h = 180
-        if niche_img.drawHeight > max_h:
-            ratio2 = max_h / niche_img.drawHeight
-            niche_img.drawHeight = max_h
-            niche_img.drawWidth = niche_img.drawWidth * ratio2
+    niche_img = _local_image(
+        NICHE_IMAGES.get(coach_type, DEFAULT_NICHE_IMAGE),
+        max_width=page_width,
+        max_height=180,  # cap height so it doesn't dominate the page
+        stretch=True,
+    )
+    if niche_img:
         niche_img.hAlign = "CENTER"
         elements.append(niche_img)
         elements.append(Spacer(1, 6 * mm))
 
     # ── Title ──
-    elements.append(Paragraph("Your First 100 Paying Subscribers", title_style))
+    elements.append(Paragraph("Your First 100 Paying Subscribers", styles["title"]))
     elements.append(
         Paragraph(
             f"A personalised guide for <b>{first_name}</b> — {niche['title']}",
-            subtitle_style,
+            styles["subtitle"],
         )
     )
     elements.append(HRFlowable(width="100%", thickness=2, color=DARK_GREEN))
     elements.append(Spacer(1, 6 * mm))
 
     # ── Intro ──
-    elements.append(Paragraph(f"Hey {first_name},", heading_style))
+    elements.append(Paragraph(f"Hey {first_name},", styles["heading"]))
     elements.append(
         Paragraph(
             f"Welcome to KLIQ. You've taken the first step by setting up <b>{app_name}</b>. "
             f"As a {niche['title'].lower()}, here's your roadmap to "
             f"{niche['hook'].lower()}.",
-            body_style,
+            styles["body"],
         )
     )
     elements.append(Spacer(1, 4 * mm))
 
     # ── 5-Step Roadmap (neo-brutalist cards) ──
-    elements.append(Paragraph("Your 5-Step Roadmap", heading_style))
+    elements.append(Paragraph("Your 5-Step Roadmap", styles["heading"]))
 
     for i, (tip_title, tip_body) in enumerate(niche["tips"], 1):
         card_content = [
-            Paragraph(f"Step {i}: {tip_title}", step_title_style),
-            Paragraph(tip_body, step_body_style),
+            Paragraph(f"Step {i}: {tip_title}", styles["step_title"]),
+            Paragraph(tip_body, styles["step_body"]),
         ]
         card = _make_card(card_content, CARD_COLOURS[i - 1], page_width)
         elements.append(KeepTogether([card, Spacer(1, 4 * mm)]))
@@ -419,7 +556,7 @@ def generate_cheat_sheet(prospect, output_path=None):
     elements.append(HRFlowable(width="100%", thickness=1, color=HexColor("#DDDDDD")))
     elements.append(Spacer(1, 4 * mm))
 
-    tp_img = _download_image(TRUSTPILOT_IMG_URL, max_width=page_width * 0.7)
+    tp_img = _remote_image(TRUSTPILOT_IMG_URL, page_width * 0.7)
     if tp_img:
         tp_img.hAlign = "CENTER"
         elements.append(tp_img)
@@ -428,46 +565,28 @@ def generate_cheat_sheet(prospect, output_path=None):
     elements.append(
         Paragraph(
             "Trusted by 100s of coaches worldwide",
-            ParagraphStyle(
-                "TPCaption",
-                parent=styles["Normal"],
-                fontSize=11,
-                textColor=TEXT_DARK,
-                alignment=TA_CENTER,
-                spaceAfter=6 * mm,
-            ),
+            styles["tp_caption"],
         )
     )
 
     # ── Book a Call CTA ──
     elements.append(Spacer(1, 4 * mm))
-    elements.append(Paragraph("Ready to fast-track your growth?", heading_style))
+    elements.append(Paragraph("Ready to fast-track your growth?", styles["heading"]))
     elements.append(
         Paragraph(
             "We offer a <b>white-glove setup service</b> where our team builds out your app, "
             "creates your first program, and gets you launch-ready in 48 hours.",
-            body_style,
+            styles["body"],
         )
     )
 
     # CTA button as a styled table
     cta_text = Paragraph(
         f'<a href="https://{CALENDLY_URL}" color="white">Book a Free Setup Call</a>',
-        cta_style,
+        styles["cta"],
     )
     cta_table = Table([[cta_text]], colWidths=[page_width * 0.6])
-    cta_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, -1), DARK_GREEN),
-                ("ROUNDEDCORNERS", [8, 8, 8, 8]),
-                ("TOPPADDING", (0, 0), (-1, -1), 12),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ]
-        )
-    )
+    cta_table.setStyle(_CTA_STYLE)
     cta_table.hAlign = "CENTER"
     elements.append(Spacer(1, 3 * mm))
     elements.append(cta_table)
@@ -476,13 +595,7 @@ def generate_cheat_sheet(prospect, output_path=None):
     elements.append(
         Paragraph(
             f"Or visit: <b>{CALENDLY_URL}</b>",
-            ParagraphStyle(
-                "CTALink",
-                parent=styles["Normal"],
-                fontSize=10,
-                textColor=LINK_TEAL,
-                alignment=TA_CENTER,
-            ),
+            styles["cta_link"],
         )
     )
 
@@ -490,7 +603,7 @@ def generate_cheat_sheet(prospect, output_path=None):
     elements.append(Spacer(1, 10 * mm))
     elements.append(HRFlowable(width="100%", thickness=1, color=HexColor("#DDDDDD")))
 
-    footer_logo = _download_image(KLIQ_FOOTER_URL, max_width=page_width * 0.5)
+    footer_logo = _remote_image(KLIQ_FOOTER_URL, page_width * 0.5)
     if footer_logo:
         footer_logo.hAlign = "CENTER"
         elements.append(Spacer(1, 4 * mm))
@@ -499,15 +612,168 @@ def generate_cheat_sheet(prospect, output_path=None):
     elements.append(
         Paragraph(
             "Remote Coach Ltd Trading as KLIQ | joinkliq.io",
-            footer_style,
+            styles["footer"],
         )
     )
 
     doc.build(elements)
+    return buf.getvalue(), missing
+
+
+def generate_cheat_sheet(prospect, output_path=None):
+    """
+    Generate a personalised cheat sheet PDF for a prospect and write it to
+    output_path (default: CHEAT_SHEET_OUTPUT_DIR/cheatsheet_<app_id>.pdf).
+
+    Returns:
+        Path to the generated PDF.
+    """
+    if output_path is None:
+        app_id = prospect.get("application_id", "unknown")
+        output_path = os.path.join(CHEAT_SHEET_OUTPUT_DIR, f"cheatsheet_{app_id}.pdf")
+    pdf = render_cheat_sheet(prospect)
+    with open(output_path, "wb") as f:
+        f.write(pdf)
     print(f"[PDF] Generated cheat sheet: {output_path}")
     return output_path
 
 
+# ── Pre-generation ──
+# Cheat sheets are rendered in a background process pool as soon as a
+# prospect is synced, and cached as cheatsheet_<app_id>_<profile hash>.pdf,
+# so the email step attaches a ready file instead of rendering inline.
+TEMPLATE_VERSION = 1  # bump when the layout changes to re-render cached PDFs
+PREGENERATE_WAIT_SECONDS = 60  # how long the send path waits for a queued render
+MAX_PREGENERATE_WORKERS = 2  # cap for CHEAT_SHEET_WORKERS=0 (one per CPU)
+
+_pool = None
+_pending = {}  # cache path -> Future of a queued render
+_pending_lock = threading.Lock()
+
+
+def profile_hash(prospect):
+    """Hash of everything a prospect's cheat sheet depends on."""
+    payload = json.dumps([TEMPLATE_VERSION, *_render_fields(prospect)], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def cached_cheat_sheet_path(prospect):
+    """Where the cheat sheet for this prospect/profile is (or will be) cached."""
+    app_id = prospect.get("application_id", "unknown")
+    return os.path.join(
+        CHEAT_SHEET_OUTPUT_DIR, f"cheatsheet_{app_id}_{profile_hash(prospect)}.pdf"
+    )
+
+
+def _atomic_write(pdf, path):
+    """Write so readers never see a partial PDF."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, path)
+
+
+def _write_cheat_sheet(fields, path):
+    """
+    Render into the cache at path. A render missing remote images (download
+    failed) is not cached — it would be reused for every later send — so
+    this returns None and the send path renders again.
+    """
+    pdf, missing = _render_pdf(fields)
+    if missing:
+        print(f"[PDF] Not caching {path}: missing images {', '.join(missing)}")
+        return None
+    _atomic_write(pdf, path)
+    return path
+
+
+def _get_pool():
+    """The pre-generation pool (callers hold _pending_lock).
+
+    Workers are spawned, not forked: the pool is started from the autopilot
+    thread of a threaded gunicorn worker that holds gRPC clients, which are
+    unsafe to fork.
+    """
+    global _pool
+    if _pool is None:
+        workers = CHEAT_SHEET_WORKERS or min(
+            os.cpu_count() or 1, MAX_PREGENERATE_WORKERS
+        )
+        _pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _render_input(prospect):
+    """The picklable subset of a prospect that render_cheat_sheet reads."""
+    return {
+        k: prospect[k]
+        for k in ("name", "coach_type", "app_name")
+        if k in prospect
+    }
+
+
+def pregenerate_cheat_sheets(prospects):
+    """
+    Queue background renders for prospects whose cheat sheet is not cached
+    yet. Returns immediately with the number of renders queued.
+    """
+    global _pool
+    queued = 0
+    for prospect in prospects:
+        path = cached_cheat_sheet_path(prospect)
+        with _pending_lock:
+            if path in _pending or os.path.exists(path):
+                continue
+            try:
+                fut = _get_pool().submit(
+                    _write_cheat_sheet, _render_input(prospect), path
+                )
+            except Exception as e:  # broken pool (a worker died): start a fresh one
+                print(f"[PDF] Could not queue cheat sheet pre-generation: {e}")
+                _pool = None
+                break
+            _pending[path] = fut
+        fut.add_done_callback(lambda f, p=path: _done(p, f))
+        queued += 1
+    return queued
+
+
+def _done(path, fut):
+    with _pending_lock:
+        _pending.pop(path, None)
+    if fut.exception() is not None:
+        print(f"[PDF] Pre-generating {path} failed: {fut.exception()}")
+
+
+def cheat_sheet_path(prospect):
+    """
+    Path to a ready cheat sheet PDF for the email step: the pre-generated
+    file if there is one, waiting briefly for a queued render, otherwise
+    rendered inline. An inline render missing remote images is written
+    next to the cache (…_incomplete.pdf) for this send only.
+    """
+    path = cached_cheat_sheet_path(prospect)
+    if os.path.exists(path):
+        return path
+    with _pending_lock:
+        fut = _pending.get(path)
+    if fut is not None:
+        try:
+            fut.result(timeout=PREGENERATE_WAIT_SECONDS)
+        except Exception:
+            pass
+        if os.path.exists(path):
+            return path
+    pdf, missing = _render_pdf(_render_input(prospect))
+    if missing:
+        path = path[: -len(".pdf")] + "_incomplete.pdf"
+    _atomic_write(pdf, path)
+    print(f"[PDF] Generated cheat sheet: {path}")
+    return path
+
+
 if __name__ == "__main__":
     test_prospect = {
         "name": "Britteny La'Shay",
@@ -39,6 +39,8 @@ SES_FROM_NAME = os.getenv("SES_FROM_NAME", "Ben from KLIQ")
 BREVO_API_KEY = os.getenv("BREVO_API_KEY")
 BREVO_FROM_EMAIL = os.getenv("BREVO_FROM_EMAIL", "ben@joinkliq.io")
 BREVO_FROM_NAME = os.getenv("BREVO_FROM_NAME", "Ben from KLIQ")
+# List that bulk contact imports land in (Brevo's import API requires one)
+BREVO_CONTACT_LIST_ID = int(os.getenv("BREVO_CONTACT_LIST_ID", "0") or 0)
 
 # ── Calendly ──
 CALENDLY_API_TOKEN = os.getenv("CALENDLY_API_TOKEN", "")
@@ -53,6 +55,12 @@ META_AD_ACCOUNT_ID = os.getenv("META_AD_ACCOUNT_ID", "")  # e.g. act_XXXXXXXXX
 META_PAGE_ID = os.getenv("META_PAGE_ID", "")
 META_API_VERSION = "v21.0"
 
+# ── Send pipeline: per-provider quotas (messages/second) and worker pool size ──
+SES_MAX_SEND_RATE = float(os.getenv("SES_MAX_SEND_RATE", "14"))
+BREVO_MAX_SEND_RATE = float(os.getenv("BREVO_MAX_SEND_RATE", "10"))
+TWILIO_MAX_SEND_RATE = float(os.getenv("TWILIO_MAX_SEND_RATE", "10"))
+SEND_PIPELINE_WORKERS = int(os.getenv("SEND_PIPELINE_WORKERS", "8"))
+
 # ── Outreach settings ──
 POLL_INTERVAL_MINUTES = int(os.getenv("POLL_INTERVAL_MINUTES", "15"))
 DRY_RUN = os.getenv("DRY_RUN", "false").lower() == "true"
@@ -73,6 +81,11 @@ CHEAT_SHEET_OUTPUT_DIR = os.path.join(
     os.path.dirname(__file__), "output", "cheat_sheets"
 )
 os.makedirs(CHEAT_SHEET_OUTPUT_DIR, exist_ok=True)
+# Downloaded brand images, keyed by URL hash (see cheat_sheet._source_bytes)
+IMAGE_CACHE_DIR = os.path.join(os.path.dirname(__file__), "output", "image_cache")
+os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+# Background cheat sheet pre-generation processes (0 = one per CPU, at most 2)
+CHEAT_SHEET_WORKERS = int(os.getenv("CHEAT_SHEET_WORKERS", "0"))
 
 # ── Database (SQLite for tracking sent messages) ──
 DB_PATH = os.path.join(os.path.dirname(__file__), "outreach.db")
@@ -10,6 +10,7 @@ Provider controlled by EMAIL_PROVIDER env var:
 import base64
 import logging
 import requests
+from urllib3.exceptions import NewConnectionError
 from config import (
     BREVO_API_KEY,
     BREVO_FROM_EMAIL,
@@ -27,11 +28,13 @@ log = logging.getLogger("email_sender")
 
 BREVO_API_URL = "https://api.brevo.com/v3/smtp/email"
 OUTREACH_TAG = "kliq-outreach"
+UNKNOWN_MESSAGE_ID = "unknown"  # sent (or possibly sent) without a provider message ID
 REPLY_TO_EMAIL = "ben@joinkliq.io"
 REPLY_TO_NAME = "Ben from KLIQ"
 
-# ── Lazy SES client ──
+# ── Lazy SES client / pooled Brevo session (reused across sends) ──
 _ses_client = None
+_brevo_session = None
 
 
 def _get_ses_client():
@@ -48,6 +51,20 @@ def _get_ses_client():
     return _ses_client
 
 
+def _get_brevo_session():
+    global _brevo_session
+    if _brevo_session is None:
+        _brevo_session = requests.Session()
+        _brevo_session.headers.update(
+            {
+                "accept": "application/json",
+                "content-type": "application/json",
+                "api-key": BREVO_API_KEY or "",
+            }
+        )
+    return _brevo_session
+
+
 # ── SES sender ──
 def _send_via_ses(to_email, subject, html_body, attachment_path=None):
     """Send email via AWS SES. Returns message ID or None."""
@@ -130,16 +147,10 @@ def _send_via_brevo(to_email, subject, html_body, attachment_path=None):
             {"content": encoded, "name": "KLIQ_Growth_Cheatsheet.pdf"}
         ]
 
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "api-key": BREVO_API_KEY,
-    }
-
     try:
-        resp = requests.post(BREVO_API_URL, json=payload, headers=headers, timeout=30)
+        resp = _get_brevo_session().post(BREVO_API_URL, json=payload, timeout=30)
         resp.raise_for_status()
-        msg_id = resp.json().get("messageId", "unknown")
+        msg_id = resp.json().get("messageId", UNKNOWN_MESSAGE_ID)
         log.info(f"EMAIL SENT [Brevo] ID={msg_id} to={to_email}")
         return msg_id
     except requests.exceptions.HTTPError as e:
@@ -150,6 +161,104 @@ def _send_via_brevo(to_email, subject, html_body, attachment_path=None):
         return None
 
 
+def _request_not_sent(exc):
+    """True if a requests error happened before the request reached the server."""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def _send_batch_via_brevo(messages):
+    """
+    Send several attachment-free emails in one Brevo request using
+    messageVersions (one version per recipient, each with its own subject
+    and HTML). Returns a list of message IDs aligned with messages, or None
+    only if the batch was definitely not sent (HTTP 4xx, or the connection
+    failed before the request went out).
+
+    Any 2xx counts as sent; if Brevo returns a different number of IDs than
+    messages, every ID is UNKNOWN_MESSAGE_ID. When the outcome is unclear
+    (HTTP 5xx, a timeout or error after the request went out) the IDs are
+    UNKNOWN_MESSAGE_ID too, so callers record the batch instead of
+    re-sending it and emailing prospects twice.
+    """
+    if not BREVO_API_KEY or not messages:
+        return None
+
+    payload = {
+        "sender": {"email": BREVO_FROM_EMAIL, "name": BREVO_FROM_NAME},
+        "subject": messages[0]["subject"],
+        "htmlContent": messages[0]["html_body"],
+        "tags": [OUTREACH_TAG],
+        "replyTo": {"email": REPLY_TO_EMAIL, "name": REPLY_TO_NAME},
+        "messageVersions": [
+            {
+                "to": [{"email": m["to_email"]}],
+                "subject": m["subject"],
+                "htmlContent": m["html_body"],
+            }
+            for m in messages
+        ],
+    }
+    unconfirmed = [UNKNOWN_MESSAGE_ID] * len(messages)
+
+    try:
+        resp = _get_brevo_session().post(BREVO_API_URL, json=payload, timeout=60)
+    except requests.exceptions.RequestException as e:
+        if _request_not_sent(e):
+            log.error(f"EMAIL BATCH ERROR [Brevo] {len(messages)} messages not sent: {e}")
+            return None
+        log.error(
+            f"EMAIL BATCH UNCONFIRMED [Brevo] {len(messages)} messages: {e} "
+            f"— may have been sent, not resending"
+        )
+        return unconfirmed
+
+    if 400 <= resp.status_code < 500:
+        log.error(
+            f"EMAIL BATCH REJECTED [Brevo] {len(messages)} messages: "
+            f"HTTP {resp.status_code} — {resp.text[:200]}"
+        )
+        return None
+    if not resp.ok:
+        log.error(
+            f"EMAIL BATCH UNCONFIRMED [Brevo] {len(messages)} messages: "
+            f"HTTP {resp.status_code} — may have been sent, not resending"
+        )
+        return unconfirmed
+
+    try:
+        msg_ids = resp.json().get("messageIds") or []
+    except ValueError:
+        msg_ids = []
+    if len(msg_ids) != len(messages):
+        log.warning(
+            f"EMAIL BATCH [Brevo] returned {len(msg_ids)} IDs for {len(messages)} "
+            f"messages — recording them as sent with unknown IDs"
+        )
+        return unconfirmed
+    log.info(f"EMAIL BATCH SENT [Brevo] {len(messages)} messages")
+    return msg_ids
+
+
+# Provider name → single-message sender, in the order EMAIL_PROVIDER routes them
+EMAIL_SENDERS = {
+    "ses": _send_via_ses,
+    "brevo": _send_via_brevo,
+}
+
+
+def provider_chain():
+    """Providers to try, in order, for the configured EMAIL_PROVIDER."""
+    provider = EMAIL_PROVIDER.lower().strip()
+    if provider in EMAIL_SENDERS:
+        return [provider]
+    # Default: ses+brevo — SES first, Brevo fallback
+    return ["ses", "brevo"]
+
+
 # ── Main send function ──
 def send_email(to_email, subject, html_body, attachment_path=None):
     """
@@ -164,18 +273,14 @@ def send_email(to_email, subject, html_body, attachment_path=None):
         log.info(f"[DRY RUN] Email to {to_email}: Subject={subject}")
         return "dry_run"
 
-    provider = EMAIL_PROVIDER.lower().strip()
-
-    if provider == "brevo":
-        return _send_via_brevo(to_email, subject, html_body, attachment_path)
-
-    if provider == "ses":
-        return _send_via_ses(to_email, subject, html_body, attachment_path)
-
-    # Default: ses+brevo — try SES first, Brevo fallback
-    msg_id = _send_via_ses(to_email, subject, html_body, attachment_path)
-    if msg_id:
-        return msg_id
-
-    log.info(f"SES failed for {to_email} — falling back to Brevo")
-    return _send_via_brevo(to_email, subject, html_body, attachment_path)
+    chain = provider_chain()
+    for i, provider in enumerate(chain):
+        msg_id = EMAIL_SENDERS[provider](to_email, subject, html_body, attachment_path)
+        if msg_id:
+            return msg_id
+        if i + 1 < len(chain):
+            log.info(
+                f"{provider.upper()} failed for {to_email} — "
+                f"falling back to {chain[i + 1].capitalize()}"
+            )
+    return None
@@ -1,27 +1,43 @@
 """
 Google Sheets integration for Facebook Lead Ads.
 Reads leads from the shared Google Sheet and syncs them into the local SQLite tracker.
+
+sync_sheet_leads is diff-based: it remembers the last processed row (and a
+hash of it) per sheet, only fetches rows appended since then, and falls back
+to a full re-read if rows shifted underneath it.
 """
 
+import hashlib
 import re
 from datetime import datetime, timezone, timedelta
 from dateutil import parser as dtparser
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from config import SERVICE_ACCOUNT_KEY, DRY_RUN
-from tracker import upsert_fb_lead, get_fb_leads, fb_already_sent, record_fb_sent
+from tracker import (
+    bulk_upsert_fb_leads,
+    get_fb_leads,
+    fb_already_sent,
+    record_fb_sent,
+    get_sheet_sync_state,
+    set_sheet_sync_state,
+)
 from sequences import render_email
-from email_sender import send_email
+from send_pipeline import SendPipeline
 from dedup_guard import email_already_delivered
-from brevo_contacts import sync_contact_from_fb_lead
+from brevo_contacts import import_contacts, contact_from_fb_lead
 
 # ── Delay before auto-sending email (hours) ──
 FB_EMAIL_DELAY_HOURS = 12
 
 # ── Sheet config ──
 FB_LEADS_SHEET_ID = "1D6ScYyqAbuRZCdx6jrOoTDH-5WlwvcH5UzokGsVrx6s"
+FB_LEADS_TAB = "Meta 2"
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
 
+# Key for the diff-sync cursor in tracker.sheet_sync_state
+_SHEET_KEY = f"{FB_LEADS_SHEET_ID}:{FB_LEADS_TAB}"
+
 # Column mappings per sheet (0-indexed positions from header row)
 # Meta:  created_time(1), campaign_name(7), which_coaching_niche(12), email(13), first_name(14), phone(15), lead_status(17)
 # Meta 2: created_time(1), campaign_name(7), which_coaching_niche(12), email(13), first_name(14), whatsapp_number(15), lead_status(16)
@@ -69,6 +85,58 @@ def _safe_get(row, idx, default=""):
         return default
 
 
+def _parse_lead_row(row):
+    """Map a 'Meta 2' sheet row to a lead dict, or None if it has no email."""
+    email = _safe_get(row, 13)
+    if not email or "@" not in email:
+        # Meta 2 has a slightly different layout — email might be at index 12
+        email = _safe_get(row, 12)
+        if not email or "@" not in email:
+            return None
+        # Shifted layout: email=12, first_name=13, phone=14
+        return {
+            "first_name": _safe_get(row, 13),
+            "last_name": "",
+            "email": email.lower(),
+            "phone": _clean_phone(_safe_get(row, 14)),
+            "campaign": "fb_new_lead",
+            "lead_date": _safe_get(row, 1),
+            "niche": "",
+            "platform": _safe_get(row, 11),
+            "ad_name": _safe_get(row, 3),
+            "campaign_name": _safe_get(row, 7),
+            "source_sheet": FB_LEADS_TAB,
+        }
+    return {
+        "first_name": _safe_get(row, 14),
+        "last_name": "",
+        "email": email.lower(),
+        "phone": _clean_phone(_safe_get(row, 15)),
+        "campaign": "fb_new_lead",
+        "lead_date": _safe_get(row, 1),
+        "niche": _safe_get(row, 12),
+        "platform": _safe_get(row, 11),
+        "ad_name": _safe_get(row, 3),
+        "campaign_name": _safe_get(row, 7),
+        "source_sheet": FB_LEADS_TAB,
+    }
+
+
+def _row_hash(row):
+    """Stable fingerprint of a sheet row's cell values."""
+    return hashlib.sha1("\x1f".join(str(c) for c in row).encode()).hexdigest()
+
+
+def _read_range(service, a1_range):
+    result = (
+        service.spreadsheets()
+        .values()
+        .get(spreadsheetId=FB_LEADS_SHEET_ID, range=a1_range)
+        .execute()
+    )
+    return result.get("values", [])
+
+
 def fetch_sheet_leads():
     """
     Read leads from the 'Meta 2' sheet.
@@ -82,56 +150,12 @@ def fetch_sheet_leads():
 
     try:
         # ── Meta 2 sheet (active leads) ──
-        result = (
-            service.spreadsheets()
-            .values()
-            .get(
-                spreadsheetId=FB_LEADS_SHEET_ID,
-                range="'Meta 2'!A1:Z500",
-            )
-            .execute()
-        )
-        rows = result.get("values", [])
+        rows = _read_range(service, f"'{FB_LEADS_TAB}'!A1:Z500")
         if len(rows) > 1:
             for row in rows[1:]:
-                email = _safe_get(row, 13)
-                if not email or "@" not in email:
-                    # Meta 2 has a slightly different layout — email might be at index 12
-                    email = _safe_get(row, 12)
-                    if not email or "@" not in email:
-                        continue
-                    # Shifted layout: email=12, first_name=13, phone=14
-                    all_leads.append(
-                        {
-                            "first_name": _safe_get(row, 13),
-                            "last_name": "",
-                            "email": email.lower(),
-                            "phone": _clean_phone(_safe_get(row, 14)),
-                            "campaign": "fb_new_lead",
-                            "lead_date": _safe_get(row, 1),
-                            "niche": "",
-                            "platform": _safe_get(row, 11),
-                            "ad_name": _safe_get(row, 3),
-                            "campaign_name": _safe_get(row, 7),
-                            "source_sheet": "Meta 2",
-                        }
-                    )
-                else:
-                    all_leads.append(
-                        {
-                            "first_name": _safe_get(row, 14),
-                            "last_name": "",
-                            "email": email.lower(),
-                            "phone": _clean_phone(_safe_get(row, 15)),
-                            "campaign": "fb_new_lead",
-                            "lead_date": _safe_get(row, 1),
-                            "niche": _safe_get(row, 12),
-                            "platform": _safe_get(row, 11),
-                            "ad_name": _safe_get(row, 3),
-                            "campaign_name": _safe_get(row, 7),
-                            "source_sheet": "Meta 2",
-                        }
-                    )
+                lead = _parse_lead_row(row)
+                if lead:
+                    all_leads.append(lead)
             print(
                 f"[GSHEET] Meta 2 sheet: {len(rows)-1} rows, {len(all_leads)} valid leads"
             )
@@ -144,41 +168,69 @@ def fetch_sheet_leads():
     return all_leads
 
 
+def fetch_new_sheet_leads():
+    """
+    Read only the 'Meta 2' rows appended since the last sync.
+
+    The previously processed row is re-read and compared against its stored
+    hash; if it changed (rows deleted or re-sorted above the cursor) the whole
+    sheet is re-read instead. Returns (leads, last_row, last_row_hash) — the cursor to
+    store once the leads are persisted — or ([], None, None) on error.
+    """
+    service = _get_sheets_service()
+    if not service:
+        return [], None, None
+
+    last_row, last_hash = get_sheet_sync_state(_SHEET_KEY)
+
+    try:
+        if last_row:
+            rows = _read_range(service, f"'{FB_LEADS_TAB}'!A{last_row}:Z")
+            if rows and _row_hash(rows[0]) == last_hash:
+                start_row, rows = last_row + 1, rows[1:]
+            else:
+                print("[GSHEET] Sheet changed above sync cursor — full re-read")
+                last_row = None
+        if not last_row:
+            # Row 1 is the header
+            start_row = 2
+            rows = _read_range(service, f"'{FB_LEADS_TAB}'!A{start_row}:Z")
+    except Exception as e:
+        print(f"[GSHEET ERROR] Failed to read sheet: {e}")
+        return [], None, None
+
+    if not rows:
+        return [], last_row, last_hash
+
+    leads = [lead for lead in (_parse_lead_row(r) for r in rows) if lead]
+    print(
+        f"[GSHEET] Meta 2 sheet: {len(rows)} new rows from row {start_row}, {len(leads)} valid leads"
+    )
+    return leads, start_row + len(rows) - 1, _row_hash(rows[-1])
+
+
 def sync_sheet_leads():
     """
-    Fetch leads from Google Sheet and upsert into the local SQLite tracker.
+    Fetch newly appended leads from Google Sheet and bulk-upsert them into
+    the local SQLite tracker. New leads are imported to Brevo in one batch.
     Returns the number of new leads added.
     """
-    leads = fetch_sheet_leads()
-    if not leads:
-        return 0
+    leads, last_row, last_hash = fetch_new_sheet_leads()
+    new_leads = bulk_upsert_fb_leads(leads, source="google_sheet") if leads else []
 
-    # Get existing leads to count new ones
-    existing = {l["email"].lower() for l in get_fb_leads(campaign="fb_new_lead")}
+    if new_leads:
+        # Sync new leads to Brevo contact list with niche as coach_type
+        try:
+            import_contacts([contact_from_fb_lead(lead) for lead in new_leads])
+        except Exception as e:
+            print(f"[BREVO SYNC] Batch import error for {len(new_leads)} leads: {e}")
 
-    new_count = 0
-    for lead in leads:
-        was_new = lead["email"].lower() not in existing
-        upsert_fb_lead(
-            first_name=lead["first_name"],
-            last_name=lead["last_name"],
-            email=lead["email"],
-            phone=lead["phone"],
-            campaign=lead["campaign"],
-            lead_date=lead["lead_date"],
-            source="google_sheet",
-        )
-        if was_new:
-            new_count += 1
-            existing.add(lead["email"].lower())
-            # Sync new lead to Brevo contact list with niche as coach_type
-            try:
-                sync_contact_from_fb_lead(lead)
-            except Exception as e:
-                print(f"[BREVO SYNC] Error for {lead['email']}: {e}")
+    if last_row:
+        set_sheet_sync_state(_SHEET_KEY, last_row, last_hash)
 
-    print(f"[GSHEET] Synced {len(leads)} leads ({new_count} new)")
-    return new_count
+    if leads:
+        print(f"[GSHEET] Synced {len(leads)} leads ({len(new_leads)} new)")
+    return len(new_leads)
 
 
 def _parse_lead_date(lead_date_str):
@@ -206,7 +258,7 @@ def process_fb_leads():
         return 0
 
     now = datetime.now(timezone.utc)
-    sent_count = 0
+    outbox = []
 
     for lead in leads:
         email = lead.get("email", "")
@@ -240,14 +292,32 @@ def process_fb_leads():
             "email": email,
         }
 
-        # Send the email
         subject, body = render_email("fb_new_lead", prospect)
-        msg_id = send_email(email, subject, body)
-        if msg_id:
-            record_fb_sent(email, "fb_new_lead", "email", email, msg_id)
+        outbox.append(
+            {
+                "to_email": email,
+                "subject": subject,
+                "html_body": body,
+                "first_name": first_name,
+                "hours_since": hours_since,
+            }
+        )
+
+    if not outbox:
+        return 0
+
+    # Send the emails concurrently, within provider rate limits
+    with SendPipeline() as pipeline:
+        results = pipeline.send_emails(outbox)
+
+    sent_count = 0
+    for msg, res in zip(outbox, results):
+        email, first_name = msg["to_email"], msg["first_name"]
+        if res["ok"]:
+            record_fb_sent(email, "fb_new_lead", "email", email, res["message_id"])
             sent_count += 1
             print(
-                f"[FB AUTO-SEND] Email sent to {first_name} ({email}) — {hours_since:.1f}h after lead"
+                f"[FB AUTO-SEND] Email sent to {first_name} ({email}) — {msg['hours_since']:.1f}h after lead"
             )
         else:
             print(
@@ -0,0 +1,28 @@
+"""
+Thread-safe request pacing shared by the API clients (Calendly tracker, and
+the App Store Connect / TikTok fetchers in refresh_dashboard.py).
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls at a fixed minimum interval."""
+
+    def __init__(self, per_second):
+        self._interval = 1.0 / per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    @classmethod
+    def per_minute(cls, per_minute):
+        return cls(per_minute / 60.0)
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            time.sleep(delay)
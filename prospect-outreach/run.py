@@ -15,7 +15,7 @@ from tracker import already_sent, record_sent, upsert_prospect, get_prospect
 from sequences import render_sms, render_email
 from sms_sender import send_sms
 from email_sender import send_email
-from cheat_sheet import generate_cheat_sheet
+from cheat_sheet import cheat_sheet_path, pregenerate_cheat_sheets
 from exclusions import is_excluded, refresh_active_apps
 from name_resolver import resolve_greeting
 from gsheet_leads import sync_sheet_leads, process_fb_leads
@@ -67,6 +67,10 @@ def process_signup(signup):
         profile_json=json.dumps(profile, default=str),
     )
 
+    # Pre-render the cheat sheet in the background for the profile_uploaded step
+    if email and not already_sent(app_id, "cheat_sheet", "email"):
+        pregenerate_cheat_sheets([profile])
+
     # Welcome email
     if email and not already_sent(app_id, "welcome", "email"):
         subject, body = render_email("welcome", profile)
@@ -149,7 +153,7 @@ def process_event(event):
 
         # Email: cheat sheet
         if email and not already_sent(app_id, "cheat_sheet", "email"):
-            pdf_path = generate_cheat_sheet(prospect)
+            pdf_path = cheat_sheet_path(prospect)
             subject, html_body = render_email("cheat_sheet", prospect)
             msg_id = send_email(email, subject, html_body, attachment_path=pdf_path)
             record_sent(app_id, "cheat_sheet", "email", email, msg_id)
@@ -0,0 +1,184 @@
+"""
+Send pipeline — delivers many emails / SMS concurrently while staying inside
+each provider's quota.
+
+A SendPipeline owns a bounded worker pool and one token bucket per provider
+(SES, Brevo, Twilio). Senders reuse the cached SES client, pooled Brevo
+session and cached Twilio client from email_sender / sms_sender, so throughput
+is limited by provider quotas rather than by connection setup or our loop.
+
+Usage:
+    with SendPipeline() as pipeline:
+        results = pipeline.send_emails(
+            [{"to_email": ..., "subject": ..., "html_body": ...}, ...]
+        )
+    # results[i] = {"recipient", "message_id", "provider", "ok"}
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import email_sender
+import sms_sender
+from config import (
+    DRY_RUN,
+    SES_MAX_SEND_RATE,
+    BREVO_MAX_SEND_RATE,
+    TWILIO_MAX_SEND_RATE,
+    SEND_PIPELINE_WORKERS,
+)
+
+log = logging.getLogger("send_pipeline")
+
+# Brevo accepts many messageVersions per request; keep batches modest
+BREVO_BATCH_SIZE = 50
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, bursting up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` tokens are available, then take them."""
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SendPipeline:
+    """Bounded, rate-limited worker pool for outreach sends."""
+
+    def __init__(
+        self,
+        max_workers=SEND_PIPELINE_WORKERS,
+        ses_rate=SES_MAX_SEND_RATE,
+        brevo_rate=BREVO_MAX_SEND_RATE,
+        twilio_rate=TWILIO_MAX_SEND_RATE,
+    ):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="send"
+        )
+        self._buckets = {
+            "ses": TokenBucket(ses_rate),
+            "brevo": TokenBucket(brevo_rate, capacity=BREVO_BATCH_SIZE),
+            "twilio": TokenBucket(twilio_rate),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    # ── Email ──
+
+    def _send_one_email(self, msg):
+        to_email = msg["to_email"]
+        chain = email_sender.provider_chain()
+        for i, provider in enumerate(chain):
+            self._buckets[provider].acquire()
+            msg_id = email_sender.EMAIL_SENDERS[provider](
+                to_email, msg["subject"], msg["html_body"], msg.get("attachment_path")
+            )
+            if msg_id:
+                return _result(to_email, msg_id, provider)
+            if i + 1 < len(chain):
+                log.info(
+                    f"{provider.upper()} failed for {to_email} — "
+                    f"falling back to {chain[i + 1].capitalize()}"
+                )
+        return _result(to_email, None, chain[-1])
+
+    def _send_brevo_batch(self, batch):
+        """
+        One messageVersions request. Falls back to single sends only if the
+        batch was definitely not sent; an unconfirmed batch is reported as
+        sent (with unknown IDs) so nobody gets the email twice.
+        """
+        self._buckets["brevo"].acquire(len(batch))
+        msg_ids = email_sender._send_batch_via_brevo(batch)
+        if msg_ids is not None:
+            return [
+                _result(m["to_email"], mid, "brevo") for m, mid in zip(batch, msg_ids)
+            ]
+        return [self._send_one_email(m) for m in batch]
+
+    def send_emails(self, messages):
+        """
+        Send emails concurrently. Each message is a dict with to_email, subject,
+        html_body and optional attachment_path. Returns per-message result dicts
+        in the same order as `messages`.
+        """
+        if DRY_RUN:
+            for m in messages:
+                log.info(f"[DRY RUN] Email to {m['to_email']}: Subject={m['subject']}")
+            return [_result(m["to_email"], "dry_run", "dry_run") for m in messages]
+
+        results = [None] * len(messages)
+        futures = []
+
+        # Brevo-only routing can batch attachment-free messages in one request
+        batchable = []
+        if email_sender.provider_chain() == ["brevo"]:
+            batchable = [
+                i for i, m in enumerate(messages) if not m.get("attachment_path")
+            ]
+        for start in range(0, len(batchable), BREVO_BATCH_SIZE):
+            idx = batchable[start : start + BREVO_BATCH_SIZE]
+            batch = [messages[i] for i in idx]
+            futures.append((idx, self._pool.submit(self._send_brevo_batch, batch)))
+
+        batched = set(batchable)
+        for i, m in enumerate(messages):
+            if i not in batched:
+                futures.append(([i], self._pool.submit(self._send_one_email, m)))
+
+        for idx, fut in futures:
+            out = fut.result()
+            for i, res in zip(idx, out if isinstance(out, list) else [out]):
+                results[i] = res
+        return results
+
+    # ── SMS ──
+
+    def _send_one_sms(self, msg):
+        self._buckets["twilio"].acquire()
+        sid = sms_sender.send_sms(msg["to_number"], msg["body"])
+        return _result(msg["to_number"], sid, "twilio")
+
+    def send_sms_batch(self, messages):
+        """
+        Send SMS concurrently. Each message is a dict with to_number and body.
+        Returns per-message result dicts in the same order as `messages`.
+        """
+        return list(self._pool.map(self._send_one_sms, messages))
+
+
+def _result(recipient, message_id, provider):
+    return {
+        "recipient": recipient,
+        "message_id": message_id,
+        "provider": provider,
+        "ok": bool(message_id),
+    }
@@ -12,6 +12,16 @@ log = logging.getLogger("sms_sender")
 # Messaging Service SID (Alpha Sender ID: "KLIQ")
 TWILIO_MESSAGING_SERVICE_SID = "MG6dda05b6ca48dd4359e7257b292379c0"
 
+# ── Lazy Twilio client (reused across sends; its HTTP session is pooled) ──
+_twilio_client = None
+
+
+def _get_twilio_client():
+    global _twilio_client
+    if _twilio_client is None:
+        _twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+    return _twilio_client
+
 
 def send_sms(to_number, body):
     """
@@ -27,7 +37,7 @@ def send_sms(to_number, body):
         return None
 
     try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        client = _get_twilio_client()
         message = client.messages.create(
             body=body,
             messaging_service_sid=TWILIO_MESSAGING_SERVICE_SID,
@@ -7,6 +7,14 @@ import sqlite3
 from datetime import datetime
 from config import DB_PATH
 
+# Attribution precedence, lowest wins — mirrors the order Calendly matching
+# has always used: latest outreach message, then FB lead, then organic signup.
+_ATTR_SENT = 1
+_ATTR_FB_LEAD = 2
+_ATTR_SIGNUP = 3
+
+_attribution_checked = False
+
 
 def _get_db():
     conn = sqlite3.connect(DB_PATH)
@@ -84,10 +92,196 @@ def _get_db():
         )
     """
     )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sheet_sync_state (
+            sheet_key TEXT PRIMARY KEY,     -- spreadsheet id + tab name
+            last_row INTEGER NOT NULL,      -- 1-based sheet row last processed
+            last_row_hash TEXT,             -- detects rows shifting under the cursor
+            updated_at TEXT
+        )
+    """
+    )
     conn.commit()
+    _ensure_attribution_index(conn)
     return conn
 
 
+# ── Attribution index ──
+# email_attribution maps a normalised email to its best-known campaign/channel
+# so booking attribution is a single primary-key lookup. campaign_send_stats
+# keeps per-campaign send counters so stats never re-scan sent_messages.
+
+
+def _ensure_attribution_index(conn):
+    """Create the attribution tables, backfilling them on first creation."""
+    global _attribution_checked
+    if _attribution_checked:
+        return
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'email_attribution'"
+    ).fetchone()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS email_attribution (
+            email TEXT PRIMARY KEY,         -- lower-cased recipient
+            campaign TEXT,
+            channel TEXT,
+            source_rank INTEGER NOT NULL,   -- 1 sent, 2 fb lead, 3 signup
+            updated_at TEXT
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_email_attribution_rank ON email_attribution(source_rank)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS campaign_recipients (
+            sequence_step TEXT NOT NULL,
+            recipient TEXT NOT NULL,        -- lower-cased
+            PRIMARY KEY (sequence_step, recipient)
+        )
+    """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS campaign_send_stats (
+            sequence_step TEXT PRIMARY KEY,
+            total_sent INTEGER DEFAULT 0,
+            unique_recipients INTEGER DEFAULT 0
+        )
+    """
+    )
+    if not existed:
+        rebuild_attribution_index(conn)
+    conn.commit()
+    _attribution_checked = True
+
+
+def rebuild_attribution_index(conn=None):
+    """Recompute the attribution tables from sent_messages, fb_leads and prospects."""
+    own_conn = conn is None
+    if own_conn:
+        conn = _get_db()
+    conn.execute("DELETE FROM email_attribution")
+    conn.execute("DELETE FROM campaign_recipients")
+    conn.execute("DELETE FROM campaign_send_stats")
+    # INSERT OR IGNORE keeps the first row per email, so order each source
+    # the way the old fallback queries picked their match.
+    conn.execute(
+        """INSERT OR IGNORE INTO email_attribution (email, campaign, channel, source_rank, updated_at)
+           SELECT LOWER(recipient), sequence_step, channel, ?, sent_at
+           FROM sent_messages ORDER BY sent_at DESC""",
+        (_ATTR_SENT,),
+    )
+    conn.execute(
+        """INSERT OR IGNORE INTO email_attribution (email, campaign, channel, source_rank, updated_at)
+           SELECT LOWER(email), campaign, 'fb_lead', ?, created_at
+           FROM fb_leads WHERE email IS NOT NULL AND email != '' ORDER BY id""",
+        (_ATTR_FB_LEAD,),
+    )
+    conn.execute(
+        """INSERT OR IGNORE INTO email_attribution (email, campaign, channel, source_rank, updated_at)
+           SELECT LOWER(email), 'signup', 'organic', ?, updated_at
+           FROM prospects WHERE email IS NOT NULL AND email != ''""",
+        (_ATTR_SIGNUP,),
+    )
+    conn.execute(
+        """INSERT OR IGNORE INTO campaign_recipients (sequence_step, recipient)
+           SELECT sequence_step, LOWER(recipient) FROM sent_messages"""
+    )
+    conn.execute(
+        """INSERT INTO campaign_send_stats (sequence_step, total_sent, unique_recipients)
+           SELECT sequence_step, COUNT(*), COUNT(DISTINCT LOWER(recipient))
+           FROM sent_messages GROUP BY sequence_step"""
+    )
+    if own_conn:
+        conn.commit()
+        conn.close()
+
+
+def _record_attribution(conn, email, campaign, channel, source_rank):
+    """Upsert an attribution row if it outranks (or refreshes) the current one."""
+    if not email:
+        return
+    conn.execute(
+        """INSERT INTO email_attribution (email, campaign, channel, source_rank, updated_at)
+           VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT(email) DO UPDATE SET
+               campaign = excluded.campaign,
+               channel = excluded.channel,
+               source_rank = excluded.source_rank,
+               updated_at = excluded.updated_at
+           WHERE excluded.source_rank < email_attribution.source_rank
+              OR excluded.source_rank = ?""",
+        (
+            email.lower(),
+            campaign,
+            channel,
+            source_rank,
+            datetime.utcnow().isoformat(),
+            _ATTR_SENT,
+        ),
+    )
+
+
+def _record_send(conn, sequence_step, channel, recipient):
+    """Update attribution and campaign counters for a newly inserted sent_messages row."""
+    _record_attribution(conn, recipient, sequence_step, channel, _ATTR_SENT)
+    new_recipient = conn.execute(
+        "INSERT OR IGNORE INTO campaign_recipients (sequence_step, recipient) VALUES (?, ?)",
+        (sequence_step, recipient.lower()),
+    ).rowcount
+    conn.execute(
+        """INSERT INTO campaign_send_stats (sequence_step, total_sent, unique_recipients)
+           VALUES (?, 1, ?)
+           ON CONFLICT(sequence_step) DO UPDATE SET
+               total_sent = campaign_send_stats.total_sent + 1,
+               unique_recipients = campaign_send_stats.unique_recipients + excluded.unique_recipients""",
+        (sequence_step, new_recipient),
+    )
+
+
+def lookup_attribution(email, conn=None):
+    """Return (campaign, channel) for an email, or (None, None) if unattributed."""
+    if not email:
+        return None, None
+    own_conn = conn is None
+    if own_conn:
+        conn = _get_db()
+    row = conn.execute(
+        "SELECT campaign, channel FROM email_attribution WHERE email = ?",
+        (email.lower(),),
+    ).fetchone()
+    if own_conn:
+        conn.close()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def get_campaign_send_stats(conn=None):
+    """
+    Return pre-aggregated send counters:
+    ({sequence_step: {"total_sent", "unique_recipients"}}, total_unique_recipients).
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = _get_db()
+    rows = conn.execute(
+        "SELECT sequence_step, total_sent, unique_recipients FROM campaign_send_stats"
+    ).fetchall()
+    total_unique = conn.execute(
+        "SELECT COUNT(*) FROM email_attribution WHERE source_rank = ?", (_ATTR_SENT,)
+    ).fetchone()[0]
+    if own_conn:
+        conn.close()
+    by_step = {
+        step: {"total_sent": total or 0, "unique_recipients": unique or 0}
+        for step, total, unique in rows
+    }
+    return by_step, total_unique
+
+
 def already_sent(application_id, sequence_step, channel):
     """Check if a message was already sent for this prospect + step + channel."""
     conn = _get_db()
@@ -102,7 +296,7 @@ def already_sent(application_id, sequence_step, channel):
 def record_sent(application_id, sequence_step, channel, recipient, message_id=None):
     """Record that a message was sent."""
     conn = _get_db()
-    conn.execute(
+    cur = conn.execute(
         """INSERT OR IGNORE INTO sent_messages
            (application_id, sequence_step, channel, recipient, sent_at, message_id)
            VALUES (?, ?, ?, ?, ?, ?)""",
@@ -115,6 +309,8 @@ def record_sent(application_id, sequence_step, channel, recipient, message_id=No
             message_id,
         ),
     )
+    if cur.rowcount == 1:
+        _record_send(conn, sequence_step, channel, recipient)
     conn.commit()
     conn.close()
 
@@ -155,6 +351,7 @@ def upsert_prospect(
             datetime.utcnow().isoformat(),
         ),
     )
+    _record_attribution(conn, email, "signup", "organic", _ATTR_SIGNUP)
     conn.commit()
     conn.close()
 
@@ -218,6 +415,78 @@ def upsert_fb_lead(
             datetime.utcnow().isoformat(),
         ),
     )
+    _record_attribution(conn, email, campaign, "fb_lead", _ATTR_FB_LEAD)
+    conn.commit()
+    conn.close()
+
+
+def bulk_upsert_fb_leads(leads, source="facebook"):
+    """
+    Upsert many FB leads in a single transaction.
+    Each lead is a dict with first_name, last_name, email, phone, campaign, lead_date.
+    Returns the list of leads that were not already stored for their campaign.
+    """
+    if not leads:
+        return []
+    conn = _get_db()
+    new_leads = []
+    now = datetime.utcnow().isoformat()
+    with conn:
+        for lead in leads:
+            email, campaign = lead["email"], lead["campaign"]
+            existed = conn.execute(
+                "SELECT 1 FROM fb_leads WHERE email = ? AND campaign = ?",
+                (email, campaign),
+            ).fetchone()
+            conn.execute(
+                """INSERT INTO fb_leads (first_name, last_name, email, phone, campaign, source, lead_date, status, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 'new', ?)
+                   ON CONFLICT(email, campaign) DO UPDATE SET
+                       first_name = COALESCE(excluded.first_name, fb_leads.first_name),
+                       last_name = COALESCE(excluded.last_name, fb_leads.last_name),
+                       phone = COALESCE(excluded.phone, fb_leads.phone),
+                       lead_date = COALESCE(excluded.lead_date, fb_leads.lead_date)""",
+                (
+                    lead.get("first_name"),
+                    lead.get("last_name"),
+                    email,
+                    lead.get("phone"),
+                    campaign,
+                    source,
+                    lead.get("lead_date"),
+                    now,
+                ),
+            )
+            if not existed:
+                _record_attribution(conn, email, campaign, "fb_lead", _ATTR_FB_LEAD)
+                new_leads.append(lead)
+    conn.close()
+    return new_leads
+
+
+def get_sheet_sync_state(sheet_key):
+    """Return (last_row, last_row_hash) for a synced sheet, or (None, None)."""
+    conn = _get_db()
+    row = conn.execute(
+        "SELECT last_row, last_row_hash FROM sheet_sync_state WHERE sheet_key = ?",
+        (sheet_key,),
+    ).fetchone()
+    conn.close()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def set_sheet_sync_state(sheet_key, last_row, last_row_hash):
+    """Record the last sheet row processed by a diff sync."""
+    conn = _get_db()
+    conn.execute(
+        """INSERT INTO sheet_sync_state (sheet_key, last_row, last_row_hash, updated_at)
+           VALUES (?, ?, ?, ?)
+           ON CONFLICT(sheet_key) DO UPDATE SET
+               last_row = excluded.last_row,
+               last_row_hash = excluded.last_row_hash,
+               updated_at = excluded.updated_at""",
+        (sheet_key, last_row, last_row_hash, datetime.utcnow().isoformat()),
+    )
     conn.commit()
     conn.close()
 
@@ -266,7 +535,7 @@ def record_fb_sent(email, campaign, channel, recipient, message_id=None):
     import hashlib
 
     pseudo_id = int(hashlib.md5(email.encode()).hexdigest()[:8], 16)
-    conn.execute(
+    cur = conn.execute(
         """INSERT OR IGNORE INTO sent_messages
            (application_id, sequence_step, channel, recipient, sent_at, message_id)
            VALUES (?, ?, ?, ?, ?, ?)""",
@@ -279,6 +548,8 @@ def record_fb_sent(email, campaign, channel, recipient, message_id=None):
             message_id,
         ),
     )
+    if cur.rowcount == 1:
+        _record_send(conn, campaign, channel, recipient)
     conn.commit()
     conn.close()
 
@@ -13,16 +13,41 @@ Requires:
 
 import os
 import io
+import sys
 import gzip
+import json
 import time
-from datetime import date, timedelta
+import hashlib
+import tempfile
+import threading
+import uuid
+import itertools
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlsplit
 import jwt
 import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from google.cloud import bigquery
+from google.api_core.exceptions import NotFound
 from google.oauth2 import service_account
 from googleapiclient.discovery import build as google_build
 
+# Request pacing is shared with the outreach tooling
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "prospect-outreach")
+)
+from rate_limit import RateLimiter
+
 # ── Configuration ──
 SERVICE_ACCOUNT_KEY = os.environ.get(
     "GCP_SERVICE_ACCOUNT_KEY", "rcwl-development-0c013e9b5c2b.json"
@@ -53,17 +78,43 @@ APPLE_ISSUER_ID = os.environ.get(
 APPLE_KEY_ID = os.environ.get("APPLE_KEY_ID", "A985D2XN2K")
 APPLE_KEY_FILE = os.environ.get("APPLE_KEY_FILE", "AuthKey_A985D2XN2K.p8")
 APPLE_VENDOR = os.environ.get("APPLE_VENDOR", "88386165")
+APPLE_REQUESTS_PER_MINUTE = int(os.environ.get("APPLE_REQUESTS_PER_MINUTE", "200"))
+APPLE_WORKERS = int(os.environ.get("APPLE_WORKERS", "8"))
+# Concurrent downloads of pre-signed report segment URLs (not rate limited)
+APPLE_SEGMENT_WORKERS = int(os.environ.get("APPLE_SEGMENT_WORKERS", "8"))
+# Analytics report instances (days) checked per report each run
+APPLE_INSTANCE_LOOKBACK = int(os.environ.get("APPLE_INSTANCE_LOOKBACK", "7"))
 
 # ── Google Play Console (GCS bucket for reports) ──
 PLAY_BUCKET_ID = os.environ.get("PLAY_BUCKET_ID", "pubsite_prod_6117430703357331981")
+GCS_DOWNLOAD_WORKERS = int(os.environ.get("GCS_DOWNLOAD_WORKERS", "16"))
+
+# ── Local cache for downloaded source files (manifests + parsed frames) ──
+REFRESH_CACHE_DIR = os.environ.get(
+    "REFRESH_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".refresh_cache"),
+)
 
 # ── Meta (Facebook) Ads ──
 META_AD_ACCOUNT_ID = os.environ.get("META_AD_ACCOUNT_ID", "act_472085159972709")
 META_ACCESS_TOKEN = os.environ.get("META_ACCESS_TOKEN", "")
+META_GRAPH_URL = "https://graph.facebook.com/v19.0"
+# Weeks re-pulled on each incremental run (covers Meta's attribution restatements)
+META_REFRESH_WEEKS = int(os.environ.get("META_REFRESH_WEEKS", "4"))
+# Date ranges longer than this are fetched through an async report job
+META_ASYNC_MIN_DAYS = int(os.environ.get("META_ASYNC_MIN_DAYS", "90"))
+META_ASYNC_TIMEOUT = int(os.environ.get("META_ASYNC_TIMEOUT", "600"))
+META_FULL_REFRESH = os.environ.get("META_FULL_REFRESH", "").lower() in ("1", "true")
 
 # ── TikTok Ads ──
 TIKTOK_ADVERTISER_ID = os.environ.get("TIKTOK_ADVERTISER_ID", "7223793908814233602")
 TIKTOK_ACCESS_TOKEN = os.environ.get("TIKTOK_ACCESS_TOKEN", "")
+TIKTOK_HISTORY_START = os.environ.get("TIKTOK_HISTORY_START", "2024-01-01")
+# Days before the high-water mark re-pulled each run (late conversions restate)
+TIKTOK_RESTATEMENT_DAYS = int(os.environ.get("TIKTOK_RESTATEMENT_DAYS", "14"))
+TIKTOK_QPS = float(os.environ.get("TIKTOK_QPS", "10"))
+TIKTOK_WORKERS = int(os.environ.get("TIKTOK_WORKERS", "4"))
+TIKTOK_FULL_REFRESH = os.environ.get("TIKTOK_FULL_REFRESH", "").lower() in ("1", "true")
 
 # ── Google Calendar ──
 CALENDAR_ID = os.environ.get("CALENDAR_ID", "ben@joinkliq.io")
@@ -84,12 +135,18 @@ ga4_client = bigquery.Client(
 
 def read_query(sql: str) -> pd.DataFrame:
     """Execute a read query against prod."""
-    return read_client.query(sql).to_dataframe()
+    job = read_client.query(sql)
+    df = job.to_dataframe()
+    _ledger_note_bytes(job.total_bytes_processed)
+    return df
 
 
 def read_ga4_query(sql: str) -> pd.DataFrame:
     """Execute a read query against GA4 (US region)."""
-    return ga4_client.query(sql).to_dataframe()
+    job = ga4_client.query(sql)
+    df = job.to_dataframe()
+    _ledger_note_bytes(job.total_bytes_processed)
+    return df
 
 
 def write_table(df: pd.DataFrame, table_name: str):
@@ -98,9 +155,342 @@ def write_table(df: pd.DataFrame, table_name: str):
     job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
     job = write_client.load_table_from_dataframe(df, table_id, job_config=job_config)
     job.result()
+    _ledger_note_write(table_name, len(df))
     print(f"  ✅ {table_name} — {len(df)} rows")
 
 
+def _delete_keys(table_id, key_column, keys):
+    """Delete rows whose key_column (compared as STRING) is in keys."""
+    keys = sorted({str(k) for k in keys})
+    if not keys:
+        return
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ArrayQueryParameter("keys", "STRING", keys)]
+    )
+    job = write_client.query(
+        f"DELETE FROM `{table_id}` WHERE CAST({key_column} AS STRING) IN UNNEST(@keys)",
+        job_config=job_config,
+    )
+    job.result()
+    _ledger_note_bytes(job.total_bytes_processed)
+
+
+def _merge_staged(table_name, load, key_column, keys):
+    """Replace the rows whose key_column is in keys with freshly loaded rows.
+
+    load(staging_id) loads the new rows into a staging table; they are then
+    swapped in with one DELETE + INSERT transaction, so a failed load or
+    insert leaves the target untouched. Columns new in the staged rows are
+    added to the target first. The staging table is always dropped.
+    """
+    table_id = f"{TARGET_PROJECT}.{TARGET_DATASET}.{table_name}"
+    staging_id = f"{TARGET_PROJECT}.{TARGET_DATASET}._staging_{table_name}_" + (
+        uuid.uuid4().hex[:8]
+    )
+    try:
+        load(staging_id)
+        staging = write_client.get_table(staging_id)
+        staging.expires = datetime.now(timezone.utc) + timedelta(days=1)
+        write_client.update_table(staging, ["expires"])
+        try:
+            target = write_client.get_table(table_id)
+        except NotFound:
+            job = write_client.query(
+                f"CREATE TABLE `{table_id}` AS SELECT * FROM `{staging_id}`"
+            )
+            job.result()
+            _ledger_note_bytes(job.total_bytes_processed)
+            return
+        known = {f.name for f in target.schema}
+        added = [
+            bigquery.SchemaField(
+                f.name,
+                f.field_type,
+                mode="REPEATED" if f.mode == "REPEATED" else "NULLABLE",
+                fields=f.fields,
+            )
+            for f in staging.schema
+            if f.name not in known
+        ]
+        if added:
+            target.schema = list(target.schema) + added
+            write_client.update_table(target, ["schema"])
+        cols = ", ".join(f"`{f.name}`" for f in staging.schema)
+        job = write_client.query(
+            f"""
+            BEGIN TRANSACTION;
+            DELETE FROM `{table_id}` WHERE CAST({key_column} AS STRING) IN UNNEST(@keys);
+            INSERT INTO `{table_id}` ({cols}) SELECT {cols} FROM `{staging_id}`;
+            COMMIT TRANSACTION;
+            """,
+            job_config=bigquery.QueryJobConfig(
+                query_parameters=[
+                    bigquery.ArrayQueryParameter(
+                        "keys", "STRING", sorted({str(k) for k in keys})
+                    )
+                ]
+            ),
+        )
+        job.result()
+        _ledger_note_bytes(job.total_bytes_processed)
+    finally:
+        write_client.delete_table(staging_id, not_found_ok=True)
+
+
+def merge_table(df: pd.DataFrame, table_name: str, key_column: str, keys):
+    """Replace the rows whose key_column is in keys with df.
+
+    Used by incremental refreshes. df is staged and swapped in atomically
+    (see _merge_staged). New columns in df are added to the table.
+    """
+    table_id = f"{TARGET_PROJECT}.{TARGET_DATASET}.{table_name}"
+    keys = sorted({str(k) for k in keys})
+    if len(df) == 0:
+        _delete_keys(table_id, key_column, keys)
+        _ledger_note_write(table_name, 0)
+        print(f"  ✅ {table_name} — {len(keys)} key(s) cleared, no new rows")
+        return
+
+    def load(staging_id):
+        write_client.load_table_from_dataframe(
+            df,
+            staging_id,
+            job_config=bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE"),
+        ).result()
+
+    _merge_staged(table_name, load, key_column, keys)
+    _ledger_note_write(table_name, len(df))
+    print(f"  ✅ {table_name} — {len(df)} rows merged ({len(keys)} key(s) replaced)")
+
+
+def _arrow_schema_of(data) -> pa.Schema:
+    """Arrow schema for a DataFrame/Table; all-null columns default to string."""
+    table = _to_arrow(data)
+    fields = [
+        pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+        for f in table.schema
+    ]
+    return pa.schema(fields)
+
+
+def _widen_type(a, b):
+    """Narrowest Arrow type that values of type a and of type b both cast to losslessly."""
+    if a.equals(b) or pa.types.is_null(b):
+        return a
+    if pa.types.is_null(a):
+        return b
+    if all(pa.types.is_string(t) or pa.types.is_large_string(t) for t in (a, b)):
+        return a
+    if pa.types.is_integer(a) and pa.types.is_integer(b):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (a, b)):
+        return pa.float64()
+    if pa.types.is_timestamp(a) and pa.types.is_timestamp(b):
+        return pa.timestamp("us", tz=a.tz if a.tz == b.tz else "UTC")
+    return pa.string()
+
+
+def _to_arrow(data) -> pa.Table:
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    return pa.Table.from_pandas(data, preserve_index=False).replace_schema_metadata()
+
+
+def _coerce_column(col, arrow_type):
+    """Fallback for text Arrow can't cast directly: unparseable values → null.
+
+    The final cast is still safe, so e.g. 1.5 never truncates into an int column.
+    """
+    series = col.to_pandas()
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+        series = pd.to_numeric(series, errors="coerce")
+    elif pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        series = pd.to_datetime(series, errors="coerce")
+    else:
+        series = series.astype("string")
+    return pc.cast(pa.array(series, from_pandas=True), arrow_type)
+
+
+def _arrow_conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Project/cast a table onto schema: missing columns become null, extras are dropped."""
+    columns = []
+    for field in schema:
+        if field.name not in table.column_names:
+            columns.append(pa.nulls(table.num_rows, type=field.type))
+            continue
+        col = table.column(field.name)
+        if not col.type.equals(field.type):
+            try:
+                col = pc.cast(col, field.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                col = _coerce_column(col, field.type)
+        columns.append(col)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class _aborting:
+    """Context manager that aborts (discards staging files of) writers on error."""
+
+    def __init__(self, writers):
+        self.writers = list(writers)
+
+    def __enter__(self):
+        return self.writers
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            for w in self.writers:
+                w.abort()
+        return False
+
+
+class StreamingTableWriter:
+    """Stream batches into a Parquet staging file, then load it in one BQ job.
+
+    Sources call write() with a DataFrame, RecordBatch or Arrow Table per
+    chunk (report segment, CSV file, API page) instead of accumulating rows,
+    so peak memory is one chunk. Casts are always safe (never truncating or
+    overflowing). An explicit schema is enforced as given; otherwise the
+    schema starts from the first chunk and is widened when a later chunk
+    conflicts (int → float64, mixed → string) or adds columns, re-staging
+    the rows written so far under the wider schema.
+
+    With merge_key set, rows whose merge_key value appears in the written
+    data are replaced by the staged rows in one transaction (see
+    _merge_staged); otherwise the table is replaced.
+    """
+
+    def __init__(self, table_name, schema=None, merge_key=None):
+        self.table_name = table_name
+        self.schema = schema
+        self.merge_key = merge_key
+        self.rows = 0
+        self._fixed = schema is not None
+        self._null_cols = set()  # inferred as string only because all-null so far
+        self._keys = set()
+        self._dropped = set()
+        self._writer = None
+        self._path = None
+
+    def write(self, data):
+        table = _to_arrow(data)
+        if table.num_rows == 0:
+            return
+        if self.schema is None:
+            self.schema = _arrow_schema_of(table)
+            self._null_cols = {
+                f.name for f in table.schema if pa.types.is_null(f.type)
+            }
+        elif not self._fixed:
+            self._widen(table.schema)
+        extra = set(table.column_names) - set(self.schema.names) - self._dropped
+        if extra:
+            print(f"    ⚠️  {self.table_name}: dropping unexpected columns {sorted(extra)}")
+            self._dropped |= extra
+        table = _arrow_conform(table, self.schema)
+        if self.merge_key:
+            self._keys.update(
+                str(k) for k in pc.unique(table.column(self.merge_key)).to_pylist()
+            )
+        if self._writer is None:
+            self._open()
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def _open(self):
+        fd, self._path = tempfile.mkstemp(prefix=f"{self.table_name}_", suffix=".parquet")
+        os.close(fd)
+        self._writer = pq.ParquetWriter(self._path, self.schema)
+
+    def _widen(self, incoming):
+        """Widen self.schema to also hold incoming's columns and types."""
+        fields = []
+        changed = []
+        for field in self.schema:
+            if field.name not in incoming.names:
+                fields.append(field)
+                continue
+            new = incoming.field(field.name).type
+            if pa.types.is_null(new):
+                wide = field.type
+            elif field.name in self._null_cols:
+                self._null_cols.discard(field.name)
+                wide = new
+            else:
+                wide = _widen_type(field.type, new)
+            if not wide.equals(field.type):
+                changed.append(f"{field.name} {field.type}→{wide}")
+            fields.append(pa.field(field.name, wide))
+        for field in incoming:
+            if field.name not in self.schema.names:
+                if pa.types.is_null(field.type):
+                    self._null_cols.add(field.name)
+                    field = pa.field(field.name, pa.string())
+                changed.append(f"+{field.name}")
+                fields.append(field)
+        if not changed:
+            return
+        print(f"    ℹ️  {self.table_name}: widening schema ({', '.join(changed)})")
+        self.schema = pa.schema(fields)
+        if self._writer is None:
+            return
+        # Re-stage what was written so far under the wider schema
+        self._writer.close()
+        old_path = self._path
+        self._open()
+        try:
+            staged = pq.ParquetFile(old_path)
+            for i in range(staged.num_row_groups):
+                self._writer.write_table(
+                    _arrow_conform(staged.read_row_group(i), self.schema)
+                )
+        finally:
+            os.remove(old_path)
+
+    def commit(self):
+        """Load the staged file into BigQuery. Returns the number of rows loaded."""
+        try:
+            if self._writer is None:
+                return 0
+            self._writer.close()
+            table_id = f"{TARGET_PROJECT}.{TARGET_DATASET}.{self.table_name}"
+            if self.merge_key:
+                _merge_staged(self.table_name, self._load, self.merge_key, self._keys)
+            else:
+                self._load(table_id)
+            _ledger_note_write(self.table_name, self.rows)
+            suffix = f" ({len(self._keys)} key(s) replaced)" if self.merge_key else ""
+            print(f"  ✅ {self.table_name} — {self.rows} rows{suffix}")
+            return self.rows
+        finally:
+            self._cleanup()
+
+    def _load(self, table_id):
+        """Load the staged Parquet file into table_id, replacing its contents."""
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_TRUNCATE",
+        )
+        with open(self._path, "rb") as f:
+            write_client.load_table_from_file(f, table_id, job_config=job_config).result()
+
+    def abort(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+            self._writer = None
+        if self._path and os.path.exists(self._path):
+            os.remove(self._path)
+        self._path = None
+
+
 def ensure_dataset():
     """Create the target dataset if it doesn't exist."""
     dataset_ref = bigquery.Dataset(f"{TARGET_PROJECT}.{TARGET_DATASET}")
@@ -113,11 +503,98 @@ def ensure_dataset():
         print(f"   Attempting to write tables anyway...\n")
 
 
+# ═══════════════════════════════════════════════════════════════
+# SMART REFRESH — make-style source/target checks
+# ═══════════════════════════════════════════════════════════════
+
+# Set REFRESH_FORCE=1 to rebuild every node regardless of source changes
+REFRESH_FORCE = os.environ.get("REFRESH_FORCE", "").lower() in ("1", "true")
+# Nodes whose SQL is relative to CURRENT_DATE() are rebuilt at least this often
+DATE_RELATIVE_MAX_AGE_H = 24
+_MTIME_TTL = 300  # seconds
+
+_mtime_cache = {}  # dataset → (fetched_at, {table_id: last_modified})
+_built_this_run = {}  # "dataset.table" → when this process last wrote it
+
+
+def refresh_node(sources=(), targets=(), max_age_hours=None):
+    """Declare a refresh function's BigQuery inputs and outputs.
+
+    sources are "dataset.table" names in SOURCE_PROJECT (a bare name means
+    SOURCE_DATASET); targets are tables in TARGET_DATASET. run_step skips the
+    node when every target is newer than every source (and, with
+    max_age_hours, was built recently enough). Undecorated functions
+    (external APIs) always run.
+    """
+
+    def wrap(fn):
+        fn.sources = tuple(s if "." in s else f"{SOURCE_DATASET}.{s}" for s in sources)
+        fn.targets = tuple(targets)
+        fn.max_age_hours = max_age_hours
+        return fn
+
+    return wrap
+
+
+def _dataset_mtimes(dataset):
+    """{table_id: last_modified (UTC)} for a dataset, from one __TABLES__ query."""
+    now = time.monotonic()
+    cached = _mtime_cache.get(dataset)
+    if cached and now - cached[0] < _MTIME_TTL:
+        return cached[1]
+    rows = read_client.query(
+        f"""
+        SELECT table_id, TIMESTAMP_MILLIS(last_modified_time) AS last_modified
+        FROM `{SOURCE_PROJECT}.{dataset}.__TABLES__`
+        """
+    ).result()
+    mtimes = {row.table_id: row.last_modified for row in rows}
+    _mtime_cache[dataset] = (now, mtimes)
+    return mtimes
+
+
+def _last_modified(qualified):
+    """Last modification of "dataset.table" (None if unknown), counting this run's writes."""
+    dataset, table = qualified.split(".", 1)
+    known = _dataset_mtimes(dataset).get(table)
+    built = _built_this_run.get(qualified)
+    if known is None or built is None:
+        return known or built
+    return max(known, built)
+
+
+def stale_reason(fn):
+    """Why fn must run, or None when all of its targets are up to date."""
+    sources = getattr(fn, "sources", ())
+    targets = getattr(fn, "targets", ())
+    if REFRESH_FORCE or not sources or not targets:
+        return "always"
+    try:
+        built = [_last_modified(f"{TARGET_DATASET}.{t}") for t in targets]
+        if any(b is None for b in built):
+            return "target missing"
+        build_time = min(built)
+        if fn.max_age_hours is not None and datetime.now(
+            timezone.utc
+        ) - build_time > timedelta(hours=fn.max_age_hours):
+            return f"older than {fn.max_age_hours}h"
+        for source in fn.sources:
+            modified = _last_modified(source)
+            if modified is None:
+                return f"{source} metadata unavailable"
+            if modified > build_time:
+                return f"{source} changed"
+    except Exception as e:
+        return f"metadata check failed ({e})"
+    return None
+
+
 # ═══════════════════════════════════════════════════════════════
 # DASHBOARD 1 — Main Growth
 # ═══════════════════════════════════════════════════════════════
 
 
+@refresh_node(sources=["events"], targets=["d1_growth_metrics"])
 def refresh_d1_growth_metrics():
     """Sign-ups, card details, upgrades, subscriptions, cancellations by date."""
     df = read_query(
@@ -156,6 +633,7 @@ def refresh_d1_growth_metrics():
     write_table(df, "d1_growth_metrics")
 
 
+@refresh_node(sources=["events"], targets=["d1_onboarding_funnel"])
 def refresh_d1_onboarding_funnel():
     """Onboarding funnel steps by date with clean names and sort order."""
     df = read_query(
@@ -191,6 +669,7 @@ def refresh_d1_onboarding_funnel():
     write_table(df, "d1_onboarding_funnel")
 
 
+@refresh_node(sources=["events"], targets=["d1_engagement_funnel"])
 def refresh_d1_engagement_funnel():
     """Coach engagement funnel: profile uploaded, first livestream created, previewed app, copied URL."""
     df = read_query(
@@ -240,6 +719,16 @@ def refresh_d1_engagement_funnel():
     write_table(df, "d1_engagement_funnel")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "events",
+        "user_subscription_invoices",
+        "users",
+    ],
+    targets=["d1_activation_score"],
+    max_age_hours=DATE_RELATIVE_MAX_AGE_H,
+)
 def refresh_d1_activation_score():
     """Per-app activation score based on coach setup actions in first 30 days.
 
@@ -373,6 +862,16 @@ def refresh_d1_activation_score():
     write_table(df, "d1_activation_score")
 
 
+@refresh_node(
+    sources=[
+        "KLIQ_Hosting_Revenue_paid_details",
+        "applications",
+        "events",
+        "user_subscription_invoices",
+        "users",
+    ],
+    targets=["d1_leads_sales"],
+)
 def refresh_d1_leads_sales():
     """Weekly leads & sales metrics matching the manual tracking spreadsheet.
 
@@ -667,199 +1166,338 @@ def refresh_d1_demo_calls():
     write_table(weekly, "d1_demo_calls")
 
 
+_meta_session_instance = None
+
+
+def _meta_session():
+    """Shared requests.Session for the Graph API (keeps connections alive)."""
+    global _meta_session_instance
+    if _meta_session_instance is None:
+        _meta_session_instance = requests.Session()
+    return _meta_session_instance
+
+
+def _meta_get(url, params=None, timeout=60):
+    """GET a Graph API URL; raises RuntimeError with Meta's message on API errors."""
+    resp = _meta_session().get(url, params=params, timeout=timeout)
+    data = resp.json()
+    if "error" in data:
+        raise RuntimeError(data["error"].get("message", data["error"]))
+    return data
+
+
+def _meta_paginate(url, params):
+    """Yield insight rows across all pages (next URLs already carry params)."""
+    while url:
+        data = _meta_get(url, params)
+        yield from data.get("data", [])
+        url = data.get("paging", {}).get("next")
+        params = None
+
+
+def _meta_async_insights(params):
+    """Run an async insights report job and yield its rows once it completes."""
+    resp = _meta_session().post(
+        f"{META_GRAPH_URL}/{META_AD_ACCOUNT_ID}/insights", data=params, timeout=60
+    )
+    data = resp.json()
+    if "error" in data:
+        raise RuntimeError(data["error"].get("message", data["error"]))
+    run_id = data["report_run_id"]
+
+    deadline = time.monotonic() + META_ASYNC_TIMEOUT
+    delay = 2
+    while True:
+        status = _meta_get(
+            f"{META_GRAPH_URL}/{run_id}", {"access_token": META_ACCESS_TOKEN}
+        )
+        state = status.get("async_status")
+        if state == "Job Completed":
+            break
+        if state in ("Job Failed", "Job Skipped"):
+            raise RuntimeError(f"async report {run_id} {state.lower()}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"async report {run_id} timed out ({state})")
+        time.sleep(delay)
+        delay = min(delay * 2, 30)
+
+    yield from _meta_paginate(
+        f"{META_GRAPH_URL}/{run_id}/insights",
+        {"access_token": META_ACCESS_TOKEN, "limit": 500},
+    )
+
+
+def _meta_insight_row(row):
+    actions_map = {}
+    for action in row.get("actions", []):
+        actions_map[action.get("action_type")] = int(action.get("value", 0))
+    return {
+        "date_start": row["date_start"],
+        "meta_spend": float(row.get("spend", 0)),
+        "meta_impressions": int(row.get("impressions", 0)),
+        "meta_clicks": int(row.get("clicks", 0)),
+        "meta_link_clicks": actions_map.get("link_click", 0),
+        "meta_landing_page_views": actions_map.get("landing_page_view", 0),
+        "meta_leads": actions_map.get("lead", 0)
+        + actions_map.get("onsite_conversion.lead_grouped", 0),
+        "meta_video_views": actions_map.get("video_view", 0),
+        "meta_post_reactions": actions_map.get("post_reaction", 0),
+    }
+
+
 def refresh_d1_meta_ads():
     """Pull weekly ad spend, impressions, clicks, and leads from Meta Marketing API.
 
+    The first run (or META_FULL_REFRESH=1) pulls the full account history via
+    an async report job and replaces the table. Later runs re-pull only the
+    last META_REFRESH_WEEKS weeks and merge them into d1_meta_ads by week.
+    Daily rows are bucketed into Monday-based weeks so windowed and full pulls
+    produce the same week_start values.
+
     Requires META_ACCESS_TOKEN to be set.
     """
     if not META_ACCESS_TOKEN:
         print("  ⏭️  Meta Ads skipped — no access token configured")
         return
 
-    base_url = f"https://graph.facebook.com/v19.0/{META_AD_ACCOUNT_ID}/insights"
-    all_rows = []
+    state = _load_manifest("meta_ads_state")
+    full = META_FULL_REFRESH or not state.get("last_full_refresh")
 
-    # Paginate through weekly data (campaign level to capture lead form actions)
+    # Campaign level to capture lead form actions
     params = {
         "access_token": META_ACCESS_TOKEN,
-        "time_increment": 7,  # weekly
-        "date_preset": "maximum",
+        "time_increment": 1,
         "fields": "spend,impressions,clicks,actions",
         "level": "campaign",
         "limit": 500,
     }
+    today = date.today()
+    since = None
+    if full:
+        params["date_preset"] = "maximum"
+    else:
+        since = today - timedelta(days=today.weekday(), weeks=META_REFRESH_WEEKS - 1)
+        params["time_range"] = json.dumps(
+            {"since": since.isoformat(), "until": today.isoformat()}
+        )
 
-    url = base_url
-    while url:
-        resp = requests.get(url, params=params if url == base_url else None)
-        data = resp.json()
-
-        if "error" in data:
-            print(
-                f"  ❌ Meta Ads API error: {data['error'].get('message', data['error'])}"
-            )
-            return
-
-        for row in data.get("data", []):
-            actions_map = {}
-            for action in row.get("actions", []):
-                actions_map[action.get("action_type")] = int(action.get("value", 0))
-            all_rows.append(
-                {
-                    "date_start": row["date_start"],
-                    "date_stop": row["date_stop"],
-                    "meta_spend": float(row.get("spend", 0)),
-                    "meta_impressions": int(row.get("impressions", 0)),
-                    "meta_clicks": int(row.get("clicks", 0)),
-                    "meta_link_clicks": actions_map.get("link_click", 0),
-                    "meta_landing_page_views": actions_map.get("landing_page_view", 0),
-                    "meta_leads": actions_map.get("lead", 0)
-                    + actions_map.get("onsite_conversion.lead_grouped", 0),
-                    "meta_video_views": actions_map.get("video_view", 0),
-                    "meta_post_reactions": actions_map.get("post_reaction", 0),
-                }
+    metric_cols = [
+        "meta_spend",
+        "meta_impressions",
+        "meta_clicks",
+        "meta_link_clicks",
+        "meta_landing_page_views",
+        "meta_leads",
+        "meta_video_views",
+        "meta_post_reactions",
+    ]
+    # Fold campaign/day rows into Monday-based weeks as pages arrive
+    week_sums = {}
+    try:
+        if full or (today - since).days >= META_ASYNC_MIN_DAYS:
+            rows = _meta_async_insights(params)
+        else:
+            rows = _meta_paginate(f"{META_GRAPH_URL}/{META_AD_ACCOUNT_ID}/insights", params)
+        for row in rows:
+            values = _meta_insight_row(row)
+            day = date.fromisoformat(values["date_start"])
+            sums = week_sums.setdefault(
+                day - timedelta(days=day.weekday()), dict.fromkeys(metric_cols, 0)
             )
+            for col in metric_cols:
+                sums[col] += values[col]
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"  ❌ Meta Ads API error: {e}")
+        return
 
-        # Handle pagination
-        paging = data.get("paging", {})
-        url = paging.get("next")
-        params = None  # next URL includes params
-
-    if not all_rows:
+    if not week_sums and full:
         print("  ⚠️  No Meta Ads data returned")
         write_table(pd.DataFrame(), "d1_meta_ads")
         return
 
-    df = pd.DataFrame(all_rows)
-    df["week_start"] = pd.to_datetime(df["date_start"])
-    df = df.drop(columns=["date_start", "date_stop"])
-
-    # Aggregate by week (in case of overlapping windows)
-    weekly = (
-        df.groupby("week_start")
-        .agg(
-            {
-                "meta_spend": "sum",
-                "meta_impressions": "sum",
-                "meta_clicks": "sum",
-                "meta_link_clicks": "sum",
-                "meta_landing_page_views": "sum",
-                "meta_leads": "sum",
-                "meta_video_views": "sum",
-                "meta_post_reactions": "sum",
-            }
-        )
-        .reset_index()
+    weekly = pd.DataFrame(
+        [{"week_start": pd.Timestamp(week), **week_sums[week]} for week in sorted(week_sums)],
+        columns=["week_start"] + metric_cols,
     )
 
-    weekly = weekly.sort_values("week_start").reset_index(drop=True)
-    write_table(weekly, "d1_meta_ads")
-
-
-def refresh_d1_tiktok_ads():
-    """Pull weekly ad spend, impressions, clicks, and conversions from TikTok Ads API.
-
-    Uses the TikTok Reporting API v1.3 integrated report endpoint.
-    Requires TIKTOK_ACCESS_TOKEN to be set.
-    """
-    if not TIKTOK_ACCESS_TOKEN:
-        print("  ⏭️  TikTok Ads skipped — no access token configured")
-        return
-
-    base_url = "https://business-api.tiktok.com/open_api/v1.3/report/integrated/get/"
-    headers = {"Access-Token": TIKTOK_ACCESS_TOKEN}
-
-    # Pull data from 2024-01-01 to today
-    from datetime import datetime, timedelta
-
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = "2024-01-01"
+    if full:
+        write_table(weekly, "d1_meta_ads")
+        state["last_full_refresh"] = today.isoformat()
+    else:
+        # Every week in the window is replaced, including weeks now without rows
+        weeks = [
+            (since + timedelta(weeks=i)).isoformat() for i in range(META_REFRESH_WEEKS)
+        ]
+        merge_table(weekly, "d1_meta_ads", "DATE(week_start)", weeks)
+    state["last_refresh"] = today.isoformat()
+    _save_manifest("meta_ads_state", state)
+
+
+TIKTOK_REPORT_URL = "https://business-api.tiktok.com/open_api/v1.3/report/integrated/get/"
+TIKTOK_PAGE_SIZE = 1000
+# Daily reports are requested in ranges of at most this many days
+TIKTOK_CHUNK_DAYS = 30
+TIKTOK_METRICS = [
+    "spend",
+    "impressions",
+    "clicks",
+    "conversion",
+    "cpc",
+    "cpm",
+    "ctr",
+    "cost_per_conversion",
+    "reach",
+    "video_views_p25",
+    "video_views_p50",
+    "video_views_p75",
+    "video_views_p100",
+]
+# Summed into weeks; the tt_cpc/cpm/ctr/cost_per_conversion rates are derived from the sums
+_TIKTOK_SUM_COLUMNS = [
+    "tt_spend",
+    "tt_impressions",
+    "tt_clicks",
+    "tt_conversions",
+    "tt_reach",
+    "tt_video_views_25",
+    "tt_video_views_50",
+    "tt_video_views_75",
+    "tt_video_views_100",
+]
 
-    all_rows = []
-    page = 1
-    page_size = 1000
 
-    while True:
-        params = {
+def _tiktok_fetch_page(session, limiter, start_date, end_date, page):
+    """Fetch one report page → (rows, total_page)."""
+    limiter.wait()
+    resp = session.get(
+        TIKTOK_REPORT_URL,
+        headers={"Access-Token": TIKTOK_ACCESS_TOKEN},
+        params={
             "advertiser_id": TIKTOK_ADVERTISER_ID,
             "report_type": "BASIC",
             "dimensions": '["stat_time_day"]',
-            "metrics": '["spend", "impressions", "clicks", "conversion", "cpc", "cpm", "ctr", "cost_per_conversion", "reach", "video_views_p25", "video_views_p50", "video_views_p75", "video_views_p100"]',
+            "metrics": json.dumps(TIKTOK_METRICS),
             "data_level": "AUCTION_ADVERTISER",
             "start_date": start_date,
             "end_date": end_date,
             "page": page,
-            "page_size": page_size,
-        }
+            "page_size": TIKTOK_PAGE_SIZE,
+        },
+        timeout=60,
+    )
+    data = resp.json()
+    if data.get("code") != 0:
+        raise RuntimeError(data.get("message", data))
+    payload = data.get("data", {})
+    return payload.get("list", []), payload.get("page_info", {}).get("total_page", 1)
 
-        resp = requests.get(base_url, headers=headers, params=params)
-        data = resp.json()
 
-        if data.get("code") != 0:
-            print(f"  ❌ TikTok Ads API error: {data.get('message', data)}")
-            return
+def fetch_tiktok_report(start_date: date, end_date: date, session=None):
+    """Yield daily report rows between start_date and end_date (inclusive).
 
-        rows = data.get("data", {}).get("list", [])
-        if not rows:
-            break
+    The range is split into TIKTOK_CHUNK_DAYS chunks; first pages of every
+    chunk are fetched concurrently, then any remaining pages, all paced by
+    one limiter at TIKTOK_QPS requests/second. Rows are yielded page by
+    page as soon as each page is consumed in order, never collected.
+    Pass a session to reuse (or substitute) the HTTP session.
+    """
+    chunks = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=TIKTOK_CHUNK_DAYS - 1), end_date)
+        chunks.append((chunk_start.isoformat(), chunk_end.isoformat()))
+        chunk_start = chunk_end + timedelta(days=1)
+
+    session = session or requests.Session()
+    limiter = RateLimiter(TIKTOK_QPS)
+    with ThreadPoolExecutor(max_workers=TIKTOK_WORKERS) as pool:
+        first_pages = deque(
+            (chunk, pool.submit(_tiktok_fetch_page, session, limiter, *chunk, 1))
+            for chunk in chunks
+        )
+        rest = deque()
+        while first_pages:
+            chunk, fut = first_pages.popleft()
+            page_rows, total_page = fut.result()
+            rest += [
+                pool.submit(_tiktok_fetch_page, session, limiter, *chunk, page)
+                for page in range(2, total_page + 1)
+            ]
+            yield from page_rows
+        while rest:
+            yield from rest.popleft().result()[0]
+
+
+def _tiktok_row(row):
+    """Report row → (day, {tt_* metric: value})."""
+    dims = row.get("dimensions", {})
+    metrics = row.get("metrics", {})
+    return date.fromisoformat(dims.get("stat_time_day")[:10]), {
+        "tt_spend": float(metrics.get("spend", 0)),
+        "tt_impressions": int(float(metrics.get("impressions", 0))),
+        "tt_clicks": int(float(metrics.get("clicks", 0))),
+        "tt_conversions": int(float(metrics.get("conversion", 0))),
+        "tt_reach": int(float(metrics.get("reach", 0))),
+        "tt_video_views_25": int(float(metrics.get("video_views_p25", 0))),
+        "tt_video_views_50": int(float(metrics.get("video_views_p50", 0))),
+        "tt_video_views_75": int(float(metrics.get("video_views_p75", 0))),
+        "tt_video_views_100": int(float(metrics.get("video_views_p100", 0))),
+    }
 
-        for row in rows:
-            dims = row.get("dimensions", {})
-            metrics = row.get("metrics", {})
-            all_rows.append(
-                {
-                    "date": dims.get("stat_time_day"),
-                    "tt_spend": float(metrics.get("spend", 0)),
-                    "tt_impressions": int(float(metrics.get("impressions", 0))),
-                    "tt_clicks": int(float(metrics.get("clicks", 0))),
-                    "tt_conversions": int(float(metrics.get("conversion", 0))),
-                    "tt_cpc": float(metrics.get("cpc", 0)),
-                    "tt_cpm": float(metrics.get("cpm", 0)),
-                    "tt_ctr": float(metrics.get("ctr", 0)),
-                    "tt_cost_per_conversion": float(
-                        metrics.get("cost_per_conversion", 0)
-                    ),
-                    "tt_reach": int(float(metrics.get("reach", 0))),
-                    "tt_video_views_25": int(float(metrics.get("video_views_p25", 0))),
-                    "tt_video_views_50": int(float(metrics.get("video_views_p50", 0))),
-                    "tt_video_views_75": int(float(metrics.get("video_views_p75", 0))),
-                    "tt_video_views_100": int(
-                        float(metrics.get("video_views_p100", 0))
-                    ),
-                }
-            )
 
-        total_page = data.get("data", {}).get("page_info", {}).get("total_page", 1)
-        if page >= total_page:
-            break
-        page += 1
+def refresh_d1_tiktok_ads():
+    """Pull weekly ad spend, impressions, clicks, and conversions from TikTok Ads API.
+
+    Uses the TikTok Reporting API v1.3 integrated report endpoint.
+    The first run (or TIKTOK_FULL_REFRESH=1) pulls everything since
+    TIKTOK_HISTORY_START and replaces d1_tiktok_ads. Later runs start
+    TIKTOK_RESTATEMENT_DAYS before the stored high-water mark (the last day
+    with delivery), widened to whole weeks, and merge those weeks back in.
+    Requires TIKTOK_ACCESS_TOKEN to be set.
+    """
+    if not TIKTOK_ACCESS_TOKEN:
+        print("  ⏭️  TikTok Ads skipped — no access token configured")
+        return
+
+    state = _load_manifest("tiktok_ads_state")
+    full = TIKTOK_FULL_REFRESH or not state.get("high_water")
+    end_date = date.today()
+    if full:
+        start_date = date.fromisoformat(TIKTOK_HISTORY_START)
+    else:
+        since = date.fromisoformat(state["high_water"]) - timedelta(
+            days=TIKTOK_RESTATEMENT_DAYS
+        )
+        start_date = pd.Timestamp(since).to_period("W-MON").start_time.date()
+    weeks = [
+        (start_date + timedelta(weeks=i)).isoformat()
+        for i in range((end_date - start_date).days // 7 + 1)
+    ]
+
+    # Fold daily rows into weeks as pages arrive
+    week_sums = {}
+    high_water = None
+    try:
+        for row in fetch_tiktok_report(start_date, end_date):
+            day, values = _tiktok_row(row)
+            week = pd.Timestamp(day).to_period("W-MON").start_time
+            sums = week_sums.setdefault(week, dict.fromkeys(_TIKTOK_SUM_COLUMNS, 0))
+            for col in _TIKTOK_SUM_COLUMNS:
+                sums[col] += values[col]
+            if values["tt_impressions"] > 0 and (high_water is None or day > high_water):
+                high_water = day
+    except (RuntimeError, OSError, requests.RequestException) as e:
+        print(f"  ❌ TikTok Ads API error: {e}")
+        return
 
-    if not all_rows:
+    if not week_sums and full:
         print("  ⚠️  No TikTok Ads data returned")
         write_table(pd.DataFrame(), "d1_tiktok_ads")
         return
 
-    df = pd.DataFrame(all_rows)
-    df["date"] = pd.to_datetime(df["date"])
-    df["week_start"] = df["date"].dt.to_period("W-MON").apply(lambda p: p.start_time)
-
-    # Aggregate daily data into weekly
-    weekly = (
-        df.groupby("week_start")
-        .agg(
-            {
-                "tt_spend": "sum",
-                "tt_impressions": "sum",
-                "tt_clicks": "sum",
-                "tt_conversions": "sum",
-                "tt_reach": "sum",
-                "tt_video_views_25": "sum",
-                "tt_video_views_50": "sum",
-                "tt_video_views_75": "sum",
-                "tt_video_views_100": "sum",
-            }
-        )
-        .reset_index()
+    weekly = pd.DataFrame(
+        [{"week_start": week, **week_sums[week]} for week in sorted(week_sums)],
+        columns=["week_start"] + _TIKTOK_SUM_COLUMNS,
     )
 
     # Compute weekly averages
@@ -885,9 +1523,17 @@ def refresh_d1_tiktok_ads():
     )
 
     weekly = weekly.sort_values("week_start").reset_index(drop=True)
-    write_table(weekly, "d1_tiktok_ads")
+
+    if full:
+        write_table(weekly, "d1_tiktok_ads")
+    else:
+        merge_table(weekly, "d1_tiktok_ads", "DATE(week_start)", weeks)
+    if high_water is not None:
+        state["high_water"] = max(high_water.isoformat(), state.get("high_water", ""))
+    _save_manifest("tiktok_ads_state", state)
 
 
+@refresh_node(sources=["events"], targets=["d1_device_type"])
 def refresh_d1_device_type():
     """Sign-ups by device type."""
     df = read_query(
@@ -904,6 +1550,7 @@ def refresh_d1_device_type():
     write_table(df, "d1_device_type")
 
 
+@refresh_node(sources=["KLIQ_Customer_Revenue"], targets=["d1_invoice_revenue"])
 def refresh_d1_invoice_revenue():
     """Invoice revenue deduplicated by invoice_id."""
     df = read_query(
@@ -931,6 +1578,7 @@ def refresh_d1_invoice_revenue():
     write_table(df, "d1_invoice_revenue")
 
 
+@refresh_node(sources=["KLIQ_Customer_Revenue"], targets=["d1_appfee_revenue"])
 def refresh_d1_appfee_revenue():
     """KLIQ's cut (application fees) deduplicated by application_fee_id."""
     df = read_query(
@@ -956,6 +1604,7 @@ def refresh_d1_appfee_revenue():
     write_table(df, "d1_appfee_revenue")
 
 
+@refresh_node(sources=["KLIQ_Customer_Revenue"], targets=["d1_revenue_summary"])
 def refresh_d1_revenue_summary():
     """Revenue summary: new revenue (first sale per app) vs total revenue, by date."""
     df = read_query(
@@ -987,6 +1636,16 @@ def refresh_d1_revenue_summary():
     write_table(df, "d1_revenue_summary")
 
 
+@refresh_node(
+    sources=[
+        "KLIQ_Hosting_Revenue_paid_details",
+        "applications",
+        "user_subscription_invoices",
+        f"{TARGET_DATASET}.d2_mau",
+    ],
+    targets=["d1_coach_summary"],
+    max_age_hours=DATE_RELATIVE_MAX_AGE_H,
+)
 def refresh_d1_coach_summary():
     """Coach summary: all apps with revenue OR active users. Includes hosting, GMV, app fees, MAU."""
     df = read_query(
@@ -1082,6 +1741,7 @@ def refresh_d1_coach_summary():
     write_table(df, "d1_coach_summary")
 
 
+@refresh_node(sources=["events"], targets=["d1_coach_engagement"])
 def refresh_d1_coach_engagement():
     """Monthly community engagement per app: posts, likes, replies, visits."""
     df = read_query(
@@ -1120,6 +1780,20 @@ def refresh_d1_coach_engagement():
     write_table(df, "d1_coach_engagement")
 
 
+@refresh_node(
+    sources=[
+        "ecourses",
+        "events",
+        "nutritions",
+        "posts",
+        "subscription_details",
+        "wellness",
+        f"{TARGET_DATASET}.d1_coach_engagement",
+        f"{TARGET_DATASET}.d1_coach_summary",
+        f"{TARGET_DATASET}.d2_subscriptions_revenue",
+    ],
+    targets=["d1_churn_analysis"],
+)
 def refresh_d1_churn_analysis():
     """Per-app churn analysis: churn rate, content, posts, engagement for correlation visuals."""
     df = read_query(
@@ -1258,6 +1932,14 @@ def refresh_d1_churn_analysis():
     write_table(df, "d1_churn_analysis")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "events",
+    ],
+    targets=["d1_retention_analysis"],
+    max_age_hours=DATE_RELATIVE_MAX_AGE_H,
+)
 def refresh_d1_retention_analysis():
     """Per-app user retention: D1/D7/D14/D30 retention rates + early engagement breakdown."""
     df = read_query(
@@ -1343,6 +2025,13 @@ def refresh_d1_retention_analysis():
     write_table(df, "d1_retention_analysis")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "user_subscription_invoices",
+    ],
+    targets=["d1_coach_gmv_timeline"],
+)
 def refresh_d1_coach_gmv_timeline():
     """Monthly GMV by coach for line graph over time. GMV = end-user payments to coaches."""
     df = read_query(
@@ -1460,6 +2149,15 @@ def refresh_d1_ga4_funnel():
     write_table(df, "d1_ga4_funnel")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "events",
+        "subscription_details",
+    ],
+    targets=["d1_app_status"],
+    max_age_hours=DATE_RELATIVE_MAX_AGE_H,
+)
 def refresh_d1_app_status():
     """App status: engagement + subscription status per app."""
     df = read_query(
@@ -1502,6 +2200,7 @@ def refresh_d1_app_status():
 # ═══════════════════════════════════════════════════════════════
 
 
+@refresh_node(sources=["applications"], targets=["d2_app_lookup"])
 def refresh_d2_app_lookup():
     """Application lookup table."""
     df = read_query(
@@ -1516,6 +2215,7 @@ def refresh_d2_app_lookup():
     write_table(df, "d2_app_lookup")
 
 
+@refresh_node(sources=["events"], targets=["d2_engagement"])
 def refresh_d2_engagement():
     """Engagement events by app and date."""
     df = read_query(
@@ -1539,6 +2239,7 @@ def refresh_d2_engagement():
     write_table(df, "d2_engagement")
 
 
+@refresh_node(sources=["events"], targets=["d2_subscriptions_revenue"])
 def refresh_d2_subscriptions_revenue():
     """Subscription and revenue events by app and date."""
     df = read_query(
@@ -1561,6 +2262,7 @@ def refresh_d2_subscriptions_revenue():
     write_table(df, "d2_subscriptions_revenue")
 
 
+@refresh_node(sources=["applications", "events", "users"], targets=["d2_user_overview"])
 def refresh_d2_user_overview():
     """User overview by app (user counts + platform breakdown)."""
     df = read_query(
@@ -1600,6 +2302,7 @@ def refresh_d2_user_overview():
     write_table(df, "d2_user_overview")
 
 
+@refresh_node(sources=["events"], targets=["d2_dau"])
 def refresh_d2_dau():
     """Daily Active Users by app."""
     df = read_query(
@@ -1616,6 +2319,7 @@ def refresh_d2_dau():
     write_table(df, "d2_dau")
 
 
+@refresh_node(sources=["events"], targets=["d2_mau"])
 def refresh_d2_mau():
     """Monthly Active Users by app."""
     df = read_query(
@@ -1632,28 +2336,110 @@ def refresh_d2_mau():
     write_table(df, "d2_mau")
 
 
+# ═══════════════════════════════════════════════════════════════
+# APP STORE CONNECT — shared client (sales + analytics)
+# ═══════════════════════════════════════════════════════════════
+
+
+class AppStoreConnectClient:
+    """App Store Connect API client shared by all Apple refreshes.
+
+    Mints one ES256 JWT and reuses it until shortly before expiry, keeps a
+    pooled HTTP session, and paces every request through one rate limiter
+    so concurrent callers stay within Apple's per-key limit.
+    """
+
+    BASE_URL = "https://api.appstoreconnect.apple.com/v1"
+    TOKEN_TTL = 1200  # Apple's maximum is 20 minutes
+    TOKEN_REFRESH_MARGIN = 120
+
+    def __init__(self, per_minute=APPLE_REQUESTS_PER_MINUTE):
+        with open(APPLE_KEY_FILE, "r") as f:
+            self._key = f.read()
+        self._token = None
+        self._token_exp = 0
+        self._token_lock = threading.Lock()
+        self._limiter = RateLimiter.per_minute(per_minute)
+        self.session = requests.Session()
+
+    def token(self):
+        with self._token_lock:
+            now = int(time.time())
+            if not self._token or now >= self._token_exp - self.TOKEN_REFRESH_MARGIN:
+                self._token_exp = now + self.TOKEN_TTL
+                self._token = jwt.encode(
+                    {
+                        "iss": APPLE_ISSUER_ID,
+                        "iat": now,
+                        "exp": self._token_exp,
+                        "aud": "appstoreconnect-v1",
+                    },
+                    self._key,
+                    algorithm="ES256",
+                    headers={"kid": APPLE_KEY_ID},
+                )
+            return self._token
+
+    def request(self, method, url, auth=True, **kwargs):
+        if not url.startswith("http"):
+            url = f"{self.BASE_URL}/{url.lstrip('/')}"
+        headers = kwargs.pop("headers", {})
+        if auth:
+            self._limiter.wait()
+            headers["Authorization"] = f"Bearer {self.token()}"
+        kwargs.setdefault("timeout", 60)
+        return self.session.request(method, url, headers=headers, **kwargs)
+
+    def get_json(self, url, params=None):
+        resp = self.request("GET", url, params=params or {})
+        resp.raise_for_status()
+        return resp.json()
+
+    def post_json(self, url, body):
+        resp = self.request("POST", url, json=body)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_tsv(self, url, params=None, auth=True):
+        """GET a (usually gzipped) TSV and parse it, decompressing as it streams.
+
+        Returns a DataFrame, or None on a non-200 response or empty body.
+        """
+        resp = self.request("GET", url, auth=auth, params=params, stream=True)
+        with resp:
+            if resp.status_code != 200:
+                return None
+            resp.raw.decode_content = True  # undo transport-level encoding only
+            resp.raw.auto_close = False  # let GzipFile read the trailer at EOF
+            raw = io.BufferedReader(resp.raw)
+            is_gzip = raw.peek(2)[:2] == b"\x1f\x8b"
+            stream = gzip.GzipFile(fileobj=raw) if is_gzip else raw
+            try:
+                return pd.read_csv(stream, sep="\t")
+            except pd.errors.EmptyDataError:
+                return None
+
+
+_apple_client_instance = None
+_apple_client_lock = threading.Lock()
+
+
+def _apple_client():
+    """Process-wide AppStoreConnectClient (created on first use)."""
+    global _apple_client_instance
+    with _apple_client_lock:
+        if _apple_client_instance is None:
+            _apple_client_instance = AppStoreConnectClient()
+        return _apple_client_instance
+
+
 def refresh_d1_appstore_sales():
     """Pull latest Apple App Store sales data and append to BigQuery."""
-    with open(APPLE_KEY_FILE, "r") as f:
-        apple_key = f.read()
-
-    def apple_token():
-        now = int(time.time())
-        payload = {
-            "iss": APPLE_ISSUER_ID,
-            "iat": now,
-            "exp": now + 1200,
-            "aud": "appstoreconnect-v1",
-        }
-        return jwt.encode(
-            payload, apple_key, algorithm="ES256", headers={"kid": APPLE_KEY_ID}
-        )
+    client = _apple_client()
 
     def get_sales_report(date_str):
-        headers = {"Authorization": f"Bearer {apple_token()}"}
-        resp = requests.get(
-            "https://api.appstoreconnect.apple.com/v1/salesReports",
-            headers=headers,
+        return client.get_tsv(
+            "salesReports",
             params={
                 "filter[reportType]": "SALES",
                 "filter[reportSubType]": "SUMMARY",
@@ -1662,19 +2448,12 @@ def refresh_d1_appstore_sales():
                 "filter[vendorNumber]": APPLE_VENDOR,
             },
         )
-        if resp.status_code == 200:
-            content = gzip.decompress(resp.content).decode("utf-8")
-            return pd.read_csv(io.StringIO(content), sep="\t")
-        return None
 
-    # Pull last 7 days to catch any gaps
-    all_dfs = []
-    for i in range(1, 8):
-        d = date.today() - timedelta(days=i)
-        df = get_sales_report(d.strftime("%Y-%m-%d"))
-        if df is not None and len(df) > 0:
-            all_dfs.append(df)
-        time.sleep(0.3)
+    # Pull last 7 days to catch any gaps (fetched concurrently, rate-limited)
+    days = [(date.today() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(1, 8)]
+    with ThreadPoolExecutor(max_workers=len(days)) as pool:
+        reports = list(pool.map(get_sales_report, days))
+    all_dfs = [df for df in reports if df is not None and len(df) > 0]
 
     if not all_dfs:
         print("  ⚠️  No Apple sales data available")
@@ -1702,9 +2481,19 @@ def refresh_d1_appstore_sales():
         combined, table_id, job_config=job_config
     )
     job.result()
+    _ledger_note_write("d1_appstore_sales", len(combined))
     print(f"  ✅ d1_appstore_sales — {len(combined)} rows ({min_date} to {max_date})")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "events",
+        "user_subscription_invoices",
+        f"{TARGET_DATASET}.d1_appstore_sales",
+    ],
+    targets=["d1_unified_revenue"],
+)
 def refresh_d1_unified_revenue():
     """Combine Stripe GMV + iOS App Store + Google Play Store revenue per app per month.
 
@@ -1833,6 +2622,12 @@ def refresh_d1_unified_revenue():
     write_table(df, "d1_unified_revenue")
 
 
+@refresh_node(
+    sources=[
+        f"{TARGET_DATASET}.d1_appstore_sales",
+    ],
+    targets=["d1_ios_downloads"],
+)
 def refresh_d1_ios_downloads():
     """iOS App Store downloads per app per month (first downloads + redownloads)."""
     df = read_query(
@@ -1854,6 +2649,14 @@ def refresh_d1_ios_downloads():
     write_table(df, "d1_ios_downloads")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "events",
+    ],
+    targets=["d1_app_engagement"],
+    max_age_hours=DATE_RELATIVE_MAX_AGE_H,
+)
 def refresh_d1_app_engagement():
     """Avg user engagement per app per feature across D1/D7/D14/D30/D60/D90 windows."""
     df = read_query(
@@ -1925,6 +2728,7 @@ def refresh_d1_app_engagement():
     write_table(df, "d1_app_engagement")
 
 
+@refresh_node(sources=["applications", "events"], targets=["d1_app_device_breakdown"])
 def refresh_d1_app_device_breakdown():
     """Device breakdown (app vs web) per application."""
     df = read_query(
@@ -1945,6 +2749,14 @@ def refresh_d1_app_device_breakdown():
     write_table(df, "d1_app_device_breakdown")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "users",
+        f"{TARGET_DATASET}.d1_appstore_sales",
+    ],
+    targets=["d1_app_downloads"],
+)
 def refresh_d1_app_downloads():
     """Downloads per app: iOS App Store + KLIQ registered users."""
     df = read_query(
@@ -1981,6 +2793,15 @@ def refresh_d1_app_downloads():
     write_table(df, "d1_app_downloads")
 
 
+@refresh_node(
+    sources=[
+        "applications",
+        "events",
+        "users",
+    ],
+    targets=["d1_app_top_users"],
+    max_age_hours=DATE_RELATIVE_MAX_AGE_H,
+)
 def refresh_d1_app_top_users():
     """Top 5 most active users per app in last 90 days with email."""
     df = read_query(
@@ -2021,43 +2842,321 @@ def refresh_d1_app_top_users():
 
 
 # ═══════════════════════════════════════════════════════════════
-# APPLE ANALYTICS REPORTS API — Impressions, Sessions, Page Views
+# FEATURE ADOPTION — daily event rollup
 # ═══════════════════════════════════════════════════════════════
 
+EVENT_ROLLUP_TABLE = "d1_event_daily_rollup"
+PURCHASE_ROLLUP_TABLE = "d1_purchase_sku_daily"
+# Days before the newest rolled-up day that are recomputed (late-arriving events)
+EVENT_ROLLUP_LOOKBACK_DAYS = int(os.environ.get("EVENT_ROLLUP_LOOKBACK_DAYS", "3"))
 
-def _apple_analytics_token():
-    """Generate a JWT for the App Store Connect API."""
-    with open(APPLE_KEY_FILE, "r") as f:
-        apple_key = f.read()
-    now = int(time.time())
-    payload = {
-        "iss": APPLE_ISSUER_ID,
-        "iat": now,
-        "exp": now + 1200,
-        "aud": "appstoreconnect-v1",
-    }
-    return jwt.encode(
-        payload, apple_key, algorithm="ES256", headers={"kid": APPLE_KEY_ID}
+
+def _refresh_daily_rollup(table_name, select_sql, cluster_by):
+    """Create or incrementally extend a day-partitioned rollup of events.
+
+    select_sql must produce a `day` column and filter on
+    `event_date >= TIMESTAMP(@since)`. The first run builds the table from
+    all events; later runs replace the days from EVENT_ROLLUP_LOOKBACK_DAYS
+    before the newest rolled-up day onwards.
+    """
+    table_id = f"{TARGET_PROJECT}.{TARGET_DATASET}.{table_name}"
+    try:
+        columns = [f.name for f in write_client.get_table(table_id).schema]
+    except Exception:
+        columns = None
+
+    if columns is None:
+        job = write_client.query(
+            f"""
+            CREATE TABLE `{table_id}`
+            PARTITION BY day
+            CLUSTER BY {", ".join(cluster_by)}
+            AS {select_sql}
+            """,
+            job_config=bigquery.QueryJobConfig(
+                query_parameters=[
+                    bigquery.ScalarQueryParameter("since", "DATE", "1970-01-01")
+                ]
+            ),
+        )
+        job.result()
+        _ledger_note_bytes(job.total_bytes_processed)
+        rows = write_client.get_table(table_id).num_rows
+        _ledger_note_write(table_name, rows)
+        print(f"  ✅ {table_name} — {rows} rows (full build)")
+        return
+
+    latest = list(
+        write_client.query(f"SELECT MAX(day) AS latest FROM `{table_id}`").result()
+    )[0].latest
+    since = (latest or date(1970, 1, 1)) - timedelta(days=EVENT_ROLLUP_LOOKBACK_DAYS)
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter("since", "DATE", since)]
+    )
+    job = write_client.query(
+        f"DELETE FROM `{table_id}` WHERE day >= @since", job_config=job_config
+    )
+    job.result()
+    _ledger_note_bytes(job.total_bytes_processed)
+    job = write_client.query(
+        f"INSERT INTO `{table_id}` ({', '.join(columns)}) {select_sql}",
+        job_config=job_config,
     )
+    job.result()
+    _ledger_note_bytes(job.total_bytes_processed)
+    rows = job.num_dml_affected_rows or 0
+    _ledger_note_write(table_name, rows)
+    print(f"  ✅ {table_name} — {rows} rows replaced since {since}")
+
+
+@refresh_node(sources=["events"], targets=[EVENT_ROLLUP_TABLE])
+def refresh_d1_event_daily_rollup():
+    """(application_id, event_name, entity_name, day) → event_count, built incrementally.
+
+    Feeds the Feature Adoption loaders in dash_app/data.py and the growth
+    strategy tables, which join applications at read time.
+    """
+    _refresh_daily_rollup(
+        EVENT_ROLLUP_TABLE,
+        f"""
+        SELECT
+            application_id,
+            event_name,
+            entity_name,
+            DATE(event_date) AS day,
+            COUNT(*) AS event_count
+        FROM `{SOURCE_PROJECT}.{SOURCE_DATASET}.events`
+        WHERE application_id IS NOT NULL
+          AND event_date >= TIMESTAMP(@since)
+        GROUP BY application_id, event_name, entity_name, day
+        """,
+        cluster_by=["event_name", "application_id"],
+    )
+
+
+@refresh_node(sources=["events"], targets=[PURCHASE_ROLLUP_TABLE])
+def refresh_d1_purchase_sku_daily():
+    """purchase_success events per (application_id, sku, day), built incrementally.
+
+    Google Play revenue is estimated per SKU from Apple prices, so the
+    growth strategy tables need purchase counts by in-app product id.
+    """
+    _refresh_daily_rollup(
+        PURCHASE_ROLLUP_TABLE,
+        f"""
+        SELECT
+            application_id,
+            JSON_VALUE(data, '$.in_app_product_id') AS sku,
+            DATE(event_date) AS day,
+            COUNT(*) AS purchases
+        FROM `{SOURCE_PROJECT}.{SOURCE_DATASET}.events`
+        WHERE event_name = 'purchase_success'
+          AND application_id IS NOT NULL
+          AND event_date >= TIMESTAMP(@since)
+        GROUP BY application_id, sku, day
+        """,
+        cluster_by=["application_id"],
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+# GROWTH STRATEGY — per-app stats and monthly series
+# ═══════════════════════════════════════════════════════════════
+
+
+def _growth_strategy_ctes():
+    """Shared CTEs: FX rates, Apple revenue inputs, apps, and Google revenue prices.
+
+    Built from the daily rollups and d1_appstore_sales rather than raw events.
+    """
+    t = f"{TARGET_PROJECT}.{TARGET_DATASET}"
+    return f"""
+    fx_rates AS (
+        SELECT currency, rate FROM UNNEST([
+            STRUCT("USD" AS currency, 1.0 AS rate),
+            STRUCT("GBP", 1.27), STRUCT("EUR", 1.08), STRUCT("AUD", 0.64),
+            STRUCT("CAD", 0.72), STRUCT("CHF", 1.13), STRUCT("DKK", 0.145),
+            STRUCT("NOK", 0.093), STRUCT("SEK", 0.095), STRUCT("NZD", 0.60),
+            STRUCT("SGD", 0.75), STRUCT("HUF", 0.0027), STRUCT("CLP", 0.00105),
+            STRUCT("COP", 0.00024), STRUCT("CZK", 0.042), STRUCT("PLN", 0.25),
+            STRUCT("BRL", 0.19), STRUCT("MXN", 0.055), STRUCT("TRY", 0.031),
+            STRUCT("RUB", 0.011), STRUCT("ILS", 0.28), STRUCT("SAR", 0.267),
+            STRUCT("AED", 0.272), STRUCT("INR", 0.012), STRUCT("ZAR", 0.054),
+            STRUCT("RON", 0.22)
+        ])
+    ),
+    sku_map AS (SELECT DISTINCT product_id, application_name FROM `{t}.d1_inapp_products`),
+    apple_priced AS (
+        SELECT s.sku, s.units, s.report_date,
+               SAFE_CAST(s.customer_price AS FLOAT64) * COALESCE(fx.rate, 1.0) AS price_usd
+        FROM `{t}.d1_appstore_sales` s
+        LEFT JOIN fx_rates fx ON s.customer_currency = fx.currency
+        WHERE s.product_type_identifier IN ('IA1', 'IAY') AND SAFE_CAST(s.customer_price AS FLOAT64) > 0
+    ),
+    apple_sales AS (
+        SELECT p.*, COALESCE(m.application_name, 'Unknown') AS app
+        FROM apple_priced p LEFT JOIN sku_map m ON p.sku = m.product_id
+    ),
+    apple_sku_prices AS (
+        SELECT sku, ROUND(AVG(price_usd), 2) AS avg_price_usd FROM apple_priced GROUP BY sku
+    ),
+    ios_avg AS (
+        SELECT ROUND(AVG(price_usd), 2) AS fallback_price FROM apple_priced
+    ),
+    apps AS (
+        SELECT id, application_name AS app
+        FROM `{SOURCE_PROJECT}.{SOURCE_DATASET}.applications`
+        WHERE application_name IS NOT NULL
+    ),
+    google_purchases AS (
+        SELECT a.app, FORMAT_DATE('%Y-%m', p.day) AS month,
+               p.purchases * COALESCE(ap.avg_price_usd, iavg.fallback_price) AS sales
+        FROM `{t}.{PURCHASE_ROLLUP_TABLE}` p
+        JOIN apps a ON p.application_id = a.id
+        LEFT JOIN apple_sku_prices ap ON p.sku = ap.sku
+        CROSS JOIN ios_avg iavg
+    ),
+    app_events AS (
+        SELECT a.app, FORMAT_DATE('%Y-%m', r.day) AS month, r.event_name, r.event_count
+        FROM `{t}.{EVENT_ROLLUP_TABLE}` r
+        JOIN apps a ON r.application_id = a.id
+    )"""
+
+
+_GROWTH_STRATEGY_SOURCES = [
+    "applications",
+    f"{TARGET_DATASET}.{EVENT_ROLLUP_TABLE}",
+    f"{TARGET_DATASET}.{PURCHASE_ROLLUP_TABLE}",
+    f"{TARGET_DATASET}.d1_appstore_sales",
+    f"{TARGET_DATASET}.d1_inapp_products",
+]
+
+
+@refresh_node(
+    sources=_GROWTH_STRATEGY_SOURCES + [f"{TARGET_DATASET}.d1_app_fee_lookup"],
+    targets=["d1_growth_strategy_app_stats"],
+)
+def refresh_d1_growth_strategy_app_stats():
+    """Per-app IAP revenue (Apple + estimated Google), engagement counts and KLIQ fee."""
+    df = read_query(
+        f"""
+        WITH {_growth_strategy_ctes()},
+        apple_rev AS (
+            SELECT app,
+                   ROUND(SUM(price_usd * SAFE_CAST(units AS INT64)), 2) AS apple_sales,
+                   COUNT(DISTINCT FORMAT_DATE('%Y-%m', report_date)) AS apple_months
+            FROM apple_sales GROUP BY app
+        ),
+        google_rev AS (
+            SELECT app, ROUND(SUM(sales), 2) AS google_sales,
+                   COUNT(DISTINCT month) AS google_months
+            FROM google_purchases GROUP BY app
+        ),
+        event_totals AS (
+            SELECT app,
+                SUM(IF(event_name = 'purchase_success', event_count, 0)) AS purchases,
+                SUM(IF(event_name = 'recurring_payment', event_count, 0)) AS recurring_payments,
+                SUM(IF(event_name = 'user_subscribed', event_count, 0)) AS new_subscribers,
+                SUM(IF(event_name = 'cancels_subscription', event_count, 0)) AS cancellations,
+                SUM(IF(event_name = 'live_session_created', event_count, 0)) AS livestreams,
+                SUM(IF(event_name = 'live_session_joined', event_count, 0)) AS live_joins,
+                SUM(IF(event_name = 'completes_program_workout', event_count, 0)) AS workouts,
+                SUM(IF(event_name IN ('post_on_community','post_on_community_feed_with_photo','post_on_community_feed_with_voice_notes'), event_count, 0)) AS community_posts,
+                SUM(IF(event_name = 'app_opened', event_count, 0)) AS app_opens,
+                SUM(IF(event_name = 'publish_module', event_count, 0)) AS modules_published,
+                SUM(IF(event_name = 'publishes_program', event_count, 0)) AS programs_published,
+                COUNT(DISTINCT month) AS event_months
+            FROM app_events GROUP BY app
+        ),
+        apps_meta AS (
+            SELECT application_name AS app, DATE(created_at) AS created_date
+            FROM `{SOURCE_PROJECT}.{SOURCE_DATASET}.applications` WHERE application_name IS NOT NULL
+        ),
+        fees AS (
+            SELECT application_name AS app, kliq_fee_pct
+            FROM `{TARGET_PROJECT}.{TARGET_DATASET}.d1_app_fee_lookup`
+            WHERE kliq_fee_pct IS NOT NULL
+        )
+        SELECT COALESCE(ae.app, ar.app, gr.app) AS app, am.created_date,
+            COALESCE(ar.apple_sales, 0) + COALESCE(gr.google_sales, 0) AS iap_revenue,
+            COALESCE(ar.apple_sales, 0) AS apple_sales, COALESCE(gr.google_sales, 0) AS google_sales,
+            GREATEST(COALESCE(ar.apple_months, 0), COALESCE(gr.google_months, 0)) AS active_rev_months,
+            COALESCE(ae.purchases, 0) AS purchases, COALESCE(ae.recurring_payments, 0) AS recurring_payments,
+            COALESCE(ae.new_subscribers, 0) AS new_subscribers, COALESCE(ae.cancellations, 0) AS cancellations,
+            COALESCE(ae.livestreams, 0) AS livestreams, COALESCE(ae.live_joins, 0) AS live_joins,
+            COALESCE(ae.workouts, 0) AS workouts, COALESCE(ae.community_posts, 0) AS community_posts,
+            COALESCE(ae.app_opens, 0) AS app_opens, COALESCE(ae.modules_published, 0) AS modules_published,
+            COALESCE(ae.programs_published, 0) AS programs_published,
+            COALESCE(ae.event_months, 0) AS event_months, COALESCE(f.kliq_fee_pct, 0) AS kliq_fee_pct
+        FROM event_totals ae
+        FULL OUTER JOIN apple_rev ar ON ae.app = ar.app
+        FULL OUTER JOIN google_rev gr ON COALESCE(ae.app, ar.app) = gr.app
+        LEFT JOIN apps_meta am ON COALESCE(ae.app, ar.app, gr.app) = am.app
+        LEFT JOIN fees f ON COALESCE(ae.app, ar.app, gr.app) = f.app
+        WHERE COALESCE(ae.app_opens, 0) > 0 ORDER BY iap_revenue DESC
+    """
+    )
+    write_table(df, "d1_growth_strategy_app_stats")
+
+
+@refresh_node(
+    sources=_GROWTH_STRATEGY_SOURCES, targets=["d1_growth_strategy_monthly"]
+)
+def refresh_d1_growth_strategy_monthly():
+    """Per-app monthly IAP revenue (Apple + estimated Google) and key event counts."""
+    df = read_query(
+        f"""
+        WITH {_growth_strategy_ctes()},
+        apple_monthly AS (
+            SELECT app, FORMAT_DATE('%Y-%m', report_date) AS month,
+                   ROUND(SUM(price_usd * SAFE_CAST(units AS INT64)), 2) AS sales
+            FROM apple_sales GROUP BY app, month
+        ),
+        google_monthly AS (
+            SELECT app, month, ROUND(SUM(sales), 2) AS sales
+            FROM google_purchases GROUP BY app, month
+        ),
+        combined_rev AS (
+            SELECT app, month, SUM(sales) AS total_sales FROM (
+                SELECT * FROM apple_monthly UNION ALL SELECT * FROM google_monthly
+            ) GROUP BY app, month
+        ),
+        monthly_events AS (
+            SELECT app, month,
+                SUM(IF(event_name = 'user_subscribed', event_count, 0)) AS new_subs,
+                SUM(IF(event_name = 'cancels_subscription', event_count, 0)) AS cancels,
+                SUM(IF(event_name = 'purchase_success', event_count, 0)) AS purchases,
+                SUM(IF(event_name = 'recurring_payment', event_count, 0)) AS recurring,
+                SUM(IF(event_name = 'live_session_created', event_count, 0)) AS livestreams,
+                SUM(IF(event_name = 'app_opened', event_count, 0)) AS app_opens
+            FROM app_events GROUP BY app, month
+        )
+        SELECT COALESCE(r.app, e.app) AS app, COALESCE(r.month, e.month) AS month,
+            COALESCE(r.total_sales, 0) AS total_sales, COALESCE(e.new_subs, 0) AS new_subs,
+            COALESCE(e.cancels, 0) AS cancels, COALESCE(e.purchases, 0) AS purchases,
+            COALESCE(e.recurring, 0) AS recurring, COALESCE(e.livestreams, 0) AS livestreams,
+            COALESCE(e.app_opens, 0) AS app_opens
+        FROM combined_rev r FULL OUTER JOIN monthly_events e ON r.app = e.app AND r.month = e.month
+        WHERE COALESCE(r.total_sales, 0) > 0 OR COALESCE(e.app_opens, 0) > 0
+        ORDER BY app, month
+    """
+    )
+    write_table(df, "d1_growth_strategy_monthly")
+
+
+# ═══════════════════════════════════════════════════════════════
+# APPLE ANALYTICS REPORTS API — Impressions, Sessions, Page Views
+# ═══════════════════════════════════════════════════════════════
 
 
 def _apple_api_get(url, params=None):
     """Make an authenticated GET request to App Store Connect API."""
-    headers = {"Authorization": f"Bearer {_apple_analytics_token()}"}
-    resp = requests.get(url, headers=headers, params=params or {})
-    resp.raise_for_status()
-    return resp.json()
+    return _apple_client().get_json(url, params)
 
 
 def _apple_api_post(url, body):
     """Make an authenticated POST request to App Store Connect API."""
-    headers = {
-        "Authorization": f"Bearer {_apple_analytics_token()}",
-        "Content-Type": "application/json",
-    }
-    resp = requests.post(url, headers=headers, json=body)
-    resp.raise_for_status()
-    return resp.json()
+    return _apple_client().post_json(url, body)
 
 
 def _apple_get_all_apps():
@@ -2106,46 +3205,71 @@ def _apple_ensure_report_request(app_id, access_type="ONGOING"):
     return result["data"]["id"]
 
 
-def _apple_download_report_data(report_id):
-    """Download all segment data for a report. Returns list of dicts (rows)."""
-    # Get instances (daily granularity preferred)
+def _apple_download_report_data(
+    report_id, known_checksums=frozenset(), segment_pool=None
+):
+    """Download segment data for a report's recent instances.
+
+    Segments whose checksum is in known_checksums were ingested on an earlier
+    run and are skipped. The remaining segments are downloaded concurrently
+    on segment_pool (serially without one). Returns (frames, {checksum:
+    segment info}) with one DataFrame per segment, tagged with _instance_id /
+    _processing_date / _segment_checksum. Only segments that downloaded
+    with rows are returned in the segment info.
+    """
     data = _apple_api_get(
         f"https://api.appstoreconnect.apple.com/v1/analyticsReports/{report_id}/instances",
-        {"limit": 1, "sort": "-processingDate"},
+        {"limit": APPLE_INSTANCE_LOOKBACK, "sort": "-processingDate"},
     )
     instances = data.get("data", [])
-    if not instances:
-        return []
 
-    inst = instances[0]
-    inst_id = inst["id"]
-    processing_date = inst["attributes"].get("processingDate", "")
+    segments = []  # (instance_id, processing_date, segment attributes)
+    for inst in instances:
+        inst_id = inst["id"]
+        processing_date = inst["attributes"].get("processingDate", "")
 
-    # Get segments
-    seg_data = _apple_api_get(
-        f"https://api.appstoreconnect.apple.com/v1/analyticsReportInstances/{inst_id}/segments",
-        {"fields[analyticsReportSegments]": "url,checksum,sizeInBytes"},
-    )
-    segments = seg_data.get("data", [])
-
-    all_rows = []
-    for seg in segments:
-        url = seg["attributes"].get("url", "")
-        if not url:
-            continue
-        resp = requests.get(url)
-        if resp.status_code != 200:
-            continue
-        # Data is gzipped TSV
-        try:
-            content = gzip.decompress(resp.content).decode("utf-8")
-        except Exception:
-            content = resp.text
-        if content.strip():
-            df = pd.read_csv(io.StringIO(content), sep="\t")
-            all_rows.extend(df.to_dict("records"))
+        seg_data = _apple_api_get(
+            f"https://api.appstoreconnect.apple.com/v1/analyticsReportInstances/{inst_id}/segments",
+            {"fields[analyticsReportSegments]": "url,checksum,sizeInBytes"},
+        )
+        for seg in seg_data.get("data", []):
+            attrs = seg["attributes"]
+            checksum = attrs.get("checksum") or ""
+            if not attrs.get("url") or (checksum and checksum in known_checksums):
+                continue
+            segments.append((inst_id, processing_date, attrs))
+
+    # Segment URLs are pre-signed — no auth header, no API rate limit
+    client = _apple_client()
+
+    def download(attrs):
+        return client.get_tsv(attrs["url"], auth=False)
+
+    urls = [attrs for _, _, attrs in segments]
+    results = segment_pool.map(download, urls) if segment_pool else map(download, urls)
+
+    frames = []
+    new_segments = {}
+    for (inst_id, processing_date, attrs), df in zip(segments, results):
+        if df is None or len(df) == 0:
+            continue  # failed or empty download: not recorded, retried next run
+        checksum = attrs.get("checksum") or ""
+        if checksum:
+            new_segments[checksum] = {
+                "report_id": report_id,
+                "instance_id": inst_id,
+                "processing_date": processing_date,
+                "size": attrs.get("sizeInBytes"),
+            }
+        df["_instance_id"] = inst_id
+        df["_processing_date"] = processing_date
+        # Merge key: re-ingesting a segment replaces only that segment's rows
+        df["_segment_checksum"] = checksum or (
+            f"{inst_id}/{urlsplit(attrs['url']).path}"
+        )
+        frames.append(df)
 
-    return all_rows
+    return frames, new_segments
 
 
 # Reports we want to pull per app
@@ -2181,62 +3305,99 @@ def refresh_d1_apple_analytics():
     1. An ONGOING report request per app (created automatically)
     2. Reports take 24-48h to generate after first request
     3. Data is returned as gzipped TSV segments
+
+    Segment checksums are kept in a local manifest: segments seen before are
+    not downloaded again, and rows from new segments are merged in keyed by
+    _segment_checksum (replacing any earlier copy of the same segment, but
+    never rows of other segments of the same instance). The first run
+    without a manifest rebuilds each table.
     """
+    segment_manifest = _load_manifest("apple_analytics_segments")
+    known_checksums = frozenset(segment_manifest)
+    first_run = not segment_manifest
     print("  Fetching all apps from App Store Connect...")
     apps = _apple_get_all_apps()
     print(f"  Found {len(apps)} apps")
 
-    # Collect data per report type
-    report_data = {key: [] for key in APPLE_ANALYTICS_REPORTS}
-    apps_with_data = 0
-    apps_pending = 0
-
-    for i, app in enumerate(apps):
-        app_id = app["id"]
-        app_name = app["name"]
-
-        try:
-            req_id = _apple_ensure_report_request(app_id, "ONGOING")
-        except Exception as e:
-            print(f"    ⚠️  {app_name}: failed to create report request: {e}")
-            continue
-
-        has_data = False
-        for key, cfg in APPLE_ANALYTICS_REPORTS.items():
-            report_id = f"{cfg['report_prefix']}-{req_id}"
+    # Stream each report type into its own Parquet staging file
+    writers = {
+        key: StreamingTableWriter(
+            cfg["table"], merge_key=None if first_run else "_segment_checksum"
+        )
+        for key, cfg in APPLE_ANALYTICS_REPORTS.items()
+    }
+    new_segments = {key: {} for key in APPLE_ANALYTICS_REPORTS}
+    apps_with_data = set()
+    apps_requested = 0
+
+    # Requests are paced by the shared client's limiter (Apple allows ~200/minute)
+    with ThreadPoolExecutor(max_workers=APPLE_WORKERS) as pool, ThreadPoolExecutor(
+        max_workers=APPLE_SEGMENT_WORKERS, thread_name_prefix="apple-segment"
+    ) as segment_pool, _aborting(writers.values()):
+        req_futures = {
+            pool.submit(_apple_ensure_report_request, app["id"], "ONGOING"): app
+            for app in apps
+        }
+        report_futures = {}
+        for fut in as_completed(req_futures):
+            app = req_futures[fut]
             try:
-                rows = _apple_download_report_data(report_id)
-                if rows:
-                    # Add app metadata to each row
-                    for row in rows:
-                        row["_app_name"] = app_name
-                        row["_app_id"] = app_id
-                        row["_bundle_id"] = app["bundleId"]
-                    report_data[key].extend(rows)
-                    has_data = True
+                req_id = fut.result()
+            except Exception as e:
+                print(f"    ⚠️  {app['name']}: failed to create report request: {e}")
+                continue
+            apps_requested += 1
+            for key, cfg in APPLE_ANALYTICS_REPORTS.items():
+                report_id = f"{cfg['report_prefix']}-{req_id}"
+                f = pool.submit(
+                    _apple_download_report_data,
+                    report_id,
+                    known_checksums,
+                    segment_pool,
+                )
+                report_futures[f] = (app, key)
+
+        for i, fut in enumerate(as_completed(report_futures)):
+            app, key = report_futures[fut]
+            try:
+                frames, segments = fut.result()
             except Exception:
-                pass  # Report not ready yet
-
-        if has_data:
-            apps_with_data += 1
-        else:
-            apps_pending += 1
-
-        # Rate limiting — Apple allows ~200 requests/minute
-        if (i + 1) % 10 == 0:
-            time.sleep(1)
-            print(f"    Processed {i + 1}/{len(apps)} apps...")
-
-    # Write each report type to BigQuery
+                frames, segments = [], {}  # Report not ready yet
+            new_segments[key].update(segments)
+            for df in frames:
+                # Add app metadata to each row
+                df["_app_name"] = app["name"]
+                df["_app_id"] = app["id"]
+                df["_bundle_id"] = app["bundleId"]
+                # Normalize column names
+                df.columns = [c.strip().replace(" ", "_").lower() for c in df.columns]
+                writers[key].write(df)
+                apps_with_data.add(app["id"])
+            if (i + 1) % 50 == 0:
+                print(f"    Processed {i + 1}/{len(report_futures)} app reports...")
+
+    apps_pending = apps_requested - len(apps_with_data)
+    apps_with_data = len(apps_with_data)
+
+    # Load each report type into BigQuery
     for key, cfg in APPLE_ANALYTICS_REPORTS.items():
-        rows = report_data[key]
-        if rows:
-            df = pd.DataFrame(rows)
-            # Normalize column names
-            df.columns = [c.strip().replace(" ", "_").lower() for c in df.columns]
-            write_table(df, cfg["table"])
-        else:
+        if writers[key].rows:
+            writers[key].commit()
+        elif first_run:
             print(f"  ⚠️  {cfg['table']} — no data yet (reports still generating)")
+        else:
+            print(f"  ✅ {cfg['table']} — no new segments")
+        # Only remember segments once their rows are safely written
+        segment_manifest.update(new_segments[key])
+
+    # Forget segments for instances older than Apple keeps around
+    cutoff = (date.today() - timedelta(days=120)).isoformat()
+    segment_manifest = {
+        k: v
+        for k, v in segment_manifest.items()
+        if (v.get("processing_date") or cutoff) >= cutoff
+    }
+    _save_manifest("apple_analytics_segments", segment_manifest)
 
     print(
         f"  📊 Apple Analytics: {apps_with_data} apps with data, {apps_pending} pending"
@@ -2249,10 +3410,10 @@ def refresh_d1_apple_analytics():
 
 
 def _play_read_csv(blob):
-    """Read a Google Play CSV from GCS (UTF-16 encoded)."""
-    raw = blob.download_as_bytes()
-    content = raw.decode("utf-16")
-    return pd.read_csv(io.StringIO(content))
+    """Read a Google Play CSV from GCS (UTF-16 encoded), decoding as it streams."""
+    with blob.open("rb") as raw:
+        with io.TextIOWrapper(raw, encoding="utf-16") as text:
+            return pd.read_csv(text)
 
 
 def _play_recent_months(n=12):
@@ -2265,6 +3426,123 @@ def _play_recent_months(n=12):
     return months
 
 
+def _load_manifest(name):
+    """Load a local JSON manifest of blob name → fingerprint."""
+    path = os.path.join(REFRESH_CACHE_DIR, f"{name}.json")
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(name, manifest):
+    os.makedirs(REFRESH_CACHE_DIR, exist_ok=True)
+    path = os.path.join(REFRESH_CACHE_DIR, f"{name}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _blob_fingerprint(blob):
+    return {"generation": str(blob.generation), "md5": blob.md5_hash}
+
+
+def _gcs_list(bucket, prefix, globs=None):
+    """List blobs under a prefix, narrowed server-side by glob patterns when supported."""
+    if not globs:
+        return list(bucket.list_blobs(prefix=prefix))
+    try:
+        blobs = {}
+        for pattern in globs:
+            for b in bucket.list_blobs(prefix=prefix, match_glob=pattern):
+                blobs[b.name] = b
+        return list(blobs.values())
+    except TypeError:
+        # Older google-cloud-storage without match_glob — list the whole prefix
+        return list(bucket.list_blobs(prefix=prefix))
+
+
+def _gcs_iter_frames(blobs, parse, manifest_name, prune=True, stats=None):
+    """Parse GCS blobs on a thread pool, yielding (blob name, DataFrame) as each lands.
+
+    Each parsed frame is cached locally next to a manifest of blob
+    generation/md5, so blobs unchanged since the last run are never
+    downloaded again. At most 2 × GCS_DOWNLOAD_WORKERS blobs are in flight,
+    so a consumer that writes each frame out holds only that window in
+    memory. With prune=False, cache entries for blobs not passed in are kept
+    (for partial loads). The manifest is saved once the generator is
+    exhausted; stats["downloaded"] counts blobs actually fetched and
+    stats["failed"] lists the names of blobs that could not be read.
+    """
+    manifest = _load_manifest(manifest_name)
+    frame_dir = os.path.join(REFRESH_CACHE_DIR, manifest_name)
+    os.makedirs(frame_dir, exist_ok=True)
+    stats = {} if stats is None else stats
+    stats["downloaded"] = 0
+    stats["failed"] = []
+
+    def _cache_path(name):
+        return os.path.join(frame_dir, hashlib.sha1(name.encode()).hexdigest() + ".pkl")
+
+    def _load(blob):
+        fp = _blob_fingerprint(blob)
+        path = _cache_path(blob.name)
+        if manifest.get(blob.name) == fp and os.path.exists(path):
+            return blob.name, pd.read_pickle(path), fp, False
+        df = parse(blob)
+        if df is not None:
+            df.to_pickle(path)
+        return blob.name, df, fp, True
+
+    new_manifest = {} if prune else dict(manifest)
+    pending = iter(blobs)
+    window = 2 * GCS_DOWNLOAD_WORKERS
+    done = 0
+    with ThreadPoolExecutor(max_workers=GCS_DOWNLOAD_WORKERS) as pool:
+        futures = {}
+        for blob in itertools.islice(pending, window):
+            futures[pool.submit(_load, blob)] = blob.name
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = futures.pop(fut)
+                for blob in itertools.islice(pending, 1):
+                    futures[pool.submit(_load, blob)] = blob.name
+                done += 1
+                if done % 100 == 0:
+                    print(f"    Loaded {done}...")
+                try:
+                    name, df, fp, fetched = fut.result()
+                except Exception as e:
+                    print(f"    ⚠️  Error reading {name}: {e}")
+                    stats["failed"].append(name)
+                    continue
+                new_manifest[name] = fp
+                stats["downloaded"] += fetched
+                if df is not None:
+                    yield name, df
+
+    # Drop cache entries for blobs no longer in scope
+    for name in set(manifest) - set(new_manifest) if prune else ():
+        try:
+            os.remove(_cache_path(name))
+        except OSError:
+            pass
+    _save_manifest(manifest_name, new_manifest)
+
+
+def _gcs_load_frames(blobs, parse, manifest_name, prune=True):
+    """Parse GCS blobs into {blob name: DataFrame}; see _gcs_iter_frames.
+
+    Returns (frames, downloaded count, names of blobs that failed to load).
+    """
+    stats = {}
+    frames = dict(_gcs_iter_frames(blobs, parse, manifest_name, prune, stats))
+    return frames, stats["downloaded"], stats["failed"]
+
+
 def refresh_d1_play_store_performance():
     """Pull Google Play store performance, installs, and ratings from GCS bucket.
 
@@ -2272,8 +3550,9 @@ def refresh_d1_play_store_performance():
     - PLAY_BUCKET_ID set (e.g. pubsite_prod_6117430703357331981)
     - Service account added to Play Console with 'View app information' permission
 
-    Files are UTF-8 with BOM. We only pull country-level breakdowns for the
-    last 12 months to keep the download manageable (~30K total files in bucket).
+    Files are UTF-16. We only pull country-level breakdowns for the last 12
+    months (listed by glob, not by scanning the ~30K-file prefix), download
+    them concurrently, and skip files whose GCS generation is unchanged.
     """
     if not PLAY_BUCKET_ID:
         print("  ⚠️  PLAY_BUCKET_ID not set — skipping Google Play reports")
@@ -2289,9 +3568,9 @@ def refresh_d1_play_store_performance():
     recent = _play_recent_months(12)
 
     def _collect_csvs(prefix, dimension="country"):
-        """Download CSVs matching recent months and a specific dimension."""
-        dfs = []
-        blobs = list(bucket.list_blobs(prefix=prefix))
+        """Yield normalised CSV frames for recent months and one dimension as they download."""
+        suffix = f"_{dimension}.csv" if dimension != "all" else ".csv"
+        blobs = _gcs_list(bucket, prefix, [f"{prefix}**{m}*{suffix}" for m in recent])
         matched = [
             b
             for b in blobs
@@ -2299,106 +3578,71 @@ def refresh_d1_play_store_performance():
             and any(m in b.name for m in recent)
             and (dimension in b.name or dimension == "all")
         ]
-        print(f"    {len(matched)} files to download (of {len(blobs)} total)")
-        for i, blob in enumerate(matched):
-            try:
-                df = _play_read_csv(blob)
-                df["_source_file"] = blob.name
-                dfs.append(df)
-            except Exception as e:
-                if i < 3:
-                    print(f"    ⚠️  Error reading {blob.name}: {e}")
-            if (i + 1) % 100 == 0:
-                print(f"    Downloaded {i + 1}/{len(matched)}...")
-        return dfs
+        manifest_name = "play_" + prefix.strip("/").replace("/", "_")
+        stats = {}
+        for name, df in _gcs_iter_frames(
+            matched, _play_read_csv, manifest_name, stats=stats
+        ):
+            df["_source_file"] = name
+            df.columns = [
+                c.strip().replace(" ", "_").replace("/", "_").lower()
+                for c in df.columns
+            ]
+            yield df
+        print(
+            f"    {len(matched)} files in range, {stats['downloaded']} downloaded "
+            f"({len(matched) - stats['downloaded']} unchanged)"
+        )
+
+    def _write_streamed(dfs, table_name, label):
+        """Write per-file frames into one load job as they arrive (schema widened as needed)."""
+        writer = StreamingTableWriter(table_name)
+        try:
+            for df in dfs:
+                writer.write(df)
+            if writer.rows == 0:
+                print(f"  ⚠️  No {label} data found")
+                writer.abort()
+                return
+            writer.commit()
+        except Exception:
+            writer.abort()
+            raise
 
     # ── Store Performance (visitors, acquisitions, conversion rate) ──
     print("  Fetching Google Play store performance reports...")
-    store_dfs = _collect_csvs("stats/store_performance/", "country")
-    if store_dfs:
-        combined = pd.concat(store_dfs, ignore_index=True)
-        combined.columns = [
-            c.strip().replace(" ", "_").replace("/", "_").lower()
-            for c in combined.columns
-        ]
-        write_table(combined, "d1_play_store_performance")
-    else:
-        print("  ⚠️  No store performance data found")
+    _write_streamed(
+        _collect_csvs("stats/store_performance/", "country"),
+        "d1_play_store_performance",
+        "store performance",
+    )
 
     # ── Installs (daily installs by country) ──
     print("  Fetching Google Play install reports...")
-    install_dfs = _collect_csvs("stats/installs/", "country")
-    if install_dfs:
-        combined = pd.concat(install_dfs, ignore_index=True)
-        combined.columns = [
-            c.strip().replace(" ", "_").replace("/", "_").lower()
-            for c in combined.columns
-        ]
-        write_table(combined, "d1_play_installs")
-    else:
-        print("  ⚠️  No install data found")
+    _write_streamed(
+        _collect_csvs("stats/installs/", "country"), "d1_play_installs", "install"
+    )
 
     # ── Ratings ──
     print("  Fetching Google Play rating reports...")
-    rating_dfs = _collect_csvs("stats/ratings/", "country")
-    if rating_dfs:
-        combined = pd.concat(rating_dfs, ignore_index=True)
-        combined.columns = [
-            c.strip().replace(" ", "_").replace("/", "_").lower()
-            for c in combined.columns
-        ]
-        write_table(combined, "d1_play_ratings")
-    else:
-        print("  ⚠️  No rating data found")
+    _write_streamed(
+        _collect_csvs("stats/ratings/", "country"), "d1_play_ratings", "rating"
+    )
 
     print("  ✅ Google Play reports complete")
 
 
-def refresh_d1_google_earnings():
-    """Pull Google Play earnings reports from GCS bucket.
-
-    Each monthly ZIP contains a UTF-8 CSV with columns:
-      Description, Transaction Date, Transaction Time, Tax Type,
-      Transaction Type, Refund Type, Product Title, Package ID,
-      Product Type, Sku Id, Buyer Country, Buyer Currency,
-      Amount (Buyer Currency), Currency Conversion Rate,
-      Merchant Currency, Amount (Merchant Currency), Service Fee %, ...
-
-    Transaction Types: Charge, Google fee, Charge refund, Google fee refund, Tax
-    """
+def _earnings_report_month(blob_name):
+    """'earnings/earnings_202401_….zip' → '2024-01' (None if not a monthly report)."""
     import re
-    import zipfile
 
-    if not PLAY_BUCKET_ID:
-        print("  ⚠️  PLAY_BUCKET_ID not set — skipping Google Play earnings")
-        return
+    m = re.search(r"_(\d{4})(\d{2})(?:_|\.)", os.path.basename(blob_name))
+    return f"{m.group(1)}-{m.group(2)}" if m else None
 
-    from google.cloud import storage
 
-    storage_client = storage.Client(credentials=credentials, project=SOURCE_PROJECT)
-    bucket = storage_client.bucket(PLAY_BUCKET_ID)
-
-    blobs = sorted(bucket.list_blobs(prefix="earnings/"), key=lambda b: b.name)
-    print(f"  Found {len(blobs)} earnings files")
-
-    all_dfs = []
-    for blob in blobs:
-        try:
-            data = blob.download_as_bytes()
-            zf = zipfile.ZipFile(io.BytesIO(data))
-            name = zf.namelist()[0]
-            raw = zf.read(name)
-            df = pd.read_csv(io.BytesIO(raw), encoding="utf-8")
-            if len(df) > 0:
-                all_dfs.append(df)
-        except Exception as e:
-            print(f"    ⚠️  Error reading {blob.name}: {e}")
-
-    if not all_dfs:
-        print("  ⚠️  No earnings data found")
-        return
-
-    combined = pd.concat(all_dfs, ignore_index=True)
+def _transform_google_earnings(combined):
+    """Normalise raw earnings CSV rows into the d1_google_earnings schema."""
+    import re
 
     # Extract app name from Product Title, e.g. "Monthly Subscription (Tony T Sports)" → "Tony T Sports"
     def _extract_app(title):
@@ -2437,6 +3681,7 @@ def refresh_d1_google_earnings():
     keep_cols = [
         "application_name",
         "month",
+        "report_month",
         "transaction_date",
         "transaction_type",
         "refund_type",
@@ -2452,77 +3697,435 @@ def refresh_d1_google_earnings():
         "service_fee_pct",
         "package_id",
     ]
-    out = out[[c for c in keep_cols if c in out.columns]]
+    return out[[c for c in keep_cols if c in out.columns]]
+
+
+def refresh_d1_google_earnings():
+    """Pull Google Play earnings reports from GCS bucket.
+
+    Each monthly ZIP contains a UTF-8 CSV with columns:
+      Description, Transaction Date, Transaction Time, Tax Type,
+      Transaction Type, Refund Type, Product Title, Package ID,
+      Product Type, Sku Id, Buyer Country, Buyer Currency,
+      Amount (Buyer Currency), Currency Conversion Rate,
+      Merchant Currency, Amount (Merchant Currency), Service Fee %, ...
+
+    Transaction Types: Charge, Google fee, Charge refund, Google fee refund, Tax
+
+    Incremental: the GCS generation of every ingested ZIP is tracked locally,
+    and only report months whose ZIP is new, changed or removed are re-parsed
+    and replaced (keyed by report_month). Without an ingest manifest, or if a
+    ZIP's month can't be read from its name, the table is rebuilt in full.
+    A month with a ZIP that fails to download or parse is left as it was (or
+    out of a full rebuild) and not marked ingested, so the next run retries it.
+    """
+    import zipfile
+
+    if not PLAY_BUCKET_ID:
+        print("  ⚠️  PLAY_BUCKET_ID not set — skipping Google Play earnings")
+        return
+
+    from google.cloud import storage
+
+    storage_client = storage.Client(credentials=credentials, project=SOURCE_PROJECT)
+    bucket = storage_client.bucket(PLAY_BUCKET_ID)
+
+    blobs = sorted(
+        (b for b in bucket.list_blobs(prefix="earnings/") if b.name.endswith(".zip")),
+        key=lambda b: b.name,
+    )
+    print(f"  Found {len(blobs)} earnings files")
+
+    ingested = _load_manifest("play_earnings_ingested")
+    current = {b.name: str(b.generation) for b in blobs}
+    changed = [b for b in blobs if ingested.get(b.name) != current[b.name]]
+    removed = set(ingested) - set(current)
+
+    if ingested and not changed and not removed:
+        print("  ✅ d1_google_earnings — up to date, no new earnings reports")
+        return
+
+    changed_months = {_earnings_report_month(b.name) for b in changed}
+    changed_months |= {_earnings_report_month(name) for name in removed}
+    full_rebuild = not ingested or None in changed_months
+    if not full_rebuild:
+        # Re-parse every report for an affected month, not just the changed file
+        to_load = [b for b in blobs if _earnings_report_month(b.name) in changed_months]
+    else:
+        to_load = blobs
+
+    def _read_earnings_zip(blob):
+        zf = zipfile.ZipFile(io.BytesIO(blob.download_as_bytes()))
+        with zf.open(zf.namelist()[0]) as raw:
+            df = pd.read_csv(raw, encoding="utf-8")
+        return df if len(df) > 0 else None
+
+    frames, downloaded, failed = _gcs_load_frames(
+        to_load, _read_earnings_zip, "play_earnings", prune=full_rebuild
+    )
+    print(
+        f"    {len(to_load)} files to ingest, {downloaded} downloaded"
+        + ("" if full_rebuild else f" — months {', '.join(sorted(changed_months))}")
+    )
+
+    # A month with an unreadable report is left out entirely (a partial month
+    # would understate payouts) and kept un-ingested so the next run retries it
+    failed_months = {_earnings_report_month(name) for name in failed}
+    if failed_months:
+        print(
+            f"  ⚠️  {len(failed)} earnings file(s) unreadable — skipping months "
+            f"{', '.join(sorted(str(m) for m in failed_months))} until they load"
+        )
+    ingested_now = {
+        name: gen
+        for name, gen in current.items()
+        if _earnings_report_month(name) not in failed_months
+    }
+    if not full_rebuild:
+        # Skipped months keep their previous state in the table and manifest
+        ingested_now.update(
+            (name, gen)
+            for name, gen in ingested.items()
+            if _earnings_report_month(name) in failed_months
+        )
+    merge_months = changed_months - failed_months
+
+    all_dfs = []
+    for name in sorted(frames):
+        month = _earnings_report_month(name)
+        if month in failed_months:
+            continue
+        df = frames[name]
+        df["report_month"] = month
+        all_dfs.append(df)
+
+    if full_rebuild:
+        if not all_dfs:
+            print("  ⚠️  No earnings data found")
+            return
+        out = _transform_google_earnings(pd.concat(all_dfs, ignore_index=True))
+        write_table(out, "d1_google_earnings")
+    else:
+        if not merge_months:
+            _save_manifest("play_earnings_ingested", ingested_now)
+            return
+        if not all_dfs:
+            merge_table(pd.DataFrame(), "d1_google_earnings", "report_month", merge_months)
+            _save_manifest("play_earnings_ingested", ingested_now)
+            return
+        out = _transform_google_earnings(pd.concat(all_dfs, ignore_index=True))
+        # Staged load + one DELETE/INSERT transaction: a failed load never
+        # leaves the changed months empty
+        merge_table(out, "d1_google_earnings", "report_month", merge_months)
 
-    write_table(out, "d1_google_earnings")
+    _save_manifest("play_earnings_ingested", ingested_now)
     print(f"    Transaction types: {out['transaction_type'].value_counts().to_dict()}")
 
 
+# ═══════════════════════════════════════════════════════════════
+# REFRESH LEDGER
+# ═══════════════════════════════════════════════════════════════
+
+LEDGER_TABLE = "refresh_ledger"
+LEDGER_FILE = os.path.join(REFRESH_CACHE_DIR, "refresh_ledger.jsonl")
+LEDGER_SCHEMA = [
+    bigquery.SchemaField("run_id", "STRING"),
+    bigquery.SchemaField("step", "STRING"),
+    bigquery.SchemaField("table_name", "STRING"),
+    bigquery.SchemaField("started_at", "TIMESTAMP"),
+    bigquery.SchemaField("finished_at", "TIMESTAMP"),
+    bigquery.SchemaField("duration_s", "FLOAT"),
+    bigquery.SchemaField("bytes_processed", "INTEGER"),
+    bigquery.SchemaField("rows_written", "INTEGER"),
+    bigquery.SchemaField("table_rows", "INTEGER"),
+    bigquery.SchemaField("row_delta", "INTEGER"),
+    bigquery.SchemaField("status", "STRING"),
+    bigquery.SchemaField("error", "STRING"),
+]
+
+_ledger_lock = threading.Lock()
+_ledger_run_id = None  # set by main(); standalone steps get their own id
+_ledger_step = None  # {"bytes": pending bytes, "tables": {table: [rows, bytes]}}
+_ledger_pending = []  # rows recorded this process, not yet loaded to BigQuery
+
+
+def _ledger_note_bytes(n):
+    """Attribute bytes processed by a query to the running step."""
+    with _ledger_lock:
+        if _ledger_step is not None and n:
+            _ledger_step["bytes"] += int(n)
+
+
+def _ledger_note_write(table_name, rows):
+    """Record a table write; bytes read since the previous write are charged to it."""
+    with _ledger_lock:
+        _built_this_run[f"{TARGET_DATASET}.{table_name}"] = datetime.now(timezone.utc)
+        if _ledger_step is None:
+            return
+        entry = _ledger_step["tables"].setdefault(table_name, [0, 0])
+        entry[0] += int(rows)
+        entry[1] += _ledger_step["bytes"]
+        _ledger_step["bytes"] = 0
+
+
+def _ledger_previous_rows():
+    """table_name → table_rows from the latest local ledger entry for that table."""
+    previous = {}
+    try:
+        with open(LEDGER_FILE) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if row.get("table_name") and row.get("table_rows") is not None:
+                    previous[row["table_name"]] = row["table_rows"]
+    except OSError:
+        pass
+    return previous
+
+
+def _table_num_rows(table_name):
+    try:
+        return write_client.get_table(
+            f"{TARGET_PROJECT}.{TARGET_DATASET}.{table_name}"
+        ).num_rows
+    except Exception:
+        return None
+
+
+def run_step(fn):
+    """Run one refresh_* function and record it in the refresh ledger.
+
+    Nodes declared with refresh_node whose targets are newer than all of
+    their sources are skipped and logged as "unchanged" per target.
+    Otherwise one ledger row is written per table the step loaded (rows
+    written, table size after the load and its delta vs the previous ledger
+    entry); a step that wrote nothing gets a single row with no table_name.
+    Exceptions are recorded and re-raised: tables loaded before the failure
+    stay "ok" and only the declared targets not yet written (or a single
+    row with no table_name) are marked "error".
+    """
+    global _ledger_step
+    started = datetime.now(timezone.utc)
+    run_id = _ledger_run_id or started.strftime("%Y%m%dT%H%M%SZ")
+    if stale_reason(fn) is None:
+        print(f"  ⏭️  {fn.__name__} — sources unchanged since last build")
+        _ledger_append(
+            [
+                {
+                    "run_id": run_id,
+                    "step": fn.__name__,
+                    "table_name": table_name,
+                    "started_at": started.isoformat(),
+                    "finished_at": datetime.now(timezone.utc).isoformat(),
+                    "duration_s": 0.0,
+                    "bytes_processed": 0,
+                    "rows_written": 0,
+                    "table_rows": None,
+                    "row_delta": None,
+                    "status": "unchanged",
+                    "error": None,
+                }
+                for table_name in fn.targets
+            ]
+        )
+        return None
+
+    step = {"bytes": 0, "tables": {}}
+    with _ledger_lock:
+        _ledger_step = step
+    t0 = time.monotonic()
+    status, error = "ok", None
+    try:
+        return fn()
+    except Exception as e:
+        status, error = "error", str(e)[:500]
+        raise
+    finally:
+        with _ledger_lock:
+            _ledger_step = None
+        duration = round(time.monotonic() - t0, 3)
+        finished = datetime.now(timezone.utc)
+        base = {
+            "run_id": run_id,
+            "step": fn.__name__,
+            "started_at": started.isoformat(),
+            "finished_at": finished.isoformat(),
+            "duration_s": duration,
+            "status": status,
+            "error": error,
+        }
+        tables = step["tables"]
+        pending_bytes = step["bytes"]
+        if tables and status == "ok":
+            # Bytes read after the last write belong to the last table written
+            tables[list(tables)[-1]][1] += pending_bytes
+            pending_bytes = 0
+        rows = []
+        if tables:
+            previous = _ledger_previous_rows()
+            for table_name, (written, nbytes) in tables.items():
+                table_rows = _table_num_rows(table_name)
+                prev = previous.get(table_name)
+                rows.append(
+                    {
+                        **base,
+                        "table_name": table_name,
+                        "bytes_processed": nbytes,
+                        "rows_written": written,
+                        "table_rows": table_rows,
+                        "row_delta": (
+                            table_rows - prev
+                            if table_rows is not None and prev is not None
+                            else None
+                        ),
+                        # A table loaded before the step failed is still good
+                        "status": "ok",
+                        "error": None,
+                    }
+                )
+        if status == "error":
+            # Only the targets the step never reached are failed; bytes read
+            # since the last successful write are charged to the first of them
+            failed = [t for t in getattr(fn, "targets", ()) if t not in tables]
+            rows += [
+                {
+                    **base,
+                    "table_name": table_name,
+                    "bytes_processed": pending_bytes if i == 0 else 0,
+                    "rows_written": 0,
+                    "table_rows": None,
+                    "row_delta": None,
+                }
+                for i, table_name in enumerate(failed or [None])
+            ]
+        elif not tables:
+            rows = [
+                {
+                    **base,
+                    "table_name": None,
+                    "bytes_processed": pending_bytes,
+                    "rows_written": 0,
+                    "table_rows": None,
+                    "row_delta": None,
+                    "status": "skipped",
+                }
+            ]
+        _ledger_append(rows)
+
+
+def _ledger_append(rows):
+    """Append rows to the local ledger file and queue them for flush_ledger."""
+    try:
+        os.makedirs(REFRESH_CACHE_DIR, exist_ok=True)
+        with open(LEDGER_FILE, "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    except OSError as e:
+        print(f"  ⚠️  Could not write local ledger: {e}")
+    with _ledger_lock:
+        _ledger_pending.extend(rows)
+
+
+def flush_ledger():
+    """Append the rows recorded so far to the refresh_ledger table in BigQuery."""
+    global _ledger_pending
+    with _ledger_lock:
+        rows, _ledger_pending = _ledger_pending, []
+    if not rows:
+        return
+    table_id = f"{TARGET_PROJECT}.{TARGET_DATASET}.{LEDGER_TABLE}"
+    job_config = bigquery.LoadJobConfig(
+        schema=LEDGER_SCHEMA,
+        write_disposition="WRITE_APPEND",
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+    )
+    try:
+        write_client.load_table_from_json(rows, table_id, job_config=job_config).result()
+        print(f"\n📒 {LEDGER_TABLE} — {len(rows)} entries")
+    except Exception as e:
+        with _ledger_lock:
+            _ledger_pending[:0] = rows
+        print(f"\n⚠️  Could not load refresh ledger: {e}")
+
+
 # ═══════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════
 
 
 def main():
+    global _ledger_run_id
     print("🔄 KLIQ Dashboard Refresh Starting...\n")
+    _ledger_run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
     ensure_dataset()
 
-    print("📊 Dashboard 1 — Main Growth:")
-    refresh_d1_growth_metrics()
-    refresh_d1_onboarding_funnel()
-    refresh_d1_engagement_funnel()
-    refresh_d1_activation_score()
-    refresh_d1_leads_sales()
-    refresh_d1_device_type()
-    refresh_d1_invoice_revenue()
-    refresh_d1_appfee_revenue()
-    refresh_d1_revenue_summary()
-    refresh_d1_coach_summary()
-    refresh_d1_coach_engagement()
-    refresh_d1_churn_analysis()
-    refresh_d1_retention_analysis()
-    refresh_d1_coach_gmv_timeline()
-    refresh_d1_app_status()
-
-    print("\n📊 Leads & Sales — External Sources:")
-    refresh_d1_demo_calls()
-    refresh_d1_meta_ads()
-    refresh_d1_tiktok_ads()
-
-    print("\n📊 GA4 — Website Acquisition:")
-    refresh_d1_ga4_acquisition()
-    refresh_d1_ga4_traffic()
-    refresh_d1_ga4_funnel()
-
-    print("\n📊 App Store Data:")
-    refresh_d1_appstore_sales()
-    refresh_d1_unified_revenue()
-    refresh_d1_ios_downloads()
-
-    print("\n📊 Apple Analytics (Impressions, Sessions, Page Views):")
-    refresh_d1_apple_analytics()
-
-    print("\n📊 Google Play Console (Store Performance, Installs, Ratings):")
-    refresh_d1_play_store_performance()
-    refresh_d1_google_earnings()
-
-    print("\n📊 App Performance:")
-    refresh_d1_app_engagement()
-    refresh_d1_app_device_breakdown()
-    refresh_d1_app_downloads()
-    refresh_d1_app_top_users()
-
-    print("\n📊 Dashboard 2 — App Health Score:")
-    refresh_d2_app_lookup()
-    refresh_d2_engagement()
-    refresh_d2_subscriptions_revenue()
-    refresh_d2_user_overview()
-    refresh_d2_dau()
-    refresh_d2_mau()
-
-    print("\n✅ All dashboard tables refreshed!")
-    print(f"📍 Power BI should connect to: {TARGET_PROJECT}.{TARGET_DATASET}")
+    try:
+        print("📊 Dashboard 1 — Main Growth:")
+        run_step(refresh_d1_growth_metrics)
+        run_step(refresh_d1_onboarding_funnel)
+        run_step(refresh_d1_engagement_funnel)
+        run_step(refresh_d1_activation_score)
+        run_step(refresh_d1_leads_sales)
+        run_step(refresh_d1_device_type)
+        run_step(refresh_d1_invoice_revenue)
+        run_step(refresh_d1_appfee_revenue)
+        run_step(refresh_d1_revenue_summary)
+        run_step(refresh_d1_coach_summary)
+        run_step(refresh_d1_coach_engagement)
+        run_step(refresh_d1_churn_analysis)
+        run_step(refresh_d1_retention_analysis)
+        run_step(refresh_d1_coach_gmv_timeline)
+        run_step(refresh_d1_app_status)
+
+        print("\n📊 Leads & Sales — External Sources:")
+        run_step(refresh_d1_demo_calls)
+        run_step(refresh_d1_meta_ads)
+        run_step(refresh_d1_tiktok_ads)
+
+        print("\n📊 GA4 — Website Acquisition:")
+        run_step(refresh_d1_ga4_acquisition)
+        run_step(refresh_d1_ga4_traffic)
+        run_step(refresh_d1_ga4_funnel)
+
+        print("\n📊 App Store Data:")
+        run_step(refresh_d1_appstore_sales)
+        run_step(refresh_d1_unified_revenue)
+        run_step(refresh_d1_ios_downloads)
+
+        print("\n📊 Apple Analytics (Impressions, Sessions, Page Views):")
+        run_step(refresh_d1_apple_analytics)
+
+        print("\n📊 Google Play Console (Store Performance, Installs, Ratings):")
+        run_step(refresh_d1_play_store_performance)
+        run_step(refresh_d1_google_earnings)
+
+        print("\n📊 App Performance:")
+        run_step(refresh_d1_app_engagement)
+        run_step(refresh_d1_app_device_breakdown)
+        run_step(refresh_d1_app_downloads)
+        run_step(refresh_d1_app_top_users)
+
+        print("\n📊 Feature Adoption & Growth Strategy:")
+        run_step(refresh_d1_event_daily_rollup)
+        run_step(refresh_d1_purchase_sku_daily)
+        run_step(refresh_d1_growth_strategy_app_stats)
+        run_step(refresh_d1_growth_strategy_monthly)
+
+        print("\n📊 Dashboard 2 — App Health Score:")
+        run_step(refresh_d2_app_lookup)
+        run_step(refresh_d2_engagement)
+        run_step(refresh_d2_subscriptions_revenue)
+        run_step(refresh_d2_user_overview)
+        run_step(refresh_d2_dau)
+        run_step(refresh_d2_mau)
+
+        print("\n✅ All dashboard tables refreshed!")
+        print(f"📍 Power BI should connect to: {TARGET_PROJECT}.{TARGET_DATASET}")
+    finally:
+        flush_ledger()
 
 
 if __name__ == "__main__":
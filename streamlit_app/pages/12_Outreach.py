@@ -43,7 +43,7 @@ from data_pipeline import (
 from sequences import render_sms, render_email, SMS_TEMPLATES, EMAIL_CONFIG
 from email_sender import send_email
 from sms_sender import send_sms
-from cheat_sheet import generate_cheat_sheet
+from cheat_sheet import cheat_sheet_path
 from task_progress import get_task_progress
 
 # ── Auth gate (reuse growth dashboard auth) ──
@@ -760,7 +760,7 @@ elif tab == "📧 Email Draft Queue":
                             with st.spinner("Sending..."):
                                 attachment_path = None
                                 if attach_pdf:
-                                    attachment_path = generate_cheat_sheet(enriched)
+                                    attachment_path = cheat_sheet_path(enriched)
 
                                 msg_id = send_email(
                                     to_email=email,
@@ -1136,7 +1136,7 @@ elif tab == "📄 Cheat Sheets":
 
         if st.button("Generate Cheat Sheet PDF", type="primary"):
             enriched = _enrich_prospect(prospect)
-            pdf_path = generate_cheat_sheet(enriched)
+            pdf_path = cheat_sheet_path(enriched)
             st.success("PDF generated!")
 
             with open(pdf_path, "rb") as f:
@@ -0,0 +1,136 @@
+"""Replay recorded TikTok report pages through fetch_tiktok_report.
+
+Fixtures in fixtures/tiktok are named "<start>_<end>_p<page>.json" after the
+chunk and page they answer; they cover 2024-01-01..2024-02-15, i.e. one
+30-day chunk split over two pages and a 16-day chunk on a single page.
+"""
+
+import json
+import os
+import sys
+from datetime import date
+
+import pytest
+
+pytest.importorskip("google.cloud.bigquery")
+pytest.importorskip("googleapiclient")
+pytest.importorskip("jwt")
+
+from google.auth.credentials import AnonymousCredentials  # noqa: E402
+from google.oauth2 import service_account  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "tests", "fixtures", "tiktok")
+START, END = date(2024, 1, 1), date(2024, 2, 15)
+
+
+@pytest.fixture(scope="module")
+def rd():
+    """Import refresh_dashboard without a service account key."""
+    sys.path.insert(0, ROOT)
+    patch = pytest.MonkeyPatch()
+    patch.setattr(
+        service_account.Credentials,
+        "from_service_account_file",
+        classmethod(lambda cls, *a, **kw: AnonymousCredentials()),
+    )
+    try:
+        import refresh_dashboard
+    finally:
+        patch.undo()
+    return refresh_dashboard
+
+
+class _Response:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class ReplaySession:
+    """Stands in for requests.Session, answering report GETs from fixtures."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.requests.append(params)
+        name = f"{params['start_date']}_{params['end_date']}_p{params['page']}.json"
+        with open(os.path.join(FIXTURE_DIR, name)) as f:
+            return _Response(json.load(f))
+
+
+def _fixture_rows():
+    rows = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        with open(os.path.join(FIXTURE_DIR, name)) as f:
+            rows += json.load(f)["data"]["list"]
+    return rows
+
+
+def test_fetch_replays_every_page_once(rd, monkeypatch):
+    monkeypatch.setattr(rd, "TIKTOK_QPS", 1000)
+    session = ReplaySession()
+
+    rows = list(rd.fetch_tiktok_report(START, END, session=session))
+
+    days = [row["dimensions"]["stat_time_day"][:10] for row in rows]
+    assert sorted(days) == sorted(set(days))
+    assert len(days) == (END - START).days + 1
+    assert min(days) == "2024-01-01" and max(days) == "2024-02-15"
+
+    pages = sorted((p["start_date"], p["end_date"], p["page"]) for p in session.requests)
+    assert pages == [
+        ("2024-01-01", "2024-01-30", 1),
+        ("2024-01-01", "2024-01-30", 2),
+        ("2024-01-31", "2024-02-15", 1),
+    ]
+    assert all(p["page_size"] == rd.TIKTOK_PAGE_SIZE for p in session.requests)
+
+
+def test_fetch_raises_on_api_error(rd, monkeypatch):
+    class ErrorSession(ReplaySession):
+        def get(self, url, headers=None, params=None, timeout=None):
+            return _Response({"code": 40105, "message": "Access token is incorrect"})
+
+    monkeypatch.setattr(rd, "TIKTOK_QPS", 1000)
+    with pytest.raises(RuntimeError, match="Access token"):
+        list(rd.fetch_tiktok_report(START, END, session=ErrorSession()))
+
+
+def test_refresh_folds_replayed_rows_into_weeks(rd, monkeypatch, tmp_path):
+    class FrozenDate(date):
+        @classmethod
+        def today(cls):
+            return END
+
+    written = {}
+    monkeypatch.setattr(rd, "date", FrozenDate)
+    monkeypatch.setattr(rd, "REFRESH_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(rd, "TIKTOK_QPS", 1000)
+    monkeypatch.setattr(rd, "TIKTOK_ACCESS_TOKEN", "token")
+    monkeypatch.setattr(rd, "TIKTOK_HISTORY_START", START.isoformat())
+    monkeypatch.setattr(rd, "TIKTOK_FULL_REFRESH", True)
+    monkeypatch.setattr(rd.requests, "Session", ReplaySession)
+    monkeypatch.setattr(rd, "write_table", lambda df, name: written.update({name: df}))
+
+    rd.refresh_d1_tiktok_ads()
+
+    weekly = written["d1_tiktok_ads"]
+    rows = _fixture_rows()
+    assert weekly["tt_spend"].sum() == pytest.approx(
+        sum(float(r["metrics"]["spend"]) for r in rows)
+    )
+    assert weekly["tt_impressions"].sum() == sum(
+        int(r["metrics"]["impressions"]) for r in rows
+    )
+    # W-MON periods start on Tuesdays: 2023-12-26 … 2024-02-13
+    assert weekly["week_start"].dt.weekday.eq(1).all()
+    assert len(weekly) == 8
+    assert weekly["week_start"].is_monotonic_increasing
+    first = weekly.iloc[0]
+    assert first["tt_cpc"] == round(first["tt_spend"] / first["tt_clicks"], 2)
+    # 2024-02-15 has no delivery, so the high-water mark is the day before
+    assert rd._load_manifest("tiktok_ads_state")["high_water"] == "2024-02-14"